@@ -1,239 +1,334 @@
 # ant.py
-import random
-import numpy as np
+import bisect
+import functools
+import itertools
 import config
+from settings import SimulationConfig
+
+# Emperically defined list of directions.
+# Will make the ant move in that direction if added its current position.
+VALID_DIRECTIONS = [
+    (0, -1),   # North (0)
+    (1, -1),  # NE (1)
+    (1, 0),   # East (2)
+    (1, 1),   # SE (3)
+    (0, 1),  # South (4)
+    (-1, 1), # SW (5)
+    (-1, 0),  # West (6)
+    (-1, -1),   # NW (7)
+]
+
+# Heading offsets of the 8 possible turns, in the order of the turning kernel:
+# [Straight, Left45, Right45, Left90, Right90, Left135, Right135, U-Turn].
+TURN_OFFSETS = (0, 1, -1, 2, -2, 3, -3, 4)
+
+# Lookup tables indexed by the current heading (0-7), built once at import
+# so no step has to rebuild a rotated direction list.
+# RELATIVE_DIRECTIONS[h][k]: direction vector k steps clockwise from heading h (index 0 = Forward).
+RELATIVE_DIRECTIONS = tuple(
+    tuple(VALID_DIRECTIONS[(heading + k) % 8] for k in range(8)) for heading in range(8)
+)
+# TURN_TABLE[h][j]: heading after taking turn j of the kernel while facing h.
+TURN_TABLE = tuple(
+    tuple((heading + offset) % 8 for offset in TURN_OFFSETS) for heading in range(8)
+)
+# SENSED_HEADINGS[h]: headings of the Front, Front-Right and Front-Left neighbours.
+SENSED_HEADINGS = tuple(
+    (heading, (heading + 1) % 8, (heading - 1) % 8) for heading in range(8)
+)
+
+
+def kernel_weights(kernel):
+    """
+    Turning probabilities derived from Watmough (1995) Figure 3.
+
+    The paper's kernel (B_n) gives the TOTAL probability for a turn angle magnitude.
+    We divide by 2 to split that probability equally between Left and Right turns.
+    The first element is the probability of moving straight (0 degrees).
+    It's calculated by subtracting the rest of the probabilities from 1.
+
+    Args:
+        kernel (sequence): The four TURNING_KERNEL values (45, 90, 135, 180 degrees).
+
+    Returns:
+        list: 8 probabilities in TURN_OFFSETS order.
+    """
+    return [
+        1.0 - (kernel[0] + kernel[1] + kernel[2] + kernel[3]),
+        kernel[0] / 2,
+        kernel[0] / 2,
+        kernel[1] / 2,
+        kernel[1] / 2,
+        kernel[2] / 2,
+        kernel[2] / 2,
+        kernel[3]
+    ]
+
+
+@functools.lru_cache(maxsize=None)
+def kernel_cdf(kernel):
+    """
+    Cumulative turning probabilities, so a single uniform number picks a turn with a binary search.
+
+    Cached per kernel: every ant (and every colony) using the same TURNING_KERNEL shares one table.
+
+    Args:
+        kernel (tuple): The four TURNING_KERNEL values.
+    """
+    return tuple(itertools.accumulate(kernel_weights(kernel)))
+
+
+class RandomStream:
+    """
+    Hands out uniform [0, 1) numbers one at a time from pre-drawn blocks of a NumPy Generator.
+
+    One Generator call per BLOCK_SIZE decisions replaces a random.choices() call per decision.
+    """
+
+    BLOCK_SIZE = 4096
+
+    def __init__(self, rng=None):
+        """
+        Args:
+            rng (np.random.Generator): Source of the blocks (default: seeded from config.RANDOM_SEED).
+        """
+        if(rng is None):
+            # Imported here because colony.py builds on this module.
+            from colony import make_rng
+            rng = make_rng(config.RANDOM_SEED)
+        self.rng = rng
+        self._block = []
+        self._next = 0
+
+    def uniform(self):
+        """Returns the next uniform number, drawing a new block when the current one runs out."""
+        if(self._next == len(self._block)):
+            # Python floats index and compare faster than NumPy scalars.
+            self._block = self.rng.random(self.BLOCK_SIZE).tolist()
+            self._next = 0
+        value = self._block[self._next]
+        self._next += 1
+        return value
+
+
+# Stream used by ants created without one (see shared_stream).
+_shared_stream = None
+
+
+def shared_stream():
+    """The stream shared by all ants created without an explicit one, seeded from config.RANDOM_SEED on first use."""
+    global _shared_stream
+    if(_shared_stream is None):
+        _shared_stream = RandomStream()
+    return _shared_stream
+
 
 class Ant:
     """
     Simulates a single ant agent based on the Watmough & Edelstein-Keshet (1995) model.
-    
+
     Attributes:
         pos (tuple): Current (x, y) coordinates of the ant.
-        direction (tuple): Current direction vector (dx, dy).
+        heading (int): Current heading as an index into VALID_DIRECTIONS (0-7).
+        direction (tuple): Current direction vector (dx, dy), i.e. VALID_DIRECTIONS[heading].
         mode (int): Current behavioral state (0 = Explore, 1 = Follow).
     """
-       
-    # Emperically defined list of directions.
-    # Will make the ant move in that direction if added its current position.
-    VALID_DIRECTIONS = [
-        (0, -1),   # North (0)
-        (1, -1),  # NE (1)
-        (1, 0),   # East (2)
-        (1, 1),   # SE (3)
-        (0, 1),  # South (4)
-        (-1, 1), # SW (5)
-        (-1, 0),  # West (6)
-        (-1, -1),   # NW (7)
-    ]
-    
-    # Turning probabilities derived from Watmough (1995) Figure 3.
-    # The paper's kernel (B_n) gives the TOTAL probability for a turn angle magnitude.
-    # We divide by 2 to split that probability equally between Left and Right turns.
-    # The first element is the probability of moving straight (0 degrees).
-    # It's calculated by subtracting the rest of the probabilities from 1.
-    WEIGHTS = [
-        1.0 - (config.TURNING_KERNEL[0] + config.TURNING_KERNEL[1] + config.TURNING_KERNEL[2] + config.TURNING_KERNEL[3]),
-        config.TURNING_KERNEL[0] / 2,
-        config.TURNING_KERNEL[0] / 2,
-        config.TURNING_KERNEL[1] / 2,
-        config.TURNING_KERNEL[1] / 2,
-        config.TURNING_KERNEL[2] / 2,
-        config.TURNING_KERNEL[2] / 2,
-        config.TURNING_KERNEL[3]
-    ]
-    
+
+    VALID_DIRECTIONS = VALID_DIRECTIONS
+
     # Dictionary that represents the modes of the ant
     MODE = {
         "Explore": 0,
         "Follow": 1
     }
-        
-    def __init__(self, init_pos):
-        self.pos = init_pos
+
+    def __init__(self, init_pos, stream=None, settings=None):
+        """
+        Args:
+            init_pos (tuple): Starting (x, y) coordinates.
+            stream (RandomStream): Source of random numbers (default: shared_stream()).
+            settings (SimulationConfig): Model parameters (default: SimulationConfig.current()).
+        """
+        settings = settings if settings is not None else SimulationConfig.current()
+        self.settings = settings
+        self.grid_size = settings.GRID_SIZE
+        self.pos = tuple(init_pos)
+        self.stream = stream if stream is not None else shared_stream()
+
         # Restrict initial heading to diagonals (NE, SE, SW, NW).
         # The paper notes orientation is chosen from a "specified set".
         # The distinct "X" pattern in Figure 3 implies this set consisted of the four diagonal vectors.
-        initial_directions = self.VALID_DIRECTIONS[1::2]
-        
-        self.direction = random.choice(initial_directions)
-        
+        self.heading = 1 + 2 * int(self.stream.uniform() * 4)
+
         # Normalize the paper's 0-255 integer fidelity scale to a 0-1 probability
-        self.FIDELITY = [config.FIDELITY / 256, 1 - (config.FIDELITY / 256)]
-        
+        self.fidelity = settings.fidelity
+        # Turning probabilities of this ant's TURNING_KERNEL (see kernel_weights).
+        self.WEIGHTS = settings.kernel_weights
+        self.kernel_cdf = settings.kernel_cdf
+
         self.mode = self.MODE["Explore"]
-        
+
+    @property
+    def direction(self):
+        """Current direction vector (dx, dy)."""
+        return VALID_DIRECTIONS[self.heading]
+
+    @direction.setter
+    def direction(self, vector):
+        self.heading = VALID_DIRECTIONS.index(tuple(vector))
+
     def move(self, grid):
             """
             Updates the ant's position based on pheromone sensing and random walks.
-            
+
             Implements the motion rules from Section 2 of the paper:
             1. Checks for trails using the "Fork Algorithm".
             2. Decides to follow or explore based on Fidelity.
             3. Turns using the weighted kernel if exploring.
-            
+
             Args:
                 grid (np.ndarray): The 2D pheromone grid.
-                
+
             Returns:
                 bool: True if the ant remains in bounds, False if it leaves the grid.
             """
-            # Returns a valid direction vector (dx, dy) if a trail is found,
-            # or (0, 0) to signal that no distinct trail was detected (random walk).
-            trail_direction = self.check_for_trail(grid)
+            # Heading index of the trail to steer towards,
+            # or -1 to signal that no distinct trail was detected (random walk).
+            trail_heading = self.find_trail(grid)
 
             # Fidelity Logic:
-            # We check fidelity if we are ALREADY following a trail, 
+            # We check fidelity if we are ALREADY following a trail,
             # OR if we are exploring and just encountered one.
-            if(self.mode == self.MODE["Follow"] or trail_direction != (0, 0)):
-                
-                # Fideility Check: 0 = Stay/Start Following, 1 = Lose Trail.
-                fidelity = random.choices([0, 1], self.FIDELITY)[0]
-                
-                # Re-verify trail existence. Even if we passed the fidelity check (0),
-                # we can only 'Follow' if a physical trail actually exists (!= 0,0).
-                # If trail_direction is (0,0) here, it means we ran out of pheromone 
+            if(self.mode == self.MODE["Follow"] or trail_heading >= 0):
+
+                # Fidelity Check: stay on (or start following) the trail with probability FIDELITY / 256.
+                stays = self.stream.uniform() < self.fidelity
+
+                # Re-verify trail existence. Even if we passed the fidelity check,
+                # we can only 'Follow' if a physical trail actually exists.
+                # If trail_heading is -1 here, it means we ran out of pheromone
                 # while in Follow mode, forcing a switch to Explore.
-                if(trail_direction != (0, 0) and fidelity == 0):
-                    self.direction = trail_direction
+                if(trail_heading >= 0 and stays):
+                    self.heading = trail_heading
                     self.mode = self.MODE["Follow"]
                 else:
                     self.mode = self.MODE["Explore"]
-            
-            # If we are exploring (or if the trail check above failed/returned (0,0)),
+
+            # If we are exploring (or if the trail check above failed),
             # we perform a random turn using the weighted kernel.
-            if(self.mode == self.MODE["Explore"] or trail_direction == (0, 0)):
-                self.direction = self.turn()
-                
+            if(self.mode == self.MODE["Explore"] or trail_heading < 0):
+                self.heading = self.turn_heading()
+
             # Update position.
-            # self.direction is guaranteed to be a valid unit vector from VALID_DIRECTIONS,
-            # allowing for direct vector addition.
-            self.pos = np.add(self.pos, self.direction)
-            
+            # The heading always indexes a valid unit vector from VALID_DIRECTIONS.
+            dx, dy = VALID_DIRECTIONS[self.heading]
+            self.pos = (self.pos[0] + dx, self.pos[1] + dy)
+
             # Return status for the boundary check.
-            # Note: Optimization trade-off. We calculate the out-of-bounds position first, 
+            # Note: Optimization trade-off. We calculate the out-of-bounds position first,
             # then flag it for removal in the main loop.
             return self.in_bounds(self.pos)
-    
+
+    def turn_heading(self):
+            """
+            Picks a new heading index from the probabilistic Turning Kernel.
+
+            One uniform number is looked up in the cumulative kernel; TURN_TABLE maps the chosen
+            turn [Straight, Left45, Right45, ..., U-Turn] to the new global heading.
+            """
+            choice = bisect.bisect_right(self.kernel_cdf, self.stream.uniform())
+            # Guard against the cumulative sum ending a rounding error below 1.0.
+            return TURN_TABLE[self.heading][min(choice, 7)]
+
     def turn(self):
             """
             Calculates a new direction based on the probabilistic Turning Kernel.
-            
-            Uses the kernel weights defined in config.py to simulate the ant's random turning behavior.
+
+            Uses the kernel weights of the ant's settings (TURNING_KERNEL) to simulate the ant's random turning behavior.
             """
-            # Get the index of the ant's current global heading (0-7).
-            direction_idx = self.VALID_DIRECTIONS.index(self.direction)
-            
-            # Start the relative list with the "Straight" direction (offset 0).
-            relative_idx = [direction_idx]
-            
-            # Build a list of neighbor indices relative to the ant's current heading.
-            # The goal is to map global grid directions into a local perspective:
-            # [Straight, Left45, Right45, Left90, Right90, Left135, Right135].
-            # We use modular arithmetic (% 8) to wrap around the compass bounds.
-            for i in range(1, 7, 2):
-                offset = (i // 2) + 1  # Calculates offsets: 1 (45 deg), 2 (90 deg), 3 (135 deg)
-                left_direction = (direction_idx + offset) % 8
-                right_direction = (direction_idx - offset) % 8
-                
-                relative_idx.append(left_direction)
-                relative_idx.append(right_direction)
-                
-            # Append the 180-degree (U-turn) index, which acts as the "rear" and has no Left/Right pair.
-            relative_idx.append((direction_idx + 4) % 8)
-            
-            # Convert the relative indices back into actual (dx, dy) direction vectors.
-            # This list now strictly matches the order of probabilities defined in self.WEIGHTS.
-            relative_directions = []
-            for idx in relative_idx:
-                relative_directions.append(self.VALID_DIRECTIONS[idx])
-                
-            # Choose a new direction using the weighted probability distribution.
-            return random.choices(relative_directions, self.WEIGHTS)[0]
-        
-    def check_for_trail(self, grid):
+            return VALID_DIRECTIONS[self.turn_heading()]
+
+    def find_trail(self, grid):
             """
             Scans the forward-facing neighborhood to decide steering direction.
-            
+
             Implements the "Fork Algorithm" from Section 2 of the paper,
             prioritizing straight movement and handling ambiguous trails.
+
+            Returns:
+                int: Heading index to steer towards, or -1 if no distinct trail was found.
             """
-            previous_position = self.pos
-            previous_direction = self.direction
-            
-            # We need to look relative to the ant's current heading.
-            # This helper rotates the compass so index 0 is always "Forward".
-            relative_direction_list = self.get_relative_directions(self.VALID_DIRECTIONS.index(previous_direction))
-            
-            # Scan indices [0, 1, 7] corresponding to Front, Front-Right, and Front-Left.
+            x, y = self.pos
+
+            # Scan Front, Front-Right and Front-Left only.
             # We ignore side/rear neighbors to simulate the antennae's limited forward field of view.
-            idx_check = [0, 1, 7]
-            concentrations = []
-            for idx in idx_check:
-                rel_dir = relative_direction_list[idx]
-                rel_pos = np.add(previous_position, rel_dir)
-                
-                # Assume that there is no trail outside of the grid
-                if(not self.in_bounds(rel_pos)):
-                    concentrations.append(0.0)
-                    continue
-                    
-                concentration = grid[rel_pos[0], rel_pos[1]]
-                concentrations.append(concentration)
-                
-            concentrations = np.array(concentrations)
-            
-            max_concentration = np.max(concentrations)
-            num_max = np.count_nonzero(concentrations == max_concentration)
-            
+            front, right, left = SENSED_HEADINGS[self.heading]
+            c_front = self.sense(grid, x, y, front)
+
             # Paper Rule (a): "Continue moving forward if the trail continues straight ahead".
-            # If the forward cell (index 0) has ANY pheromone, we prioritize maintaining momentum.
-            if(concentrations[0] > 0.0): 
-                return relative_direction_list[idx_check[0]]
-            
-            # Paper Rule (b): "Move as if exploring if both branches are of equal concentration"[.
-            # If we see multiple max values (e.g., equal left/right fork), we return (0,0).
-            # This triggers the "Turn" logic in move(), causing a random exploration step.
-            # We don't have to worry about if the forward and left values were the ones with
-            # Equal concentration, since we would have already returned a value if there was anything
-            # detected in front of the ant
-            if(num_max > 1):
-                return (0, 0)
+            # If the forward cell has ANY pheromone, we prioritize maintaining momentum.
+            if(c_front > 0.0):
+                return front
+
+            c_right = self.sense(grid, x, y, right)
+            c_left = self.sense(grid, x, y, left)
+
+            # Paper Rule (b): "Move as if exploring if both branches are of equal concentration".
+            # Equal branches (including both empty) trigger the random exploration step in move().
+            # The forward cell is known to be empty here, so it can never tie for the maximum.
+            if(c_right == c_left):
+                return -1
 
             # Paper Rule (c): "Follow the stronger of the two branches".
-            # We identified a single strongest neighbor that isn't forward. Turn towards it.
-            max_idx = np.where(concentrations == max_concentration)[0][0]
-            
-            if(max_concentration > 0.0):
-                return relative_direction_list[idx_check[max_idx]]
-
-            # Fallback: No trail found at all.
-            return (0, 0)
-        
+            # Concentrations are never negative, so the stronger branch always holds pheromone.
+            return right if c_right > c_left else left
+
+    def sense(self, grid, x, y, heading):
+            """Concentration of the neighbour of (x, y) in the given heading; no trail outside of the grid."""
+            dx, dy = VALID_DIRECTIONS[heading]
+            x += dx
+            y += dy
+            if(x >= 0 and x < self.grid_size and y >= 0 and y < self.grid_size):
+                return grid[x, y]
+            return 0.0
+
+    def check_for_trail(self, grid):
+            """
+            Fork Algorithm as a direction vector.
+
+            Returns:
+                tuple: The (dx, dy) direction of the trail, or (0, 0) if no distinct trail was found.
+            """
+            trail_heading = self.find_trail(grid)
+            if(trail_heading < 0):
+                return (0, 0)
+            return VALID_DIRECTIONS[trail_heading]
+
     def get_relative_directions(self, direction_idx):
         """
         Rotates the global direction list to be relative to the ant's current heading.
-        
+
         Effectively sets the provided index as 'Forward' (Index 0) for local sensing.
         """
-        return self.VALID_DIRECTIONS[direction_idx:] + self.VALID_DIRECTIONS[0:direction_idx]
-        
+        return RELATIVE_DIRECTIONS[direction_idx]
+
     def get_pos(self):
         """Returns the current (row, col) grid coordinates."""
         return self.pos
-    
+
     def get_mode(self):
         """Returns the current behavioral state (0 = Explore, 1 = Follow)."""
         return self.mode
-    
+
     def in_bounds(self, position):
         """
         Checks if a coordinate pair is within the simulation grid boundaries.
-        
+
         Used to enforce the 'Absorbing Boundary Conditions'.
         """
         x = position[0]
         y = position[1]
-        
-        if(x >= 0 and x < config.GRID_SIZE and y >= 0 and y < config.GRID_SIZE):
+
+        if(x >= 0 and x < self.grid_size and y >= 0 and y < self.grid_size):
             return True
-        return False
\ No newline at end of file
+        return False
@@ -0,0 +1,295 @@
+# benchmark.py
+import argparse
+import datetime
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import numpy as np
+from ant import Ant
+from colony import AntColony, INITIAL_HEADINGS
+from pheromone import make_field
+from settings import SimulationConfig
+
+# Default matrix: every combination is one case.
+ANT_COUNTS = (100, 1000, 10000, 100000, 1000000)
+GRID_SIZES = (256, 1024, 4096)
+RENDER = (False, True)
+
+# Small matrix for a quick check, e.g. before and after a change.
+QUICK = {"ants": (100, 10000), "grids": (256,), "render": (False,)}
+
+BASELINE_DIR = "benchmarks"
+
+
+def machine_key():
+    """Identifies the machine a result was measured on (host, architecture, core count)."""
+    key = f"{platform.node() or 'unknown'}-{platform.machine()}-{os.cpu_count()}cpu"
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in key)
+
+
+def commit_key():
+    """Short hash of the checked-out commit, with "-dirty" for uncommitted changes ("unknown" outside git)."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=here, capture_output=True, text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=here, capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return commit + ("-dirty" if status.strip() else "")
+
+
+def case_name(ants, grid, render):
+    return f"ants={ants} grid={grid} render={'on' if render else 'off'}"
+
+
+def populate(colony, field, ants, rng):
+    """
+    Fills the lattice with `ants` scattered ants and a sparse random trail network.
+
+    Starting from a steady population (rather than the nest burst) makes the ant count,
+    not the age of the run, set the cost of a tick.
+    """
+    size = colony.grid_size
+    colony.append(
+        rng.integers(0, size, size=(ants, 2)),
+        rng.choice(INITIAL_HEADINGS, size=ants),
+        np.zeros(ants, dtype=np.int8),
+    )
+    grid = np.where(rng.random((size, size)) < 0.05, rng.integers(1, 200, size=(size, size)), 0)
+    field.load(grid)
+
+
+def bench_case(ants, grid, render, ticks=20, seed=0):
+    """
+    Times `ticks` ticks of the Simulation.step phases with about `ants` ants on a `grid` x `grid` lattice.
+
+    Ants absorbed by the boundary are replaced outside the timed phases, so every tick moves the same population.
+
+    Returns:
+        dict: case name, parameters, ticks_per_second (all phases) and seconds per tick of each phase.
+    """
+    settings = SimulationConfig.current(GRID_SIZE=grid)
+    rng = np.random.default_rng(seed)
+    colony = AntColony(rng, capacity=ants + 1, settings=settings)
+    field = make_field(settings=settings)
+    populate(colony, field, ants, rng)
+    center = settings.center
+
+    gui = None
+    if(render):
+        # Draw off-screen: the benchmark measures the drawing, not the window system.
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        from gui import GUI
+        gui = GUI(grid_size=grid)
+
+    phases = {"evaporate": 0.0, "spawn": 0.0, "move": 0.0}
+    if(render):
+        phases.update(draw_grid=0.0, draw_ants=0.0)
+    clock = time.perf_counter
+    for _ in range(ticks):
+        t0 = clock()
+        field.evaporate()
+        t1 = clock()
+        colony.spawn(1, center)
+        t2 = clock()
+        colony.move(field)
+        t3 = clock()
+        phases["evaporate"] += t1 - t0
+        phases["spawn"] += t2 - t1
+        phases["move"] += t3 - t2
+
+        if(gui is not None):
+            t0 = clock()
+            gui.screen.fill("black")
+            gui.draw_grid(field.to_array())
+            t1 = clock()
+            gui.draw_ants(colony.pos)
+            t2 = clock()
+            phases["draw_grid"] += t1 - t0
+            phases["draw_ants"] += t2 - t1
+
+        missing = ants - len(colony)
+        if(missing > 0):
+            colony.append(rng.integers(0, grid, size=(missing, 2)), rng.choice(INITIAL_HEADINGS, size=missing), np.zeros(missing, dtype=np.int8))
+
+    if(gui is not None):
+        gui.quit_gui()
+
+    total = sum(phases.values())
+    return {
+        "case": case_name(ants, grid, render),
+        "ants": ants,
+        "grid": grid,
+        "render": render,
+        "ticks": ticks,
+        "ticks_per_second": ticks / total if total > 0 else float("inf"),
+        "phases": {name: seconds / ticks for name, seconds in phases.items()},
+    }
+
+
+def bench_ant_move(grid, ants=1000, steps=5, seed=0):
+    """
+    Times the scalar Ant.move on a `grid` x `grid` lattice (microseconds per call).
+
+    Returns:
+        dict: Result in the same layout as bench_case(), with the time per call as the only phase.
+    """
+    settings = SimulationConfig.current(GRID_SIZE=grid)
+    rng = np.random.default_rng(seed)
+    values = np.where(rng.random((grid, grid)) < 0.05, 100.0, 0.0)
+    swarm = [Ant(tuple(p), settings=settings) for p in rng.integers(0, grid, size=(ants, 2)).tolist()]
+    start = time.perf_counter()
+    for _ in range(steps):
+        for ant in swarm:
+            ant.move(values)
+    elapsed = time.perf_counter() - start
+    calls = ants * steps
+    return {
+        "case": f"Ant.move grid={grid}",
+        "ants": ants,
+        "grid": grid,
+        "render": False,
+        "ticks": steps,
+        "ticks_per_second": steps / elapsed,
+        "phases": {"ant_move_us": elapsed / calls * 1e6},
+    }
+
+
+def run_suite(ants=ANT_COUNTS, grids=GRID_SIZES, render=RENDER, ticks=20, verbose=True):
+    """
+    Runs every case of the matrix, plus the scalar Ant.move benchmark for each grid size.
+
+    Returns:
+        dict: The benchmark report: machine, commit, timestamp, versions and one result per case.
+    """
+    results = []
+    for grid in grids:
+        for count in ants:
+            for shown in render:
+                result = bench_case(count, grid, shown, ticks)
+                results.append(result)
+                if(verbose):
+                    print(f"{result['case']:<40} {result['ticks_per_second']:10.1f} ticks/s")
+        result = bench_ant_move(grid)
+        results.append(result)
+        if(verbose):
+            print(f"{result['case']:<40} {result['phases']['ant_move_us']:10.2f} us/call")
+
+    return {
+        "machine": machine_key(),
+        "commit": commit_key(),
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "results": results,
+    }
+
+
+def save_report(report, root=BASELINE_DIR):
+    """Stores a report as <root>/<machine>/<commit>.json and returns the path."""
+    path = os.path.join(root, report["machine"], report["commit"] + ".json")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+
+def load_report(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def latest_baseline(machine=None, root=BASELINE_DIR, exclude=None):
+    """Path of the newest stored report for `machine` (default: this one), or None. `exclude` skips one commit."""
+    paths = glob.glob(os.path.join(root, machine or machine_key(), "*.json"))
+    reports = [(load_report(path)["timestamp"], path) for path in paths if os.path.basename(path) != f"{exclude}.json"]
+    return max(reports)[1] if reports else None
+
+
+def compare(baseline, current, threshold=0.1):
+    """
+    Compares two reports case by case.
+
+    A case regresses when its ticks/second dropped by more than `threshold` (a fraction) from the baseline.
+    Cases present in only one report are skipped.
+
+    Returns:
+        list: (case, baseline ticks/s, current ticks/s, relative change) for every shared case,
+        and the subset of them that regressed, as (rows, regressions).
+    """
+    old = {result["case"]: result for result in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        if(result["case"] not in old):
+            continue
+        before = old[result["case"]]["ticks_per_second"]
+        after = result["ticks_per_second"]
+        rows.append((result["case"], before, after, after / before - 1))
+    regressions = [row for row in rows if row[3] < -threshold]
+    return rows, regressions
+
+
+def print_comparison(rows, regressions, threshold):
+    for case, before, after, change in rows:
+        flag = "  REGRESSION" if change < -threshold else ""
+        print(f"{case:<40} {before:10.1f} -> {after:10.1f} ticks/s ({change:+.1%}){flag}")
+    print(f"{len(regressions)} of {len(rows)} cases slower than the {threshold:.0%} threshold")
+
+
+def parse_list(value, kind=int):
+    return tuple(kind(item) for item in value.split(","))
+
+
+def main(argv=None):
+    """
+    Runs and compares benchmarks from the command line.
+
+    Examples:
+        python -m benchmark run --quick --check
+        python -m benchmark run --ants 1000,100000 --grid 1024 --render off
+        python -m benchmark compare benchmarks/host/abc123.json benchmarks/host/def456.json
+    """
+    parser = argparse.ArgumentParser(description="Measure simulation speed and compare it to stored baselines.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the benchmark matrix and store the report")
+    run.add_argument("--ants", type=parse_list, default=ANT_COUNTS, help="comma-separated ant counts")
+    run.add_argument("--grid", type=parse_list, default=GRID_SIZES, help="comma-separated grid sizes")
+    run.add_argument("--render", type=lambda v: parse_list(v, lambda s: s == "on"), default=RENDER, help="on, off or on,off")
+    run.add_argument("--quick", action="store_true", help="small matrix (overrides --ants/--grid/--render)")
+    run.add_argument("--ticks", type=int, default=20, help="ticks timed per case")
+    run.add_argument("--out", default=BASELINE_DIR, help="directory of stored reports")
+    run.add_argument("--check", action="store_true", help="compare with the newest stored report of this machine")
+    run.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown before a case is flagged")
+
+    check = commands.add_parser("compare", help="compare two stored reports")
+    check.add_argument("baseline", help="report to compare against")
+    check.add_argument("current", help="report to check")
+    check.add_argument("--threshold", type=float, default=0.1, help="allowed slowdown before a case is flagged")
+
+    args = parser.parse_args(argv)
+    if(args.command == "compare"):
+        rows, regressions = compare(load_report(args.baseline), load_report(args.current), args.threshold)
+        print_comparison(rows, regressions, args.threshold)
+        return 1 if regressions else 0
+
+    matrix = QUICK if args.quick else {"ants": args.ants, "grids": args.grid, "render": args.render}
+    report = run_suite(matrix["ants"], matrix["grids"], matrix["render"], args.ticks)
+    baseline = latest_baseline(report["machine"], args.out, exclude=report["commit"]) if args.check else None
+    print(f"Saved {save_report(report, args.out)}")
+    if(args.check):
+        if(baseline is None):
+            print("No earlier baseline for this machine")
+            return 0
+        print(f"Comparing with {baseline}")
+        rows, regressions = compare(load_report(baseline), report, args.threshold)
+        print_comparison(rows, regressions, args.threshold)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+# checkpoint.py
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import config
+from colony import make_rng
+from main import Simulation
+from replicates import derive_seed
+from settings import SimulationConfig
+
+# Model parameters stored with a checkpoint. A fork starts from these and overrides some of them.
+# TIMESTEPS and RANDOM_SEED are left out: the run length is chosen by whoever continues the run,
+# and the random stream continues from the saved generator state.
+MODEL_PARAMETERS = (
+    "GRID_SIZE",
+    "FIDELITY",
+    "DEPOSITION_RATE",
+    "EVAPORATION_RATE",
+    "EVAPORATION_MODE",
+    "GRID_DTYPE",
+    "INITIAL_BURST_SIZE",
+    "TIMESTEP_STOP",
+    "TURNING_KERNEL",
+)
+
+# One .npy file per array, so every array can be memory-mapped back in on its own.
+ARRAYS = ("grid", "pos", "heading", "mode")
+
+
+def save_checkpoint(sim, path):
+    """
+    Writes the full state of a simulation to the directory `path`.
+
+    Stores the pheromone grid, every live ant's position, heading and mode as .npy files,
+    and the tick, random generator state and model parameters in state.json.
+    A simulation restored from it continues bit-identically.
+
+    Args:
+        sim (Simulation): The simulation to save (its state is left unchanged).
+        path (str): Directory to write (created if needed, existing files are replaced).
+    """
+    os.makedirs(path, exist_ok=True)
+    arrays = {
+        "grid": sim.grid,
+        "pos": sim.colony.pos,
+        "heading": sim.colony.heading,
+        "mode": sim.colony.mode,
+    }
+    for name in ARRAYS:
+        np.save(os.path.join(path, name + ".npy"), arrays[name])
+
+    state = {
+        "tick": sim.tick,
+        "absorbed": sim.colony.absorbed,
+        "rng": sim.rng.bit_generator.state,
+        "config": sim.settings.as_dict(MODEL_PARAMETERS),
+    }
+    # Written last, so a directory with a state.json always holds a complete checkpoint.
+    with open(os.path.join(path, "state.json"), "w") as f:
+        json.dump(state, f, indent=2)
+
+
+def load_checkpoint(path, mmap=True):
+    """
+    Reads a checkpoint written by save_checkpoint().
+
+    Args:
+        path (str): Checkpoint directory.
+        mmap (bool): Memory-map the arrays instead of reading them into memory.
+
+    Returns:
+        tuple: (arrays, state) where arrays maps "grid", "pos", "heading", "mode" to arrays
+        and state is the decoded state.json.
+    """
+    with open(os.path.join(path, "state.json")) as f:
+        state = json.load(f)
+    arrays = {
+        name: np.load(os.path.join(path, name + ".npy"), mmap_mode="r" if mmap else None)
+        for name in ARRAYS
+    }
+    return arrays, state
+
+
+def restore(path, seed=None, settings=None, **kwargs):
+    """
+    Builds a Simulation from a checkpoint, ready to continue from the saved tick.
+
+    The simulation is built from `settings` (by default the current config.py values), so parameters
+    changed since the checkpoint was written (e.g. FIDELITY) apply from the saved tick on. Use fork()
+    to continue with the saved parameters plus a few overrides.
+
+    Args:
+        path (str): Checkpoint directory.
+        seed: None continues the saved random stream (bit-identical continuation);
+            anything else reseeds the generator, e.g. for independent replicates of one warm-up.
+        settings (SimulationConfig): Parameters of the continued run (default: SimulationConfig.current()).
+        **kwargs: Passed to Simulation (headless defaults to True).
+
+    Returns:
+        Simulation: The restored simulation.
+    """
+    arrays, state = load_checkpoint(path)
+    settings = settings if settings is not None else SimulationConfig.current()
+    if(state["config"]["GRID_SIZE"] != settings.GRID_SIZE):
+        raise ValueError(f'Checkpoint has GRID_SIZE {state["config"]["GRID_SIZE"]}, config has {settings.GRID_SIZE}')
+
+    sim = Simulation(**{"headless": True, **kwargs}, settings=settings)
+    sim.tick = state["tick"]
+    sim.grid = arrays["grid"]
+
+    colony = sim.colony
+    colony.pos = arrays["pos"]
+    colony.heading = arrays["heading"]
+    colony.mode = arrays["mode"]
+    colony.absorbed = state.get("absorbed", 0)
+
+    # The colony holds the same Generator object as the simulation, so restoring its state in place covers both.
+    if(seed is None):
+        sim.rng.bit_generator.state = state["rng"]
+    else:
+        sim.rng.bit_generator.state = make_rng(seed).bit_generator.state
+    return sim
+
+
+def fork(path, overrides=None, seed=None, base=None):
+    """
+    Continues a checkpoint to TIMESTEPS with some parameters changed.
+
+    Runs headless with the checkpoint's parameters plus `overrides`, e.g. {"FIDELITY": 247}
+    to branch a warmed-up run into a different fidelity after the shared prefix.
+
+    Args:
+        path (str): Checkpoint directory.
+        overrides (dict): Config values to change from the saved ones (may include TIMESTEPS).
+        seed: See restore().
+        base (SimulationConfig): Where the parameters a checkpoint does not store (TIMESTEPS)
+            come from (default: SimulationConfig.current()).
+
+    Returns:
+        tuple: The calculate_stats() result (F/L ratio, [lost, followers]).
+    """
+    _, state = load_checkpoint(path)
+    base = base if base is not None else SimulationConfig.current()
+    settings = base.replace(**{**state["config"], **(overrides or {})})
+    return restore(path, seed, settings=settings).loop(verbose=False)
+
+
+def run_forks(path, points, replicates=1, base_seed=None, workers=None):
+    """
+    Forks every point `replicates` times from one checkpoint, fanning the runs out over a process pool.
+
+    Args:
+        path (str): Checkpoint directory.
+        points (list): Override dicts, e.g. [{"FIDELITY": 255}, {"FIDELITY": 247}].
+        replicates (int): Runs per point. With 1, every point continues the saved random stream;
+            otherwise replicate i is reseeded with derive_seed(base_seed, i) at every point.
+        base_seed: Seed the replicate seeds are derived from (default: config.RANDOM_SEED).
+        workers (int): Number of processes (default: all cores). 1 runs everything in this process.
+
+    Returns:
+        list: One list of calculate_stats() results per point, in replicate order.
+    """
+    if(base_seed is None):
+        base_seed = config.RANDOM_SEED
+    seeds = [None] if replicates == 1 else [derive_seed(base_seed, i) for i in range(replicates)]
+    jobs = [(point, seed) for point in points for seed in seeds]
+    # Resolved here and handed to every run, so worker processes don't fall back to their own config module.
+    base = SimulationConfig.current()
+
+    if(workers == 1):
+        stats = [fork(path, point, seed, base) for point, seed in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            stats = list(pool.map(fork, [path] * len(jobs), [job[0] for job in jobs], [job[1] for job in jobs],
+                                  [base] * len(jobs)))
+
+    return [stats[i * len(seeds):(i + 1) * len(seeds)] for i in range(len(points))]
@@ -0,0 +1,430 @@
+# colony.py
+import hashlib
+import numpy as np
+from ant import Ant, TURN_OFFSETS
+from pheromone import as_field, scatter_add
+from settings import SimulationConfig
+
+# Heading vectors as an (8, 2) array so a whole population can be moved with one fancy index.
+# Same ordering as Ant.VALID_DIRECTIONS (North = 0, clockwise).
+DIRECTION_OFFSETS = np.array(Ant.VALID_DIRECTIONS, dtype=np.int32)
+
+# Heading offsets matching the order of the turning kernel (see ant.TURN_OFFSETS).
+TURN_OFFSET_ARRAY = np.array(TURN_OFFSETS, dtype=np.int8)
+
+# The four diagonal headings (NE, SE, SW, NW) that new ants are released with.
+INITIAL_HEADINGS = np.array([1, 3, 5, 7], dtype=np.int8)
+
+
+def seed_entropy(seed):
+    """
+    Converts a config-style seed into an integer NumPy can use.
+
+    config.RANDOM_SEED may be a string ("Dhvan Shah"), which NumPy cannot use directly,
+    so strings are hashed into a stable 64-bit integer. None or "" means "unseeded" and returns None.
+    """
+    if(seed is None or seed == ""):
+        return None
+    if(isinstance(seed, str)):
+        return int.from_bytes(hashlib.sha256(seed.encode("utf-8")).digest()[:8], "little")
+    return int(seed)
+
+
+def make_rng(seed=None):
+    """Builds a NumPy Generator from the config-style seed (see seed_entropy)."""
+    return np.random.default_rng(seed_entropy(seed))
+
+
+class AntColony:
+    """
+    Structure-of-arrays engine that advances every ant at once.
+
+    Holds the same state as a list of Ant objects, but as parallel NumPy arrays,
+    so sensing, the fidelity draw, kernel turning, the move and deposition
+    are a handful of array operations per tick instead of several per ant.
+
+    Note on Update Order:
+    Simulation used to move ants one at a time in release order, depositing right after
+    each move, so every ant sensed the pheromone dropped earlier in the same tick.
+    That ordering measurably raises the F/L ratio at high fidelity, so it is kept:
+    ants are processed in blocks of CHUNK_SIZE, each block deposits before the next one senses,
+    and inside a block the deposits of earlier ants are replayed exactly (see pending_deposits).
+
+    Note on Storage:
+    The arrays are a preallocated pool. The first `count` slots hold the live ants in release order.
+    Ants absorbed by the boundary are squeezed out in place once per tick, and the freed slots at the end
+    are reused by the next spawn, so neither spawning nor removal reallocates.
+    (Swap-remove would be O(removed) but would reorder the ants and change the update order above.)
+
+    Attributes:
+        pos (np.ndarray): (n, 2) integer grid coordinates of every live ant (a view into the pool).
+        heading (np.ndarray): (n,) heading index into Ant.VALID_DIRECTIONS (0-7).
+        mode (np.ndarray): (n,) behavioral state (0 = Explore, 1 = Follow).
+        count (int): Number of live ants.
+        followers (int): Number of live ants in Follow mode, kept up to date by move().
+        absorbed (int): Number of ants that have left the lattice so far.
+    """
+
+    # Ants per block. Small enough that ants of one block rarely share a cell,
+    # large enough that typical colonies (a few thousand ants) move in a single block.
+    CHUNK_SIZE = 16384
+
+    # Per-ant arrays of the pool, kept in step by reserve(), move() and extract().
+    POOL = ("_pos", "_heading", "_mode")
+
+    def __init__(self, rng=None, capacity=1024, rows=None, settings=None):
+        """
+        Args:
+            rng (np.random.Generator): Random source (default: seeded from settings.RANDOM_SEED).
+            capacity (int): Initial pool size. The pool doubles when a spawn does not fit.
+            rows (tuple): (start, stop) band of lattice rows the ants can sense (default: the whole lattice).
+                Positions stay global, but the flat cell indices passed to the field count from row `start`,
+                and the scratch lattices only cover the band (see parallel.py).
+            settings (SimulationConfig): Model parameters (default: SimulationConfig.current()).
+        """
+        self.settings = settings if settings is not None else SimulationConfig.current()
+        self.rng = rng if rng is not None else make_rng(self.settings.RANDOM_SEED)
+
+        self.count = 0
+        self.followers = 0
+        self.absorbed = 0
+        self._pos = np.empty((capacity, 2), dtype=np.int32)
+        self._heading = np.empty(capacity, dtype=np.int8)
+        self._mode = np.empty(capacity, dtype=np.int8)
+
+        # Normalize the paper's 0-255 integer fidelity scale to a 0-1 probability of staying on a trail.
+        self.fidelity = self.settings.fidelity
+
+        # Cumulative turning kernel, so a single uniform draw per ant picks its turn with searchsorted.
+        # Built from the settings so TURNING_KERNEL overrides apply.
+        self.kernel_cdf = np.array(self.settings.kernel_cdf)
+        self.grid_size = self.settings.GRID_SIZE
+        self.row_start, self.row_stop = (0, self.grid_size) if rows is None else rows
+
+        # Adding the deposition rate + 1 is neccessary due to the immediate
+        # evaporation in the next tick (at the top of Simulation.loop).
+        self.deposit_amount = self.settings.deposit_amount
+
+        # Scratch lattices used to replay the deposit order inside a block (see pending_deposits).
+        # Only occupied cells are ever read back, and the occupancy is reset after each block.
+        # Counts and indices never exceed CHUNK_SIZE, so int16 keeps them small on large lattices.
+        cells = (self.row_stop - self.row_start) * self.grid_size
+        self._occupancy = np.zeros(cells, dtype=np.int16)
+        self._first = np.zeros(cells, dtype=np.int16)
+        self._last = np.zeros(cells, dtype=np.int16)
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def capacity(self):
+        """Number of slots in the pool (live ants plus free slots)."""
+        return len(self._heading)
+
+    @property
+    def pos(self):
+        return self._pos[:self.count]
+
+    @pos.setter
+    def pos(self, values):
+        # Replacing a whole array (e.g. in tests) also resets the live count to its length.
+        self._load("_pos", values)
+
+    @property
+    def heading(self):
+        return self._heading[:self.count]
+
+    @heading.setter
+    def heading(self, values):
+        self._load("_heading", values)
+
+    @property
+    def mode(self):
+        return self._mode[:self.count]
+
+    @mode.setter
+    def mode(self, values):
+        self._load("_mode", values)
+        self.followers = int(np.count_nonzero(self.mode))
+
+    def _load(self, name, values):
+        """Copies a full array of per-ant values into the pool and makes its length the live count."""
+        self.reserve(len(values))
+        getattr(self, name)[:len(values)] = values
+        self.count = len(values)
+
+    def reserve(self, capacity):
+        """
+        Grows the pool to hold at least `capacity` ants (at least doubling, so growth is amortized O(1)).
+
+        Simulation reserves the largest population a run can reach up front, so the pool never grows mid-run.
+        """
+        if(capacity <= self.capacity):
+            return
+        capacity = max(capacity, 2 * self.capacity)
+        for name in self.POOL:
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def spawn(self, count, position):
+        """
+        Releases `count` new ants at `position` with random diagonal headings.
+
+        Mirrors Ant.__init__: new ants start in Explore mode facing NE, SE, SW or NW.
+        New ants take the first free slots, so they move after every ant released before them.
+        """
+        if(count <= 0):
+            return
+        self.reserve(self.count + count)
+        new = slice(self.count, self.count + count)
+        self._pos[new] = position
+        self._heading[new] = self.rng.choice(INITIAL_HEADINGS, size=count)
+        self._mode[new] = 0
+        self.count += count
+
+    def flat_cells(self, rows, cols, offset=None):
+        """
+        Flat index of lattice cells, counted from the first row of the band (see __init__).
+
+        `offset` is added per ant when the field holds several lattices (see ensemble.py).
+        """
+        cells = (rows - self.row_start) * self.grid_size + cols
+        if(offset is not None):
+            cells = cells + offset
+        return cells
+
+    def _cell_offset(self, chunk):
+        """Flat offset of each ant's lattice in the field, or None when there is only one (see ensemble.py)."""
+        return None
+
+    def _blocks(self, n):
+        """The slices of live ants that move() processes one after the other, CHUNK_SIZE at a time."""
+        return [slice(start, min(start + self.CHUNK_SIZE, n)) for start in range(0, n, self.CHUNK_SIZE)]
+
+    def _decide(self, chunk):
+        """
+        Rolls the random decisions of a block of ants.
+
+        Returns:
+            tuple: (passes the fidelity roll, index of the kernel turn) per ant, drawn in that order.
+        """
+        size = chunk.stop - chunk.start
+        stays = self.rng.random(size) < self.fidelity
+        turn_choice = np.searchsorted(self.kernel_cdf, self.rng.random(size), side="right")
+        return stays, turn_choice
+
+    def sample(self, field, rows, cols, offset=None):
+        """
+        Reads the concentration each ant senses at the given coordinates.
+
+        Off-grid cells are treated as empty, and deposits made earlier in the same block
+        by ants ahead in the release order are included (see pending_deposits).
+
+        Args:
+            field (EagerField): The pheromone field (see pheromone.py).
+            rows, cols (np.ndarray): (k, n) coordinates, one column per ant of the block.
+            offset (np.ndarray): (n,) lattice offset of each ant (see flat_cells).
+        """
+        inside = (rows >= 0) & (rows < self.grid_size) & (cols >= 0) & (cols < self.grid_size)
+        rows = np.clip(rows, self.row_start, self.row_stop - 1)
+        cols = np.clip(cols, 0, self.grid_size - 1)
+        cells = self.flat_cells(rows, cols, offset)
+        values = field.read(cells) + self.pending_deposits(cells)
+        return np.where(inside, values, 0)
+
+    def pending_deposits(self, cells):
+        """
+        Pheromone that earlier ants of the current block would already have dropped on `cells`.
+
+        Ant i of the block sees one deposit for every ant j < i of the block
+        that currently stands on the sensed cell. Requires _index_cells() for the block.
+
+        Args:
+            cells (np.ndarray): (k, n) flat (row * GRID_SIZE + col) index of the cells sensed by each ant.
+
+        Returns:
+            np.ndarray: Extra concentration to add to each reading.
+        """
+        reader = np.broadcast_to(np.arange(cells.shape[-1], dtype=np.int32), cells.shape)
+        count = self._occupancy[cells].astype(np.int32)
+        first = self._first[cells]
+        last = self._last[cells]
+
+        # Most sensed cells hold no ant, or only ants strictly before/after the reader,
+        # which the first/last index per cell resolves without any search.
+        pending = np.where(last < reader, count, 0)
+        mixed = (count > 1) & (first < reader) & (last > reader)
+        if(mixed.any()):
+            # Several ants share the cell and the reader's turn falls between them.
+            # Sort the block by (cell, index) and count the keys below each reader's key.
+            n = len(self._cells)
+            keys = np.sort(self._cells.astype(np.int64) * n + np.arange(n))
+            group = cells[mixed].astype(np.int64) * n
+            pending[mixed] = np.searchsorted(keys, group + reader[mixed]) - np.searchsorted(keys, group)
+
+        return pending * self.deposit_amount
+
+    def _index_cells(self, chunk):
+        """Fills the scratch lattices with the occupancy and first/last index of every cell held by the block."""
+        self._cells = self.flat_cells(self.pos[chunk, 0], self.pos[chunk, 1], self._cell_offset(chunk))
+        index = np.arange(len(self._cells), dtype=np.int16)
+        scatter_add(self._occupancy, self._cells, 1)
+        # Fancy assignment keeps the last write, so writing in reverse leaves the smallest index.
+        self._first[self._cells[::-1]] = index[::-1]
+        self._last[self._cells] = index
+
+    def _clear_cells(self):
+        """Resets the scratch occupancy written by _index_cells()."""
+        self._occupancy[self._cells] = 0
+
+    def check_for_trail(self, grid, chunk=slice(None)):
+        """
+        Applies the "Fork Algorithm" to a block of ants at once.
+
+        Vectorized version of Ant.check_for_trail. Only the Front, Front-Right
+        and Front-Left neighbours are sensed.
+
+        Note: an ant that leaves the grid this tick is still counted as a pending deposit
+        by the ants behind it in its block. This only affects readings on the outermost ring of cells.
+
+        Args:
+            grid: The pheromone field, or a plain 2D grid array.
+            chunk (slice): The block of ants to sense for (default: the whole colony).
+
+        Returns:
+            np.ndarray: Heading index to steer towards, or -1 where no distinct trail was found.
+        """
+        front = self.heading[chunk].astype(np.int32)
+        right = (front + 1) % 8
+        left = (front - 1) % 8
+
+        # Sense Front, Front-Right and Front-Left in one batch: row k of `sensed` is one neighbour.
+        sensed = np.stack((front, right, left))
+        self._index_cells(chunk)
+        c_front, c_right, c_left = self.sample(
+            as_field(grid),
+            self.pos[chunk, 0] + DIRECTION_OFFSETS[sensed, 0],
+            self.pos[chunk, 1] + DIRECTION_OFFSETS[sensed, 1],
+            self._cell_offset(chunk),
+        )
+        self._clear_cells()
+
+        # Paper Rule (c): "Follow the stronger of the two branches".
+        trail = np.where(c_right > c_left, right, left)
+
+        # Paper Rule (b): equal branches (including both empty) mean no distinct trail.
+        # Concentrations are never negative, so unequal branches always have a non-zero maximum.
+        trail = np.where(c_right == c_left, -1, trail)
+
+        # Paper Rule (a): any pheromone straight ahead wins over the branches.
+        trail = np.where(c_front > 0, front, trail)
+        return trail
+
+    def move(self, grid):
+        """
+        Advances every ant by one step and deposits pheromone.
+
+        Implements the same motion rules as Ant.move, in the same order:
+        1. Checks for trails using the "Fork Algorithm".
+        2. Decides to follow or explore based on Fidelity.
+        3. Turns using the weighted kernel if exploring.
+        Ants that stay on the lattice deposit on their previous cell (Rule 2);
+        ants that step off it are removed (absorbing boundaries).
+
+        Args:
+            grid: The pheromone field (see pheromone.py), or a plain 2D grid array. Updated in place.
+
+        Returns:
+            int: Number of ants that left the grid this tick.
+        """
+        field = as_field(grid)
+        n = len(self)
+        inside = np.empty(n, dtype=bool)
+        # Views of the live ants, taken once (the properties build a new view on every access).
+        pos, heading, mode = self.pos, self.heading, self.mode
+        followers = 0
+
+        for chunk in self._blocks(n):
+            trail = self.check_for_trail(field, chunk)
+            found = trail >= 0
+            stays, turn_choice = self._decide(chunk)
+
+            # Fidelity Logic:
+            # Ant.move only rolls fidelity when an ant is following or has just found a trail,
+            # and an ant ends up in Follow mode only if a trail exists AND it passed the roll.
+            # Exploring ants that found nothing stay exploring, so the new mode reduces to this.
+            follow = found & stays
+            mode[chunk] = follow
+
+            # Everyone who is not following turns with the weighted kernel.
+            np.minimum(turn_choice, len(TURN_OFFSET_ARRAY) - 1, out=turn_choice)
+            turned = (heading[chunk] + TURN_OFFSET_ARRAY[turn_choice]) % 8
+            heading[chunk] = np.where(follow, trail, turned)
+
+            previous = pos[chunk].copy()
+            pos[chunk] += DIRECTION_OFFSETS[heading[chunk]]
+
+            # Absorbing boundaries: ants leaving the lattice do not deposit.
+            block_inside = inside[chunk]
+            np.all((pos[chunk] >= 0) & (pos[chunk] < self.grid_size), axis=1, out=block_inside)
+            followers += int(np.count_nonzero(follow & block_inside))
+
+            # Deposition: Ants add pheromone to their previous location (Rule 2),
+            # before the next block senses, as in the original one-ant-at-a-time loop.
+            previous = previous[block_inside]
+            offset = self._cell_offset(chunk)
+            if(offset is not None):
+                offset = offset[block_inside]
+            field.deposit(self.flat_cells(previous[:, 0], previous[:, 1], offset), self.deposit_amount)
+
+        removed = n - int(np.count_nonzero(inside))
+        if(removed > 0):
+            # Squeeze the survivors to the front of the pool (stable, so release order is kept).
+            # The slots freed at the end are reused by the next spawn.
+            survivors = n - removed
+            for name in self.POOL:
+                values = getattr(self, name)
+                values[:survivors] = values[:n][inside]
+            self.count = survivors
+        self.followers = followers
+        self.absorbed += removed
+        return removed
+
+    def extract(self, leaving):
+        """
+        Removes the ants selected by the boolean mask `leaving`, keeping the order of the others.
+
+        Returns:
+            tuple: (pos, heading, mode) copies of the removed ants, in release order.
+        """
+        ants = (self.pos[leaving], self.heading[leaving], self.mode[leaving])
+        if(len(ants[0]) > 0):
+            staying = ~leaving
+            survivors = self.count - len(ants[0])
+            for name in self.POOL:
+                values = getattr(self, name)
+                values[:survivors] = values[:self.count][staying]
+            self.count = survivors
+            self.followers -= int(np.count_nonzero(ants[2]))
+        return ants
+
+    def append(self, pos, heading, mode):
+        """Adds ants (e.g. ones extract()ed from another colony) after the live ones, as spawn() does."""
+        count = len(pos)
+        self.reserve(self.count + count)
+        new = slice(self.count, self.count + count)
+        self._pos[new] = pos
+        self._heading[new] = heading
+        self._mode[new] = mode
+        self.count += count
+        self.followers += int(np.count_nonzero(mode))
+
+    def get_positions(self):
+        """Returns the (n, 2) array of current (row, col) grid coordinates of the live ants (a view, not a copy)."""
+        return self.pos
+
+    def count_modes(self):
+        """Returns [explorers, followers], the same layout as Simulation.calculate_stats(). O(1)."""
+        return [self.count - self.followers, self.followers]
@@ -0,0 +1,89 @@
+# convergence.py
+import numpy as np
+from stats import COLUMNS
+from trails import trail_mask
+
+# Windowed quantities that have to settle, from the per-tick statistics (see stats.py).
+MONITORED = ("followers", "lost", "pheromone")
+
+
+class ConvergenceMonitor:
+    """
+    Stops a run once it has reached a steady state (see Simulation(convergence=...)).
+
+    Every `window` ticks after spawning has stopped (TIMESTEP_STOP), the monitor compares the
+    last window with the one before it:
+    - the mean follower count, lost count and total pheromone, each within `tolerance` relative change;
+    - the set of trail cells (more pheromone than `threshold`, see trails.trail_mask),
+      whose Jaccard distance to the previous window's set must be at most `trail_tolerance`.
+    The run is steady once `patience` consecutive windows pass all checks. It then stops and
+    reports calculate_stats() as of that tick.
+
+    Attributes:
+        converged_at (int): Tick at which the run was found steady, or None.
+        changes (dict): Relative changes of the MONITORED means and the trail Jaccard distance ("trails")
+            found at the last check.
+    """
+
+    def __init__(self, window=100, tolerance=0.02, trail_tolerance=0.25, patience=2, threshold=None, start=None):
+        """
+        Args:
+            window (int): Ticks per window; the checks run every `window` ticks.
+            tolerance (float): Largest relative change of a windowed mean that still counts as steady.
+            trail_tolerance (float): Largest Jaccard distance between consecutive trail cell sets. Trails keep
+                shifting by a few cells even when the network is settled, so this is far from 0.
+            patience (int): Consecutive steady windows needed.
+            threshold (float): Trail cells hold more pheromone than this (default: the run's deposit_amount).
+            start (int): No checks before this tick (default: the run's TIMESTEP_STOP).
+        """
+        self.window = window
+        self.tolerance = tolerance
+        self.trail_tolerance = trail_tolerance
+        self.patience = patience
+        self.threshold = threshold
+        self.start = start
+        self.converged_at = None
+        self.changes = {}
+        self._means = None
+        self._trails = None
+        self._steady = 0
+
+    def due(self, tick):
+        return self.window > 0 and tick % self.window == 0
+
+    def update(self, tick, stats, grid):
+        """
+        Checks the window ending at `tick`.
+
+        Args:
+            tick (int): Simulation tick.
+            stats (StatsSeries): The run's per-tick statistics, up to `tick`.
+            grid (np.ndarray): The pheromone grid at `tick`.
+
+        Returns:
+            bool: Whether the run has converged.
+        """
+        # Spawning only stops after TIMESTEP_STOP, and the first window after it is still settling.
+        if(tick - self.window < (self.start or 0)):
+            return False
+        rows = stats.array[-self.window:]
+        means = np.array([rows[:, COLUMNS.index(name)].mean() for name in MONITORED])
+        trails = trail_mask(grid, self.threshold)
+        previous, previous_trails = self._means, self._trails
+        self._means, self._trails = means, trails
+        if(previous is None):
+            return False
+
+        change = np.abs(means - previous) / np.maximum(np.abs(previous), 1)
+        union = np.count_nonzero(trails | previous_trails)
+        self.changes = dict(zip(MONITORED, change.tolist()))
+        self.changes["trails"] = float(np.count_nonzero(trails ^ previous_trails) / union) if union else 0.0
+
+        if(np.all(change <= self.tolerance) and self.changes["trails"] <= self.trail_tolerance):
+            self._steady += 1
+        else:
+            self._steady = 0
+        if(self._steady >= self.patience):
+            self.converged_at = tick
+            return True
+        return False
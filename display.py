@@ -0,0 +1,150 @@
+# display.py
+import multiprocessing as mp
+import queue
+import time
+import numpy as np
+import config
+
+# Config values the render process needs. They are sent along explicitly because a
+# spawned child re-imports config.py and would miss overrides made in the parent (e.g. by main()).
+RENDER_SETTINGS = ("GRID_SIZE", "GUI_TRAIL_SCALE")
+
+# Longest wait for a new snapshot before the window handles its events (and redraws) anyway.
+IDLE_WAIT = 1 / 60
+
+
+def _render_worker(frames, closed, settings, max_fps):
+    """
+    Body of the render process: shows the newest snapshot until the window is closed.
+
+    Args:
+        frames (mp.Queue): ("frame", tick, positions, grid) snapshots, or ("quit",).
+        closed (mp.Event): Set here when the user closes the window.
+        settings (dict): RENDER_SETTINGS values from the simulation process.
+        max_fps (int): Render frame rate (the old fixed clock.tick(60)).
+    """
+    for name, value in settings.items():
+        setattr(config, name, value)
+    from gui import GUI
+
+    gui = GUI()
+    # Empty field until the first snapshot arrives.
+    positions = np.empty((0, 2), dtype=np.int32)
+    grid = np.zeros((config.GRID_SIZE, config.GRID_SIZE))
+    while True:
+        # Wait for a snapshot instead of redrawing the same one in a tight loop (max_fps=0 does not
+        # throttle), then drain the queue and keep only the newest; older ones are already stale.
+        try:
+            message = frames.get(timeout=IDLE_WAIT)
+            while True:
+                if(message[0] == "quit"):
+                    gui.quit_gui()
+                    return
+                _, _, positions, grid = message
+                message = frames.get_nowait()
+        except queue.Empty:
+            pass
+
+        if(not gui.loop(positions, grid, fps=max_fps)):
+            break
+    closed.set()
+
+
+class Display:
+    """
+    Shows the simulation in a separate render process.
+
+    The simulation publishes snapshots of the ant positions and the pheromone grid
+    and never waits for the screen: the render process draws at its own frame rate,
+    always using the latest snapshot, and snapshots it cannot keep up with are dropped.
+    """
+
+    def __init__(self, render_every=1, max_fps=60, grid_size=None):
+        """
+        Starts the render process and opens the window.
+
+        Args:
+            render_every (int): Publish a snapshot every Nth tick only.
+            max_fps (int): Frame rate cap of the window. The simulation also skips copying
+                snapshots faster than this, since they could never be shown. None means uncapped.
+            grid_size (int): Side length of the simulated grid (default: config.GRID_SIZE).
+        """
+        self.render_every = max(int(render_every), 1)
+        self.max_fps = max_fps
+        self.last_publish = 0.0
+
+        # A spawned child starts from a clean interpreter (no inherited SDL or NumPy state).
+        context = mp.get_context("spawn")
+        # Room for one snapshot in flight plus the quit message. Anything more would only lag.
+        self.frames = context.Queue(maxsize=2)
+        # Snapshots are disposable: never hold up interpreter exit flushing one to a dead renderer.
+        self.frames.cancel_join_thread()
+        self.closed = context.Event()
+        settings = {name: getattr(config, name) for name in RENDER_SETTINGS}
+        if(grid_size is not None):
+            settings["GRID_SIZE"] = grid_size
+        self.process = context.Process(
+            target=_render_worker,
+            args=(self.frames, self.closed, settings, max_fps or 0),
+            daemon=True,
+        )
+        self.process.start()
+
+    def is_open(self):
+        """False once the user has closed the window (or the render process died)."""
+        return not self.closed.is_set() and self.process.is_alive()
+
+    def due(self, tick):
+        """
+        Whether a snapshot of this tick would be sent at all (every Nth tick, at most max_fps per second).
+
+        Checked before building a snapshot, so skipped ticks cost nothing.
+        """
+        if(tick % self.render_every != 0):
+            return False
+        return not self.max_fps or time.perf_counter() - self.last_publish >= 1.0 / self.max_fps
+
+    def publish(self, tick, positions, grid, force=False):
+        """
+        Offers a snapshot to the render process without blocking the simulation.
+
+        Args:
+            tick (int): Simulation tick of the snapshot.
+            positions (np.ndarray): (n, 2) ant positions.
+            grid (np.ndarray): The pheromone grid.
+            force (bool): Wait for room in the queue instead of dropping the snapshot
+                (used for the final state, which must not be lost).
+
+        Returns:
+            bool: False if the window has been closed (stopping the sim), True otherwise.
+        """
+        if(not self.is_open()):
+            return False
+
+        # Copies, because the simulation keeps updating both arrays in place after this returns.
+        message = ("frame", tick, positions.copy(), grid.copy())
+        try:
+            if(force):
+                self.frames.put(message, timeout=5)
+            else:
+                self.frames.put_nowait(message)
+        except queue.Full:
+            # The renderer is still busy with an earlier frame: drop this one.
+            return True
+        self.last_publish = time.perf_counter()
+        return True
+
+    def wait(self):
+        """Blocks until the user closes the window."""
+        self.process.join()
+
+    def close(self):
+        """Closes the window without waiting for the user."""
+        if(self.process.is_alive()):
+            try:
+                self.frames.put(("quit",), timeout=5)
+            except queue.Full:
+                pass
+            self.process.join(timeout=10)
+            if(self.process.is_alive()):
+                self.process.terminate()
@@ -0,0 +1,255 @@
+# ensemble.py
+import numpy as np
+from colony import AntColony, INITIAL_HEADINGS, make_rng
+from frames import render_frame, write_png
+from pheromone import make_field
+
+# Parameters every member of an ensemble must share: they fix the size of the stacked field,
+# the run length and the pheromone arithmetic. FIDELITY, TURNING_KERNEL, RANDOM_SEED,
+# INITIAL_BURST_SIZE and TIMESTEP_STOP may differ from member to member.
+SHARED = (
+    "GRID_SIZE",
+    "TIMESTEPS",
+    "DEPOSITION_RATE",
+    "EVAPORATION_RATE",
+    "EVAPORATION_MODE",
+    "GRID_DTYPE",
+)
+
+
+class EnsembleColony(AntColony):
+    """
+    The ants of K independent replicas in one structure-of-arrays pool.
+
+    Replica k's lattice is the k-th slice of a (K, size, size) field, so an ant's flat cell index is
+    offset by k * size * size and sensing, turning, moving and deposition for all replicas run in the
+    same array operations as for a single colony. Replicas never share a cell, so they cannot interact.
+
+    The pool is kept replica-major (all ants of replica 0 in release order, then replica 1, ...).
+    Each replica draws from its own generator, in the same order and in the same blocks as a lone
+    AntColony would, so every replica reproduces the Simulation run with its settings exactly.
+
+    Attributes:
+        replica (np.ndarray): (n,) replica index of every live ant.
+        absorbed (np.ndarray): (K,) ants that have left each replica's lattice so far.
+    """
+
+    POOL = AntColony.POOL + ("_replica",)
+
+    def __init__(self, members, rngs=None, capacity=1024):
+        """
+        Args:
+            members (list): SimulationConfig of every replica (see SHARED for what must match).
+            rngs (list): One np.random.Generator per replica (default: seeded from each RANDOM_SEED).
+            capacity (int): Initial pool size.
+        """
+        self._replica = np.empty(capacity, dtype=np.int32)
+        super().__init__(rngs[0] if rngs else None, capacity, settings=members[0])
+        self.members = list(members)
+        self.replicas = len(self.members)
+        self.rngs = list(rngs) if rngs is not None else [make_rng(member.RANDOM_SEED) for member in self.members]
+        self.cells_per_replica = self.grid_size * self.grid_size
+        self.fidelities = [member.fidelity for member in self.members]
+        self.kernel_cdfs = [np.array(member.kernel_cdf) for member in self.members]
+        self.absorbed = np.zeros(self.replicas, dtype=np.int64)
+
+        # The scratch lattices of the base class cover one lattice; the block replay needs all of them.
+        cells = self.replicas * self.cells_per_replica
+        self._occupancy = np.zeros(cells, dtype=np.int16)
+        self._first = np.zeros(cells, dtype=np.int16)
+        self._last = np.zeros(cells, dtype=np.int16)
+
+    @property
+    def replica(self):
+        return self._replica[:self.count]
+
+    def sizes(self):
+        """(K,) live ants of every replica."""
+        return np.bincount(self.replica, minlength=self.replicas)
+
+    def spawn(self, counts, position):
+        """
+        Releases counts[k] new ants at `position` in every replica k (an int releases the same number in all).
+
+        New ants go to the end of their replica's segment, so each replica keeps its release order.
+        """
+        counts = np.broadcast_to(counts, (self.replicas,))
+        total = int(counts.sum())
+        if(total <= 0):
+            return
+        self.reserve(self.count + total)
+        start = self.count
+        for k, (count, rng) in enumerate(zip(counts, self.rngs)):
+            if(count <= 0):
+                continue
+            new = slice(start, start + count)
+            self._pos[new] = position
+            self._heading[new] = rng.choice(INITIAL_HEADINGS, size=count)
+            self._mode[new] = 0
+            self._replica[new] = k
+            start += count
+        self.count = start
+
+        # Stable sort by replica: moves the new ants behind the older ones of their replica.
+        order = np.argsort(self.replica, kind="stable")
+        for name in self.POOL:
+            values = getattr(self, name)
+            values[:self.count] = values[:self.count][order]
+
+    def _cell_offset(self, chunk):
+        return self.replica[chunk].astype(np.int64) * self.cells_per_replica
+
+    def _pieces(self):
+        """(replica, slice) of each replica's ants in the blocks a lone colony would move them in."""
+        pieces = []
+        start = 0
+        for k, size in enumerate(self.sizes().tolist()):
+            for offset in range(0, size, self.CHUNK_SIZE):
+                pieces.append((k, slice(start + offset, start + min(offset + self.CHUNK_SIZE, size))))
+            start += size
+        return pieces
+
+    def _blocks(self, n):
+        """
+        The serial blocks of every replica, with consecutive small ones packed into one.
+
+        The deposit replay inside a block is exact, but block borders within one replica are not
+        invisible (see check_for_trail), so each replica's borders stay where a serial run has them.
+        Only a replica's last block can be short, so a packed block never holds two blocks of one replica.
+        """
+        blocks = []
+        for _, piece in self._pieces():
+            if(blocks and piece.stop - blocks[-1].start <= self.CHUNK_SIZE):
+                blocks[-1] = slice(blocks[-1].start, piece.stop)
+            else:
+                blocks.append(piece)
+        return blocks
+
+    def _draw(self):
+        """Rolls every ant's fidelity and turn for this tick from its replica's generator, block by block."""
+        self._stays = np.empty(self.count, dtype=bool)
+        self._turns = np.empty(self.count, dtype=np.int64)
+        for k, piece in self._pieces():
+            rng = self.rngs[k]
+            length = piece.stop - piece.start
+            self._stays[piece] = rng.random(length) < self.fidelities[k]
+            self._turns[piece] = np.searchsorted(self.kernel_cdfs[k], rng.random(length), side="right")
+
+    def _decide(self, chunk):
+        return self._stays[chunk], self._turns[chunk]
+
+    def move(self, grid):
+        """
+        Advances every replica by one step (see AntColony.move).
+
+        Returns:
+            np.ndarray: (K,) ants that left each replica's lattice this tick.
+        """
+        self._draw()
+        before = self.sizes()
+        absorbed = self.absorbed.copy()
+        super().move(grid)
+        removed = before - self.sizes()
+        # The base class only counts the total; keep the count per replica instead.
+        self.absorbed = absorbed + removed
+        return removed
+
+    def count_modes(self):
+        """(K, 2) [explorers, followers] of every replica."""
+        followers = np.bincount(self.replica, weights=self.mode, minlength=self.replicas).astype(np.int64)
+        return np.stack((self.sizes() - followers, followers), axis=1)
+
+
+class Ensemble:
+    """
+    Runs K replicas of the simulation as one batched program.
+
+    Steps like Simulation (burst, evaporation, one release per tick, move) but for every replica at once:
+    one (K, size, size) pheromone field and one EnsembleColony, so a tick costs a few array operations
+    for the whole ensemble instead of a Python-level tick per replica. Headless only.
+    """
+
+    def __init__(self, members):
+        """
+        Args:
+            members (list): SimulationConfig of every replica, e.g. one per seed (see SHARED).
+        """
+        if(not members):
+            raise ValueError("An ensemble needs at least one member")
+        first = members[0]
+        for name in SHARED:
+            values = {getattr(member, name) for member in members}
+            if(len(values) > 1):
+                raise ValueError(f"Ensemble members must share {name}, got {sorted(values, key=str)}")
+        self.members = list(members)
+        self.settings = first
+        self.colony = EnsembleColony(self.members)
+        self.colony.reserve(sum(member.max_population for member in self.members))
+        self.field = make_field(settings=first, replicas=len(self.members))
+        self.tick = 0
+
+    def __len__(self):
+        return len(self.members)
+
+    @property
+    def grid(self):
+        """The (K, size, size) pheromone grids (brought up to date first if evaporation is lazy)."""
+        return self.field.to_array()
+
+    def step(self):
+        """Advances every replica by a single tick (same order of work as Simulation.step)."""
+        center = self.settings.center
+        if(self.tick == 0):
+            self.colony.spawn([member.INITIAL_BURST_SIZE for member in self.members], center)
+        self.field.evaporate()
+        self.colony.spawn([int(self.tick < member.TIMESTEP_STOP) for member in self.members], center)
+        self.colony.move(self.field)
+        self.tick += 1
+
+    def loop(self, verbose=False):
+        """
+        Runs every replica to TIMESTEPS.
+
+        Returns:
+            list: One calculate_stats() result per replica.
+        """
+        timesteps = self.settings.TIMESTEPS
+        while self.tick < timesteps:
+            self.step()
+            if(verbose):
+                print(f'\rProgress: {round((self.tick / timesteps) * 100, 1)}%', end="")
+        if(verbose):
+            print()
+        return self.calculate_stats()
+
+    def calculate_stats(self):
+        """The Followers-to-Lost ratio of every replica, as a list of (F/L ratio, [lost, followers]) like Simulation."""
+        stats = []
+        for lost, followers in self.colony.count_modes().tolist():
+            ratio = followers / lost if lost != 0 else 0
+            stats.append((ratio, [lost, followers]))
+        return stats
+
+
+def run_batch(members, figures=None, store=None):
+    """
+    Runs one Ensemble of `members` to completion. Returns one calculate_stats() result per member.
+
+    Args:
+        figures (list): Path per member to write a PNG of its final state to (None to skip a member).
+        store (str): Results store directory (see store.py) to add every member to, with its final grid
+            and ant positions (there are no per-tick statistics to keep).
+    """
+    ensemble = Ensemble(members)
+    stats = ensemble.loop()
+    grids, colony = ensemble.grid, ensemble.colony
+    if(figures is not None):
+        for k, path in enumerate(figures):
+            if(path is not None):
+                write_png(path, render_frame(colony.pos[colony.replica == k], grids[k]))
+    if(store is not None):
+        from store import ResultStore
+        with ResultStore(store) as results:
+            for k, (member, result) in enumerate(zip(members, stats)):
+                results.put(member, result, engine="ensemble", grid=grids[k], positions=colony.pos[colony.replica == k])
+    return stats
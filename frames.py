@@ -0,0 +1,192 @@
+# frames.py
+import os
+import queue
+import struct
+import threading
+import zlib
+import numpy as np
+from raster import ant_density, block_max, density_rgb, pheromone_rgb
+from viewport import DETAIL_SCALE, Viewport
+
+# zlib level of the exported PNGs. Frames are mostly black, so a fast level compresses them almost as well.
+COMPRESSION = 3
+
+
+def frame_scale(grid_size):
+    """
+    Pixels per cell of an exported frame: the GUI's view of the whole lattice (see viewport.Viewport).
+
+    3 for the paper's 256 x 256 grid (a 768 px image, like the captured figures); larger lattices get
+    less than one pixel per cell so the image stays at most MAX_PANEL_SIZE wide.
+    """
+    return Viewport(grid_size).fit_scale
+
+
+def render_frame(positions, grid, scale=None):
+    """
+    Draws one simulation state offscreen, the way the GUI shows the whole lattice. No pygame.
+
+    Close up (scale >= DETAIL_SCALE) the ants are red discs under the pheromone trails, as in
+    GUI.draw_frame; further out several cells share a pixel (each showing its strongest cell, see
+    raster.block_max) and the ants are a density layer on top of the trails.
+
+    Args:
+        positions (np.ndarray): (n, 2) ant (x, y) positions.
+        grid (np.ndarray): The 2D pheromone grid, indexed [x, y].
+        scale (float): Pixels per cell (default: frame_scale(grid size)); from 1 up, whole pixels only.
+
+    Returns:
+        np.ndarray: (width, height, 3) uint8 image, indexed [x, y] like pheromone_rgb().
+    """
+    grid = np.asarray(grid)
+    size = grid.shape[0]
+    if(scale is None):
+        scale = frame_scale(size)
+    window = (0, size, 0, grid.shape[1])
+    if(scale < 1):
+        # Cells per pixel, as in Viewport.step.
+        step = int(np.ceil(1 / scale - 1e-9))
+        image = pheromone_rgb(block_max(grid, step))
+        density = density_rgb(ant_density(positions, window, step))
+        ants = density[..., 0] > 0
+        image[ants] = density[ants]
+        return image
+
+    pixels = int(scale)
+    cells = pheromone_rgb(grid)
+    trails = cells.repeat(pixels, axis=0).repeat(pixels, axis=1)
+    if(scale < DETAIL_SCALE):
+        image = trails
+        density = density_rgb(ant_density(positions, window)).repeat(pixels, axis=0).repeat(pixels, axis=1)
+        ants = density[..., 0] > 0
+        image[ants] = density[ants]
+        return image
+
+    # Every occupied cell once (ants sharing a cell are one disc anyway), then all discs in one scatter.
+    occupied = np.nonzero(ant_density(positions, window))
+    # A disc of radius 1.5 cells around the cell's center, like GUI.draw_ant: the offsets (from the
+    # cell's first pixel) of every pixel whose center lies inside it.
+    radius = 1.5 * pixels
+    reach = int(np.ceil(radius))
+    dx, dy = np.mgrid[-reach:pixels + reach, -reach:pixels + reach]
+    inside = (dx + 0.5 - pixels / 2) ** 2 + (dy + 0.5 - pixels / 2) ** 2 <= radius ** 2
+    dx, dy = dx[inside], dy[inside]
+    px = (occupied[0] * pixels)[:, None] + dx
+    py = (occupied[1] * pixels)[:, None] + dy
+    keep = (px >= 0) & (px < trails.shape[0]) & (py >= 0) & (py < trails.shape[1])
+    px, py = px[keep], py[keep]
+    # The trails go on top of the ants with black as transparent, so an ant pixel only shows on an empty cell.
+    empty = ~cells[px // pixels, py // pixels].any(axis=1)
+    trails[px[empty], py[empty]] = (255, 0, 0)
+    return trails
+
+
+def _chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+
+def encode_png(image, level=COMPRESSION):
+    """
+    Encodes an RGB image as PNG bytes with zlib only (no imaging library needed).
+
+    Args:
+        image (np.ndarray): (width, height, 3) uint8 image indexed [x, y], as from render_frame().
+        level (int): zlib compression level.
+    """
+    rows = np.ascontiguousarray(np.asarray(image, dtype=np.uint8).transpose(1, 0, 2))
+    height, width = rows.shape[:2]
+    # Filter type 0 (none) in front of every row.
+    raw = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 1:] = rows.reshape(height, width * 3)
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + _chunk(b"IHDR", header)
+            + _chunk(b"IDAT", zlib.compress(raw.tobytes(), level)) + _chunk(b"IEND", b""))
+
+
+def write_png(path, image, level=COMPRESSION):
+    """Writes an image as a PNG file; it appears under its name only once complete."""
+    partial = path + ".part"
+    with open(partial, "wb") as f:
+        f.write(encode_png(image, level))
+    os.replace(partial, path)
+
+
+class FrameExporter:
+    """
+    Exports frames of a running simulation as a PNG image sequence (see Simulation(frames=...)).
+
+    Frames are taken every `every` ticks and/or at chosen ticks (e.g. t=1500 for Figure 3).
+    record() only copies the ant positions and the grid; drawing, encoding and writing happen on
+    a background thread, so the tick loop runs at simulation speed. At most `queue_size` frames
+    wait in memory: if the disk falls behind, record() waits until one has been written.
+
+    Attributes:
+        written (list): Paths of the frames written so far, in tick order.
+    """
+
+    def __init__(self, path, every=0, ticks=(), scale=None, queue_size=8, level=COMPRESSION):
+        """
+        Args:
+            path (str): Directory the frames are written to, as frame_<tick>.png (created if needed).
+            every (int): Export every Nth tick (0 for none).
+            ticks (iterable): Further ticks to export.
+            scale (float): Pixels per cell (default: frame_scale(grid size)).
+            queue_size (int): Frames that may wait for the writer thread.
+            level (int): zlib compression level.
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.every = every
+        self.ticks = frozenset(ticks)
+        self.scale = scale
+        self.level = level
+        self.written = []
+        self._error = None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    def due(self, tick):
+        """Whether a frame is wanted at this tick (checked before building the grid)."""
+        return (self.every > 0 and tick % self.every == 0) or tick in self.ticks
+
+    def frame_path(self, tick):
+        return os.path.join(self.path, f"frame_{tick:06d}.png")
+
+    def record(self, tick, positions, grid):
+        """
+        Queues one frame for export.
+
+        Args:
+            tick (int): Simulation tick.
+            positions (np.ndarray): (n, 2) ant positions.
+            grid (np.ndarray): The 2D pheromone grid.
+        """
+        if(self._error is not None):
+            raise RuntimeError("Frame writer thread failed") from self._error
+        # Copies: the simulation updates its arrays in place as soon as this returns.
+        self._queue.put((tick, np.array(positions), np.array(grid)))
+
+    def _write_loop(self):
+        """Writer thread: draws, encodes and writes queued frames until close() sends None."""
+        try:
+            while True:
+                item = self._queue.get()
+                if(item is None):
+                    return
+                tick, positions, grid = item
+                path = self.frame_path(tick)
+                write_png(path, render_frame(positions, grid, self.scale), self.level)
+                self.written.append(path)
+        except Exception as error:
+            self._error = error
+            # Keep draining so record() never blocks on a queue nobody empties.
+            while self._queue.get() is not None:
+                pass
+
+    def close(self):
+        """Waits for the queued frames to be written."""
+        self._queue.put(None)
+        self._thread.join()
+        if(self._error is not None):
+            raise RuntimeError("Frame writer thread failed") from self._error
@@ -4,6 +4,16 @@ os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
 import pygame
 import numpy as np
 import config
+from raster import ant_density, block_max, density_rgb, pheromone_rgb
+from viewport import Viewport
+
+# Sprites drawn one by one at most; with more occupied cells in view the ants are drawn
+# as a density layer even when zoomed in, so a frame never costs more than this many draw calls.
+MAX_ANT_SPRITES = 4096
+
+# Pixels the view moves per W/A/S/D key press, and the zoom step of the mouse wheel and +/- keys.
+PAN_STEP = 64
+ZOOM_STEP = 1.25
 
 class GUI:
     """
@@ -11,26 +21,49 @@ class GUI:
     
     Renders the discrete grid state using Pygame, mapping pheromone 
     concentrations to visual color gradients (Blue) and ants to agents (Red).
+
+    Only the part of the grid inside the viewport (see viewport.py) is drawn. Zoomed out, several cells
+    share a pixel and the ants are drawn as one density layer instead of one circle each,
+    so the cost of a frame depends on the window size, not on the grid size or the colony size.
+
+    Controls:
+        Mouse wheel or + / -: zoom (at the cursor).   Drag or W / A / S / D: pan.   0: show the whole grid.
     """
     
-    def __init__(self):
+    def __init__(self, panels=1, grid_size=None, size=None):
         """
         Initializes the Pygame window.
         
         Scales the internal simulation grid by a factor of 3 for visibility 
         on standard displays (256x256 pixels is too small to see details).
+        Larger grids are scaled down to fit (see viewport.MAX_PANEL_SIZE).
+        
+        Args:
+            panels (int): Number of grids shown side by side (e.g. to compare replays).
+            grid_size (int): Side length of the shown grids (default: config.GRID_SIZE).
+            size (int): Side length of each panel in pixels (default: see Viewport).
         """
         pygame.init()
-        self.screen = pygame.display.set_mode((config.GRID_SIZE * 3, config.GRID_SIZE * 3))
+        grid_size = config.GRID_SIZE if grid_size is None else grid_size
+        # One viewport for all panels, so side-by-side replays always show the same cells.
+        self.view = Viewport(grid_size, size)
+        size = self.view.size
+        self.window = pygame.display.set_mode((size * panels, size))
+        # Each panel is a view into the window; drawing always targets self.screen.
+        self.panels = [self.window.subsurface((i * size, 0, size, size)) for i in range(panels)]
+        self.screen = self.panels[0]
         self.clock = pygame.time.Clock()
+        # One texel surface per shape, reused between frames while the view stays the same.
+        self._surfaces = {}
         
-    def loop(self, ant_pos = (0, 0), grid = []):
+    def loop(self, ant_pos = (0, 0), grid = [], fps = 60):
         """
         Executes a single render cycle.
         
         Args:
             ant_pos (list): List of (row, col) tuples for all active ants.
             grid (np.ndarray): The current pheromone concentration matrix.
+            fps (int): Frame rate cap of the window (0 for uncapped).
             
         Returns:
             bool: False if the user closed the window (stopping the sim), True otherwise.
@@ -39,46 +72,144 @@ class GUI:
             if(event.type == pygame.QUIT): 
                 pygame.quit()
                 return False
+            self.handle_view_event(event)
             
-        self.screen.fill('black')
-        # Draw all ants first
-        for pos in ant_pos:
-            self.draw_ant((pos[0] * 3, pos[1] * 3))
-            
-        # Draw the pheromone trails on top of the ants
-        self.draw_grid(grid)
+        self.draw_frame(ant_pos, grid)
 
         pygame.display.flip()
-        self.clock.tick(60)
+        self.clock.tick(fps)
+        return True
+
+    def handle_view_event(self, event):
+        """
+        Pans or zooms the view for mouse and key events.
+
+        Returns:
+            bool: True if the event was used.
+        """
+        view = self.view
+        if(event.type == pygame.MOUSEWHEEL):
+            x, y = pygame.mouse.get_pos()
+            view.zoom(ZOOM_STEP ** event.y, (x % view.size, y))
+        elif(event.type == pygame.MOUSEMOTION and event.buttons[0]):
+            view.pan(-event.rel[0], -event.rel[1])
+        elif(event.type == pygame.KEYDOWN and event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS)):
+            view.zoom(ZOOM_STEP)
+        elif(event.type == pygame.KEYDOWN and event.key in (pygame.K_MINUS, pygame.K_KP_MINUS)):
+            view.zoom(1 / ZOOM_STEP)
+        elif(event.type == pygame.KEYDOWN and event.key == pygame.K_0):
+            view.reset()
+        elif(event.type == pygame.KEYDOWN and event.key in (pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d)):
+            dx = {pygame.K_a: -PAN_STEP, pygame.K_d: PAN_STEP}.get(event.key, 0)
+            dy = {pygame.K_w: -PAN_STEP, pygame.K_s: PAN_STEP}.get(event.key, 0)
+            view.pan(dx, dy)
+        else:
+            return False
         return True
         
+    def draw_frame(self, ant_pos, grid, panel=0):
+        """
+        Draws one simulation state into a panel of the window (shown on the next flip).
+        
+        Args:
+            ant_pos (list): List of (row, col) tuples for all active ants.
+            grid (np.ndarray): The pheromone concentration matrix.
+            panel (int): Which panel to draw into.
+        """
+        self.screen = self.panels[panel]
+        self.screen.fill('black')
+        cells = self.sprite_cells(ant_pos)
+        # Close up, draw the ants first and the pheromone trails on top of them (black is transparent).
+        if(cells is not None):
+            self.draw_sprites(cells)
+        self.draw_grid(grid)
+        # Zoomed out, the density layer goes on top, or the trails the ants walk on would hide it.
+        if(cells is None):
+            self.draw_density(ant_pos)
+
+    def draw_ants(self, ant_pos):
+        """Draws the ants at the current level of detail: one circle each, or a density layer."""
+        cells = self.sprite_cells(ant_pos)
+        if(cells is None):
+            self.draw_density(ant_pos)
+        else:
+            self.draw_sprites(cells)
+        
     def quit_gui(self):
         """Clean exit for the display window."""
         pygame.quit()
 
     def draw_ant(self, position):
-        """Renders a single ant as a red circle."""
-        pygame.draw.circle(self.screen, "red", position, 4.5)
+        """Renders a single ant as a red circle (4.5 pixels at the default 3 pixels per cell)."""
+        pygame.draw.circle(self.screen, "red", position, 1.5 * self.view.scale)
+
+    def sprite_cells(self, ant_pos):
+        """
+        The distinct visible cells holding ants, if they are few and large enough to draw one by one.
+
+        Returns:
+            np.ndarray: (k, 2) cells, or None when the ants should be drawn as a density layer.
+        """
+        if(not self.view.detailed):
+            return None
+        window = self.view.window()
+        positions = np.asarray(ant_pos).reshape(-1, 2)
+        if(len(positions) <= MAX_ANT_SPRITES):
+            x, y = positions[:, 0], positions[:, 1]
+            return positions[(x >= window[0]) & (x < window[1]) & (y >= window[2]) & (y < window[3])]
+        # Ants on one cell are drawn as one circle anyway: count the occupied cells with one histogram.
+        occupied = np.nonzero(ant_density(positions, window))
+        if(len(occupied[0]) > MAX_ANT_SPRITES):
+            return None
+        return np.stack((occupied[0] + window[0], occupied[1] + window[2]), axis=1)
+
+    def draw_sprites(self, cells):
+        """Draws an ant circle on each of the given cells."""
+        px, py = self.view.to_pixel(cells[:, 0], cells[:, 1])
+        for position in zip(px.tolist(), py.tolist()):
+            self.draw_ant(position)
+
+    def draw_density(self, ant_pos):
+        """Draws the ants as one density layer: a histogram of the visible positions, blitted as a single surface."""
+        window = self.view.window()
+        counts = ant_density(ant_pos, window, self.view.step)
+        self._blit_texels(density_rgb(counts), window)
         
     def draw_grid(self, grid):
         """
         Renders the pheromone field as a heatmap.
         
-        Iterates through the grid and maps pheromone concentration to color lightness.
+        Maps the visible part of the grid to colors in one array operation (see raster.pheromone_rgb)
+        and blits it scaled to the view, so a frame costs the same however many cells hold pheromone.
+        When zoomed out, each pixel shows the strongest of the cells it covers (see raster.block_max).
         Dark Blue = Low Concentration -> Bright Blue/White = High Concentration.
         """
-        blue = pygame.Color(0, 0, 255)
-        
-        # Optimize rendering: only draw cells with active pheromone
-        # (Drawing 256*256 circles every frame is expensive, but most cells are empty)
-        for y, x in np.ndindex(grid.shape):
-            value = grid[y, x]
-            if(value > 0):
-                # Map concentration value to HSL Lightness (0-100).
-                # The 0.075 multiplier scales the raw value to a visible range.
-                # Cap at 100 to prevent color wrapping errors.
-                # light_value = min(100, 0 + (value * 0.075))
-                light_value = min(100, 0 + (value * config.GUI_TRAIL_SCALE))
-                blue.hsla = (240, 100, light_value, 100)
-                # Draw scaled pixel (x3 size)
-                pygame.draw.circle(self.screen, blue, (y * 3, x * 3), 3)
\ No newline at end of file
+        window = self.view.window()
+        x0, x1, y0, y1 = window
+        visible = block_max(np.asarray(grid)[x0:x1, y0:y1], self.view.step)
+        self._blit_texels(pheromone_rgb(visible), window)
+
+    def _blit_texels(self, rgb, window):
+        """
+        Blits an image of the window's cells (step x step cells per texel) onto the panel, scaled to the view.
+
+        Black texels are transparent.
+        """
+        x0, x1, y0, y1 = window
+        view = self.view
+        shape = rgb.shape[:2]
+        if(shape[0] == 0 or shape[1] == 0):
+            return
+        surface = self._surfaces.get(shape)
+        if(surface is None):
+            surface = self._surfaces[shape] = pygame.Surface(shape, depth=32)
+        pygame.surfarray.blit_array(surface, rgb)
+
+        # Texel (i, j) covers cells x0 + i * step ... and cell x spans x - 0.5 ... x + 0.5.
+        left, top = view.to_pixel(x0 - 0.5, y0 - 0.5)
+        right, bottom = view.to_pixel(x0 + shape[0] * view.step - 0.5, y0 + shape[1] * view.step - 0.5)
+        left, top = int(np.floor(left + 0.5)), int(np.floor(top + 0.5))
+        size = (int(np.floor(right + 0.5)) - left, int(np.floor(bottom + 0.5)) - top)
+        scaled = pygame.transform.scale(surface, size)
+        scaled.set_colorkey((0, 0, 0))
+        self.screen.blit(scaled, (left, top))
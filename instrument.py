@@ -0,0 +1,247 @@
+# instrument.py
+import collections
+import cProfile
+import os
+import signal
+import time
+import numpy as np
+
+# Timed phases of a tick, in loop order. record and render are the loop's work after step().
+PHASES = ("evaporate", "spawn", "move", "record", "render")
+
+# Per-tick counts. occupied is the number of grid cells holding pheromone (-1 on ticks it was not sampled).
+COUNTERS = ("ants", "spawned", "moved", "removed", "occupied")
+
+
+class StackSampler:
+    """
+    Minimal sampling profiler: records the main thread's call stack on a CPU-time timer (Unix only).
+
+    Unlike cProfile it does not slow down every call, only interrupts the run every `interval` seconds.
+    dump_stats() writes one "outer;inner;... count" line per distinct stack (the collapsed format
+    read by flame graph tools). Same enable/disable/dump_stats interface as cProfile.Profile.
+    """
+
+    def __init__(self, interval=0.001):
+        self.interval = interval
+        self.counts = collections.Counter()
+
+    def _sample(self, signum, frame):
+        stack = []
+        while frame is not None:
+            stack.append(f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}")
+            frame = frame.f_back
+        self.counts[";".join(reversed(stack))] += 1
+
+    def enable(self):
+        signal.signal(signal.SIGPROF, self._sample)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def disable(self):
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, signal.SIG_DFL)
+
+    def dump_stats(self, path):
+        with open(path, "w") as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+PROFILERS = {
+    "cprofile": cProfile.Profile,
+    "sample": StackSampler,
+}
+
+
+class Instrumentation:
+    """
+    Times every phase of the tick loop and counts what each tick did.
+
+    Simulation calls begin() at the start of a tick and lap() after each phase; counts are added with count().
+    A tick's row is completed when the next tick begins (so the loop's record and render work after step()
+    still lands in it) and stored in a fixed-size ring buffer. Every `export_every` ticks the new rows are
+    written out: appended to a CSV file (started afresh when the instrumentation is created), or, for any other file name, summarized as running totals in a
+    Prometheus-style metrics text file.
+
+    A profiler (cProfile, or the StackSampler) can be switched on for a window of ticks.
+
+    Simulation only calls into this class when one is attached, so an uninstrumented run pays
+    a single `is None` check per phase.
+
+    Attributes:
+        times (np.ndarray): (capacity, len(PHASES)) seconds spent in each phase, ring-buffered.
+        counts (np.ndarray): (capacity, len(COUNTERS)) counts of each tick, ring-buffered.
+        ticks (np.ndarray): (capacity,) tick of each row.
+        rows (int): Number of ticks completed so far (row i lives at index i % capacity).
+    """
+
+    def __init__(self, path=None, export_every=100, capacity=4096, occupancy_every=10,
+                 profile=None, profiler="cprofile", profile_out=None):
+        """
+        Args:
+            path (str): CSV (".csv") or metrics text file to export to (None keeps the data in memory only).
+            export_every (int): Export after this many completed ticks (at most `capacity`).
+            capacity (int): Ticks kept in the ring buffer.
+            occupancy_every (int): Count occupied grid cells every K ticks (0 to never). Counting reads
+                the whole grid, so it is sampled rather than done every tick.
+            profile (tuple): (start, stop) tick window to profile, or None.
+            profiler (str): "cprofile" or "sample" (see PROFILERS).
+            profile_out (str): Where to write the profile (default: profile.prof / profile.folded).
+        """
+        if(export_every > capacity):
+            raise ValueError(f"export_every ({export_every}) must not exceed the buffer capacity ({capacity})")
+        self.path = path
+        self.export_every = export_every
+        self.capacity = capacity
+        self.occupancy_every = occupancy_every
+
+        self.times = np.zeros((capacity, len(PHASES)))
+        self.counts = np.zeros((capacity, len(COUNTERS)), dtype=np.int64)
+        self.ticks = np.zeros(capacity, dtype=np.int64)
+        self.rows = 0
+        self.exported = 0
+        self.totals = np.zeros(len(PHASES))
+        self.count_totals = np.zeros(len(COUNTERS), dtype=np.int64)
+        self.last_ants = 0
+
+        self.profile = profile
+        self.profiler = PROFILERS[profiler]() if profile is not None else None
+        self.profile_out = profile_out or ("profile.prof" if profiler == "cprofile" else "profile.folded")
+        self._profiling = False
+
+        # The open row: plain Python lists, so lap() and count() stay cheap.
+        self._tick = None
+        self._times = [0.0] * len(PHASES)
+        self._counts = [0] * len(COUNTERS)
+        self._field = None
+        self._last = 0.0
+        self._phase = {name: i for i, name in enumerate(PHASES)}
+        self._counter = {name: i for i, name in enumerate(COUNTERS)}
+        self._clock = time.perf_counter
+
+        # A new run starts a new table: an existing CSV file is overwritten, not appended to.
+        if(path is not None and path.endswith(".csv")):
+            with open(path, "w") as f:
+                f.write(",".join(("tick",) + tuple(f"{name}_s" for name in PHASES) + COUNTERS) + "\n")
+
+    def begin(self, tick, field=None):
+        """Completes the previous tick's row and starts timing `tick` (on `field`, for the occupancy count)."""
+        if(self._tick is not None):
+            self._commit()
+        if(self.profiler is not None):
+            self._toggle_profiler(tick)
+        self._tick = tick
+        self._field = field
+        self._times = [0.0] * len(PHASES)
+        self._counts = [0] * len(COUNTERS)
+        self._last = self._clock()
+
+    def lap(self, phase):
+        """Adds the time since the previous lap (or begin) to `phase`."""
+        now = self._clock()
+        self._times[self._phase[phase]] += now - self._last
+        self._last = now
+
+    def count(self, **counts):
+        """Adds to the open row's counters, e.g. count(spawned=1, removed=3)."""
+        for name, value in counts.items():
+            self._counts[self._counter[name]] += value
+
+    def _commit(self):
+        """Stores the open row in the ring buffer and exports if due."""
+        occupied = -1
+        if(self._field is not None and self.occupancy_every > 0 and self._tick % self.occupancy_every == 0):
+            occupied = int(np.count_nonzero(self._field.to_array()))
+        self._counts[self._counter["occupied"]] = occupied
+
+        i = self.rows % self.capacity
+        self.ticks[i] = self._tick
+        self.times[i] = self._times
+        self.counts[i] = self._counts
+        self.rows += 1
+        self._tick = None
+        if(self.rows - self.exported >= self.export_every):
+            self.export()
+
+    def _toggle_profiler(self, tick):
+        start, stop = self.profile
+        if(not self._profiling and start <= tick < stop):
+            self.profiler.enable()
+            self._profiling = True
+        elif(self._profiling and tick >= stop):
+            self._stop_profiler()
+
+    def _stop_profiler(self):
+        self.profiler.disable()
+        self._profiling = False
+        self.profiler.dump_stats(self.profile_out)
+
+    def recent(self):
+        """
+        The rows still in the ring buffer, oldest first.
+
+        Returns:
+            tuple: (ticks (n,), times (n, len(PHASES)), counts (n, len(COUNTERS))).
+        """
+        n = min(self.rows, self.capacity)
+        order = np.arange(self.rows - n, self.rows) % self.capacity
+        return self.ticks[order], self.times[order], self.counts[order]
+
+    def export(self):
+        """Writes the rows completed since the last export (CSV) or the updated totals (metrics file)."""
+        first = max(self.exported, self.rows - self.capacity)
+        order = np.arange(first, self.rows) % self.capacity
+        self.totals += self.times[order].sum(axis=0)
+        counts = self.counts[order]
+        # occupied is a sample, not a sum; the totals keep the latest sampled value.
+        sampled = counts[:, -1][counts[:, -1] >= 0]
+        self.count_totals[:-1] += counts[:, :-1].sum(axis=0)
+        if(len(sampled)):
+            self.count_totals[-1] = sampled[-1]
+        if(len(counts)):
+            self.last_ants = int(counts[-1, 0])
+        self.exported = self.rows
+
+        if(self.path is None or len(order) == 0):
+            return
+        if(self.path.endswith(".csv")):
+            with open(self.path, "a") as f:
+                for i in order:
+                    times = ",".join(f"{value:.9f}" for value in self.times[i])
+                    counts = ",".join(str(value) for value in self.counts[i])
+                    f.write(f"{self.ticks[i]},{times},{counts}\n")
+        else:
+            self._write_metrics()
+
+    def _write_metrics(self):
+        """Rewrites the metrics text file with the running totals (Prometheus text format)."""
+        lines = ["# TYPE ants_phase_seconds_total counter"]
+        lines += [f'ants_phase_seconds_total{{phase="{name}"}} {value:.9f}' for name, value in zip(PHASES, self.totals)]
+        lines.append("# TYPE ants_ticks_total counter")
+        lines.append(f"ants_ticks_total {self.rows}")
+        for name, value in zip(COUNTERS[1:-1], self.count_totals[1:-1]):
+            lines.append(f"# TYPE ants_{name}_total counter")
+            lines.append(f"ants_{name}_total {value}")
+        lines.append("# TYPE ants_live gauge")
+        lines.append(f"ants_live {self.last_ants}")
+        lines.append("# TYPE ants_occupied_cells gauge")
+        lines.append(f"ants_occupied_cells {self.count_totals[-1]}")
+        # Written next to the target and renamed, so a scraper never reads a half-written file.
+        with open(self.path + ".tmp", "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(self.path + ".tmp", self.path)
+
+    def summary(self):
+        """Mean milliseconds per tick of each phase over the buffered ticks, e.g. {"move": 1.2, ...}."""
+        _, times, _ = self.recent()
+        if(len(times) == 0):
+            return {name: 0.0 for name in PHASES}
+        return {name: float(value) * 1000 for name, value in zip(PHASES, times.mean(axis=0))}
+
+    def close(self):
+        """Completes the last row, exports everything left and writes the profile if it is still running."""
+        if(self._tick is not None):
+            self._commit()
+        if(self._profiling):
+            self._stop_profiler()
+        self.export()
@@ -1,12 +1,12 @@
 # main.py
 
-from ant import Ant
-from gui import GUI
+from colony import AntColony, make_rng
+from pheromone import make_field
+from settings import SimulationConfig
+from stats import StatsSeries
 import config
-import numpy as np
-import random
+import argparse
 import pickle
-import pygame
 
 class Simulation:    
     """
@@ -15,89 +15,195 @@ class Simulation:
     Manages the grid environment, ant population, and time-stepping.
     
     Note on Spawning:
-    This implementation supports an 'Initial Burst' of ants (configured in config.py).
+    This implementation supports an 'Initial Burst' of ants (INITIAL_BURST_SIZE).
     While the paper specifies a rate of 'one per iteration', 
     a burst is often necessary to reproduce the density of Figure 3 
     within the 1500-step limit.
+    
+    Note on Performance:
+    Ants are stored in an AntColony (structure-of-arrays), so every tick moves
+    the whole population with a few NumPy operations instead of a Python loop over Ant objects.
+
+    Note on Parameters:
+    Every model parameter is read from self.settings (a SimulationConfig), never from the config
+    module, so simulations with different parameters can run side by side in one process.
     """
-    if (config.RANDOM_SEED != None and config.RANDOM_SEED != ""):
-        random.seed(config.RANDOM_SEED)
     
-    def __init__(self):
-        self.released_ants: list[Ant] = []
-        self.gui = GUI()
+    def __init__(self, headless=False, render_every=1, max_fps=60, recorder=None, instrument=None, trails=None,
+                 settings=None, frames=None, convergence=None):
+        """
+        Args:
+            headless (bool): Run without a window. Pygame is never imported,
+                so the simulation works on machines without a display.
+            render_every (int): Send a frame to the window every Nth tick only.
+            max_fps (int): Frame rate cap of the window (None for uncapped).
+                Only the display is capped; the simulation always runs at full speed.
+            recorder (Recorder): Streams every tick to disk (see recorder.py); closed at the end of loop().
+            instrument (Instrumentation): Times the phases of every tick (see instrument.py); closed at the end of loop().
+            trails (TrailSeries): Measures the trail network every few ticks (see trails.py).
+            settings (SimulationConfig): Model parameters (default: SimulationConfig.current(),
+                i.e. the config.py values as they are when the simulation is built).
+            frames (FrameExporter): Writes PNG frames at chosen ticks, without a window (see frames.py); closed at the end of loop().
+            convergence (ConvergenceMonitor): Ends loop() early once the run is steady (see convergence.py).
+        """
+        self.settings = settings if settings is not None else SimulationConfig.current()
+        self.rng = make_rng(self.settings.RANDOM_SEED)
+        self.colony = AntColony(self.rng, settings=self.settings)
+        # The population can never exceed the burst plus one release per tick,
+        # so the ant pool is sized once and never grows during the run.
+        self.colony.reserve(self.settings.max_population)
+        self.recorder = recorder
+        self.instrument = instrument
+        self.trails = trails
+        self.frames = frames
+        self.convergence = convergence
+        if(convergence is not None):
+            # Defaults from this run: trail cells hold more than one fresh deposit, checks start once spawning stops.
+            if(convergence.threshold is None):
+                convergence.threshold = self.settings.deposit_amount
+            if(convergence.start is None):
+                convergence.start = self.settings.TIMESTEP_STOP
+        if(trails is not None and trails.threshold is None):
+            # One fresh deposit of this run's DEPOSITION_RATE, as in trails.analyze().
+            trails.threshold = self.settings.deposit_amount
+        self.display = None
+        if(not headless):
+            # Imported here so headless runs never load pygame (the window lives in its own process).
+            from display import Display
+            self.display = Display(render_every, max_fps, grid_size=self.settings.GRID_SIZE)
         # Initialize the pheromone grid to zero concentration.
-        self.grid = np.zeros((config.GRID_SIZE, config.GRID_SIZE))
+        # The field applies evaporation eagerly or lazily depending on EVAPORATION_MODE.
+        self.field = make_field(settings=self.settings)
+        self.tick = 0
+        # Colony statistics after every tick (see stats.py), filled from running counters.
+        self.stats = StatsSeries(max(self.settings.TIMESTEPS, 1))
+
+    @property
+    def grid(self):
+        """The full pheromone grid as a 2D array (brought up to date first if evaporation is lazy)."""
+        return self.field.to_array()
+
+    @grid.setter
+    def grid(self, values):
+        self.field.load(values)
         
-    def loop(self):
+    def step(self):
         """
-        Main execution loop.
+        Advances the simulation by a single tick.
         
-        Performs the following steps per tick:
-        1. Evaporates pheromone linearly (grid - EVAPORATION_RATE).
+        Performs the following steps:
+        1. Evaporates pheromone linearly (grid - EVAPORATION_RATE, see pheromone.py).
         2. Spawns new ants based on release settings.
         3. Moves all ants and deposits pheromone.
-        4. Updates the GUI.
         """
-        running = True
-        tick = 0
+        settings = self.settings
+        center = settings.center
+        # Instrumentation (see instrument.py) is optional; when it is off each phase costs one None check.
+        probe = self.instrument
+        if(probe is not None):
+            probe.begin(self.tick, self.field)
+            spawned = len(self.colony)
                         
         # Paper Ambiguity: The text specifies "releasing ants at a rate of one per iteration".
         # However, empirically, the distinct "X" pattern in Figure 3 only emerges 
         # if the environment is primed with a strong initial burst.
         # Without this, the 1500-step limit is too short for a single stream to build the network.
-        for _ in range(config.INITIAL_BURST_SIZE):
-            new_ant = Ant((config.GRID_SIZE // 2, config.GRID_SIZE // 2))
-            self.released_ants.append(new_ant)
-            
+        if(self.tick == 0):
+            self.colony.spawn(settings.INITIAL_BURST_SIZE, center)
+        if(probe is not None):
+            probe.lap("spawn")
+
+        # Evaporate BEFORE movement.
+        # This ensures ants interact with the most up-to-date grid state for this tick.
+        # If we evaporated after, ants would be sensing "old" pheromone that should have decayed.
+        self.field.evaporate()
+        if(probe is not None):
+            probe.lap("evaporate")
+
+        # Paper Ambiguity: Figure 3 captions show roughly 500 ants total at step 1500.
+        # A constant release rate of 1/tick would result in 1500+ ants.
+        # To match the visual density of the benchmark, we stop spawning at a cutoff point.
+        if(self.tick < settings.TIMESTEP_STOP):
+            self.colony.spawn(1, center)
+        if(probe is not None):
+            probe.lap("spawn")
+            moved = len(self.colony)
+            probe.count(spawned=moved - spawned, moved=moved)
+
+        # Move the whole colony at once. Ants deposit on their previous cell inside move(),
+        # and ants leaving the lattice are removed there (absorbing boundaries).
+        removed = self.colony.move(self.field)
+        if(probe is not None):
+            probe.lap("move")
+            probe.count(removed=removed, ants=len(self.colony))
+        self.tick += 1
+        self.stats.record(self.tick, self.colony, self.field)
         
-        while running and tick < config.TIMESTEPS:
-            # Evaporate BEFORE movement.
-            # This ensures ants interact with the most up-to-date grid state for this tick.
-            # If we evaporated after, ants would be sensing "old" pheromone that should have decayed.
-            self.grid = np.maximum(self.grid - config.EVAPORATION_RATE, 0)  
-            
-            # Paper Ambiguity: Figure 3 captions show roughly 500 ants total at step 1500.
-            # A constant release rate of 1/tick would result in 1500+ ants.
-            # To match the visual density of the benchmark, we stop spawning at a cutoff point.
-            if(tick < config.TIMESTEP_STOP):
-                new_ant = Ant((config.GRID_SIZE // 2, config.GRID_SIZE // 2))
-                self.released_ants.append(new_ant)
-            
-            ant_pos = []
-            # Use slice copy [:] to allow removing ants during iteration
-            for ant in self.released_ants[:]:
-                old_position = ant.get_pos()
-                in_bounds = ant.move(self.grid)
-                
-                # Absorbing boundaries: ants leaving the lattice are removed
-                if(not in_bounds): 
-                    self.released_ants.remove(ant)
-                    continue
-                
-                # Deposition: Ants add pheromone to their previous location (Rule 2)
-                # Adding the deposition rate + 1 here is neccessary due to the immediate
-                # evaporation in the next tick (at the top of the loop)
-                self.grid[old_position[0], old_position[1]] += config.DEPOSITION_RATE + 1
-                position = ant.get_pos()
-                ant_pos.append(position)
+    def loop(self, verbose=True):
+        """
+        Main execution loop.
+        
+        Calls step() until settings.TIMESTEPS is reached, or until the run is steady if a
+        convergence monitor is attached. With a window attached, snapshots are handed to the
+        render process after each tick; the simulation never waits for the screen, so it is
+        not limited to the display frame rate.
+        
+        Args:
+            verbose (bool): Print progress and the final statistics to the terminal.
+        """
+        running = True
+        timesteps = self.settings.TIMESTEPS
 
-                        
-            running = self.gui.loop(ant_pos, self.grid)
-            tick += 1
-            print(f'\rProgress: {round((tick / config.TIMESTEPS) * 100, 1)}%', end="")
-            # time.sleep(0.01)
-            
-        print("\nSIMULATION DONE")
+        while running and self.tick < timesteps:
+            self.step()
+
+            if(self.recorder is not None):
+                grid = self.grid if self.recorder.grid_due(self.tick) else None
+                self.recorder.record(self.tick, self.colony.get_positions(), self.colony.mode, grid)
+                if(self.instrument is not None):
+                    self.instrument.lap("record")
+            if(self.frames is not None and self.frames.due(self.tick)):
+                self.frames.record(self.tick, self.colony.get_positions(), self.grid)
+                if(self.instrument is not None):
+                    self.instrument.lap("record")
+            if(self.trails is not None and self.trails.due(self.tick)):
+                self.trails.record(self.tick, self.grid)
+            if(self.convergence is not None and self.convergence.due(self.tick)):
+                if(self.convergence.update(self.tick, self.stats, self.grid)):
+                    break
+            if(self.display is not None):
+                running = self.display.is_open()
+                if(running and self.display.due(self.tick)):
+                    running = self.display.publish(self.tick, self.colony.get_positions(), self.grid)
+                if(self.instrument is not None):
+                    self.instrument.lap("render")
+            if(verbose):
+                print(f'\rProgress: {round((self.tick / timesteps) * 100, 1)}%', end="")
             
-        stats = self.calculate_stats()
-        print(f'F-L Ratio: {round(stats[0], 3)}  |  Follower Ants: {stats[1][1]}  |  Lost Ants: {stats[1][0]}')
-        print("Press 'X' on the pygame window to complete the simulation")
-        
-        while running:
-            running = self.gui.loop(ant_pos, self.grid)
+        if(self.recorder is not None):
+            self.recorder.close(self.stats)
+        if(self.frames is not None):
+            self.frames.close()
+        if(self.instrument is not None):
+            self.instrument.close()
+
+        if(verbose):
+            print("\nSIMULATION DONE")
+            if(self.convergence is not None and self.convergence.converged_at is not None):
+                print(f"Converged at tick {self.convergence.converged_at}")
+            stats = self.calculate_stats()
+            print(f'F-L Ratio: {round(stats[0], 3)}  |  Follower Ants: {stats[1][1]}  |  Lost Ants: {stats[1][0]}')
+            if(self.instrument is not None):
+                phases = self.instrument.summary()
+                print("Mean ms per tick: " + "  |  ".join(f"{name}: {value:.3f}" for name, value in phases.items()))
         
-        self.gui.quit_gui()
+        if(self.display is not None):
+            if(running):
+                # Always show the final state, even if it was not due.
+                self.display.publish(self.tick, self.colony.get_positions(), self.grid, force=True)
+                print("Press 'X' on the pygame window to complete the simulation")
+                self.display.wait()
+            self.display.close()
         
         return self.calculate_stats()
 
@@ -108,13 +214,8 @@ class Simulation:
         
         A higher ratio indicates a stronger, more defined trail network.
         """
-        ants_mode = [0, 0]
-        for ant in self.released_ants:
-            if ant.mode == 0:
-                ants_mode[0] += 1
-            elif ant.mode == 1:
-                ants_mode[1] += 1
-                
+        ants_mode = self.colony.count_modes()
+
         if ants_mode[0] == 0:
             F_L_RATIO = 0
         else:
@@ -122,6 +223,128 @@ class Simulation:
         
         return (F_L_RATIO, ants_mode)
         
+def parse_seed(value):
+    """Keeps numeric seeds as integers; anything else is used as a string seed (like config.RANDOM_SEED)."""
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+def parse_window(value):
+    """Parses a START:STOP tick window, e.g. "500:600"."""
+    start, stop = value.split(":")
+    return int(start), int(stop)
+
+def parse_ticks(value):
+    """Parses a comma-separated list of ticks, e.g. "500,1000,1500"."""
+    return tuple(int(tick) for tick in value.split(","))
+
+def main(argv=None):
+    """
+    Command-line entry point.
+    
+    Runs the simulation to completion with the matching config.py values overridden
+    (in its SimulationConfig; the config module itself is left alone) and optionally pickles the calculate_stats() result (same layout as the runs/case*/data.pkl entries).
+    
+    Example:
+        python -m main --headless --ticks 1500 --fidelity 251 --seed 7 --out result.pkl
+        python -m main --headless --ticks 1000 --save warm       # warm-up, then continue it:
+        python -m main --headless --ticks 1500 --resume warm --fidelity 247
+        python -m main --headless --instrument ticks.csv --profile 500:600
+        python -m main --headless --frames frames --frames-at 500,1000,1500
+        python -m main --headless --fidelity 251 --seed 7 --store results   # served from the store if already run
+        
+    Returns:
+        tuple: The calculate_stats() result (F/L ratio, [lost, followers]).
+    """
+    parser = argparse.ArgumentParser(description="Ant trail formation (Watmough & Edelstein-Keshet, 1995).")
+    parser.add_argument("--ticks", type=int, default=config.TIMESTEPS, help="number of timesteps to simulate")
+    parser.add_argument("--fidelity", type=int, default=config.FIDELITY, help="trail fidelity on the paper's 0-255 scale")
+    parser.add_argument("--seed", type=parse_seed, default=config.RANDOM_SEED, help="random seed (integer or string)")
+    parser.add_argument("--out", default=None, help="pickle the final statistics to this file")
+    parser.add_argument("--headless", action="store_true", help="run without opening a pygame window")
+    parser.add_argument("--resume", default=None, help="continue from a checkpoint directory instead of starting at tick 0")
+    parser.add_argument("--save", default=None, help="write a checkpoint of the final state to this directory")
+    parser.add_argument("--record", default=None, help="stream every tick to this recording directory")
+    parser.add_argument("--record-grid-every", type=int, default=10, help="store a grid snapshot in the recording every K ticks")
+    parser.add_argument("--frames", default=None, help="export PNG frames (without a window) to this directory")
+    parser.add_argument("--frames-every", type=int, default=None, help="export a frame every K ticks (default: 100 unless --frames-at is given)")
+    parser.add_argument("--frames-at", type=parse_ticks, default=(), help="export frames at these ticks, e.g. 1500 or 500,1000")
+    parser.add_argument("--render-every", type=int, default=1, help="send a frame to the window every Nth tick")
+    parser.add_argument("--max-fps", type=int, default=60, help="frame rate cap of the window (0 for uncapped)")
+    parser.add_argument("--stats", default=None, help="write the per-tick colony statistics to this CSV file")
+    parser.add_argument("--trails", default=None, help="write trail network metrics to this CSV file")
+    parser.add_argument("--trails-every", type=int, default=50, help="measure the trail network every N ticks")
+    parser.add_argument("--instrument", default=None, help="time every tick phase and export to this .csv (or metrics text) file")
+    parser.add_argument("--instrument-every", type=int, default=100, help="export the instrumentation every N ticks")
+    parser.add_argument("--profile", type=parse_window, default=None, help="profile the ticks START:STOP")
+    parser.add_argument("--profiler", choices=("cprofile", "sample"), default="cprofile", help="profiler used for --profile")
+    parser.add_argument("--profile-out", default=None, help="file the profile is written to")
+    parser.add_argument("--store", default=None, help="results store directory: reuse a finished run, or add this one")
+    args = parser.parse_args(argv)
+    
+    settings = SimulationConfig.current(TIMESTEPS=args.ticks, FIDELITY=args.fidelity, RANDOM_SEED=args.seed)
+    store = None
+    if(args.store is not None):
+        from store import ResultStore, store_run
+        store = ResultStore(args.store)
+        # Only a plain headless run is fully described by its statistics; anything else is simulated.
+        outputs = (args.resume, args.save, args.record, args.frames, args.stats, args.trails, args.instrument, args.profile)
+        cached = store.get(settings) if args.headless and all(output is None for output in outputs) else None
+        if(cached is not None):
+            store.close()
+            print(f"Found in {args.store}: {cached['stats']}")
+            if(args.out is not None):
+                with open(args.out, "wb") as f:
+                    pickle.dump(cached["stats"], f)
+            return cached["stats"]
+    
+    options = {"headless": args.headless, "render_every": args.render_every, "max_fps": args.max_fps,
+               "settings": settings}
+    if(args.record is not None):
+        from recorder import Recorder
+        options["recorder"] = Recorder(args.record, args.record_grid_every, settings=settings)
+    if(args.frames is not None):
+        from frames import FrameExporter
+        every = args.frames_every if args.frames_every is not None else (0 if args.frames_at else 100)
+        options["frames"] = FrameExporter(args.frames, every, args.frames_at)
+    if(args.trails is not None):
+        from trails import TrailSeries
+        options["trails"] = TrailSeries(args.trails_every)
+    if(args.instrument is not None or args.profile is not None):
+        from instrument import Instrumentation
+        options["instrument"] = Instrumentation(
+            args.instrument, args.instrument_every, max(4096, args.instrument_every),
+            profile=args.profile, profiler=args.profiler, profile_out=args.profile_out,
+        )
+    if(args.resume is not None):
+        # Imported here because checkpoint.py builds on this module.
+        from checkpoint import restore
+        sim = restore(args.resume, **options)
+    else:
+        sim = Simulation(**options)
+    stats = sim.loop()
+
+    if(store is not None):
+        # A resumed run's result also depends on its checkpoint, which the key does not cover.
+        if(args.resume is None):
+            store_run(store, sim)
+        store.close()
+
+    if(args.save is not None):
+        from checkpoint import save_checkpoint
+        save_checkpoint(sim, args.save)
+    
+    if(args.stats is not None):
+        sim.stats.to_csv(args.stats)
+    if(args.trails is not None):
+        sim.trails.to_csv(args.trails)
+
+    if(args.out is not None):
+        with open(args.out, "wb") as f:
+            pickle.dump(stats, f)
+            
+    return stats
+        
 if __name__ == "__main__":
-    sim = Simulation()
-    sim.loop()
\ No newline at end of file
+    main()
@@ -0,0 +1,366 @@
+# meanfield.py
+import argparse
+import numpy as np
+from ant import TURN_OFFSETS, Ant
+from colony import DIRECTION_OFFSETS, INITIAL_HEADINGS
+from settings import SimulationConfig
+
+# Parameters every point of one MeanField must share: the lattice and the run length.
+# FIDELITY, TURNING_KERNEL, DEPOSITION_RATE, EVAPORATION_RATE, INITIAL_BURST_SIZE and TIMESTEP_STOP
+# may differ from point to point.
+SHARED = ("GRID_SIZE", "TIMESTEPS")
+
+# Headings of the Front-Right and Front-Left neighbours of every heading (see ant.SENSED_HEADINGS).
+RIGHT = (np.arange(8) + 1) % 8
+LEFT = (np.arange(8) - 1) % 8
+
+# Heading of the mirror image of every heading, mirrored across the x axis (dx -> -dx) and the y axis (dy -> -dy).
+MIRROR_X = np.array([Ant.VALID_DIRECTIONS.index((-dx, dy)) for dx, dy in Ant.VALID_DIRECTIONS])
+MIRROR_Y = np.array([Ant.VALID_DIRECTIONS.index((dx, -dy)) for dx, dy in Ant.VALID_DIRECTIONS])
+
+# Default lattice and horizon of screen(). Far smaller than the paper's 256 x 256 lattice and 1500 ticks, so a
+# point costs a fraction of one agent run, yet they rank points much like full-size agent runs (see README).
+SCREEN_GRID_SIZE = 64
+SCREEN_TIMESTEPS = 300
+
+
+def shift(values, dx, dy, out=None):
+    """
+    Moves the last two axes of `values` by (dx, dy) cells: out[..., x + dx, y + dy] = values[..., x, y].
+
+    Whatever is moved off the lattice is dropped, and the vacated cells are zero.
+    """
+    if(out is None):
+        out = np.empty_like(values)
+    size_x, size_y = values.shape[-2:]
+    x0, x1 = max(dx, 0), size_x + min(dx, 0)
+    y0, y1 = max(dy, 0), size_y + min(dy, 0)
+    out[..., x0:x1, y0:y1] = values[..., x0 - dx:x1 - dx, y0 - dy:y1 - dy]
+    out[..., :x0, :] = 0
+    out[..., x1:, :] = 0
+    out[..., :, :y0] = 0
+    out[..., :, y1:] = 0
+    return out
+
+
+def turning_matrix(weights):
+    """(8, 8) probabilities of turning from heading h (column) to heading k (row) with the kernel `weights`."""
+    matrix = np.zeros((8, 8))
+    for weight, offset in zip(weights, TURN_OFFSETS):
+        for heading in range(8):
+            matrix[(heading + offset) % 8, heading] += weight
+    return matrix
+
+
+def reflect(values, headings=False):
+    """
+    Fills the ghost row and column (index 0 of the last two axes) of a quadrant with the mirror images of
+    row and column 2, the cells on the other side of the mirror lines (see MeanField(symmetric=True)).
+
+    Args:
+        values (np.ndarray): (..., size + 1, size + 1) field, changed in place.
+        headings (bool): Whether axis -3 is the heading, which the mirroring permutes.
+    """
+    if(headings):
+        values[..., 0, :] = values[..., 2, :][..., MIRROR_X, :]
+        values[..., :, 0] = values[..., :, 2][..., MIRROR_Y, :]
+    else:
+        values[..., 0, :] = values[..., 2, :]
+        values[..., :, 0] = values[..., :, 2]
+
+
+def unfold(values):
+    """The full lattice (side 2 * size - 1) of a quadrant (..., size, size) whose corner is the nest."""
+    values = np.concatenate((values[..., :0:-1, :], values), axis=-2)
+    return np.concatenate((values[..., :, :0:-1], values), axis=-1)
+
+
+class MeanField:
+    """
+    Deterministic mean-field counterpart of the agent model, for screening parameters.
+
+    Instead of individual ants it evolves the expected number of ants on every cell, per heading,
+    under the same rules and in the same order as Simulation.step and AntColony.move:
+    1. Sensing: an ant looks at its Front, Front-Right and Front-Left cells (the "Fork Algorithm").
+    2. Fidelity: if a trail was found, it follows it with probability FIDELITY / 256.
+    3. Everyone not following turns with the TURNING_KERNEL.
+    4. Ants move one cell and deposit DEPOSITION_RATE + 1 on the cell they left; ants stepping off
+       the lattice are absorbed.
+
+    Closure: every cell keeps its expected concentration m and the probability p that it holds any
+    pheromone at all, the only thing the fork rule looks at. The concentration of a marked cell is
+    taken to be exponentially distributed (mean m / p), so evaporating EVAPORATION_RATE from every
+    cell multiplies both by exp(-rate * p / m): a cell marked by many deposits (a trail) stays marked
+    for long, one marked once dries up quickly. The ants depositing on a cell in a tick are taken as
+    Poisson. Neighbouring cells are treated as independent; when both side cells hold pheromone
+    the agent follows the stronger one, here either is taken with probability 1/2.
+    All ants of a tick sense the same field (the agent model lets later blocks see earlier deposits).
+
+    Several parameter points run as one batch along a leading axis, like ensemble.Ensemble.
+
+    The nest releases ants on the four diagonals and every rule (the turning kernel, the fork rule with
+    its 1/2 tie) treats left and right alike, so the expected field is symmetric under mirroring across
+    the two axes through the nest. With `symmetric` only the quadrant x, y >= nest is integrated (a
+    quarter of the cells), with a ghost row and column holding the mirror images of the cells next to
+    the mirror lines. The lattice is then taken to be symmetric about the nest: for an even GRID_SIZE
+    the nest is one cell closer to the high edges than to the low ones, and the quadrant model treats
+    the low sides as being as close as the high ones.
+
+    Attributes:
+        ants (np.ndarray): (P, 8, size, size) expected ants on each cell (of the quadrant), per heading.
+        concentration (np.ndarray): (P, size, size) expected pheromone concentration m.
+        marked (np.ndarray): (P, size, size) probability p that a cell holds pheromone.
+        weights (np.ndarray): (size, size) number of lattice cells every cell stands for (1 without symmetry).
+        absorbed (np.ndarray): (P,) expected number of ants that have left the lattice so far.
+    """
+
+    def __init__(self, members=None, dtype=np.float32, symmetric=True):
+        """
+        Args:
+            members (list): SimulationConfig of every parameter point (default: [SimulationConfig.current()]).
+            dtype: Floating point type of the fields; float32 halves the memory traffic of a tick.
+            symmetric (bool): Integrate one quadrant only (see the class notes); exact for an odd GRID_SIZE.
+        """
+        members = list(members) if members is not None else [SimulationConfig.current()]
+        if(not members):
+            raise ValueError("A mean field needs at least one member")
+        for name in SHARED:
+            values = {getattr(member, name) for member in members}
+            if(len(values) > 1):
+                raise ValueError(f"Mean-field points must share {name}, got {sorted(values)}")
+        self.members = members
+        self.settings = members[0]
+        points, size = len(members), self.settings.GRID_SIZE
+
+        def column(values, ndim):
+            return np.array(values, dtype=dtype).reshape((points,) + (1,) * ndim)
+
+        self.fidelity = column([member.fidelity for member in members], 3)
+        self.deposit_amount = column([member.deposit_amount for member in members], 2)
+        self.rate = column([member.EVAPORATION_RATE for member in members], 2)
+        self.turns = np.array([turning_matrix(member.kernel_weights) for member in members], dtype=dtype)
+
+        # Every field lives in a buffer with `ghost` extra rows and columns in front; the attributes are views of the rest.
+        self.symmetric = symmetric
+        self._ghost = ghost = int(symmetric)
+        nest = self.settings.center[0]
+        if(symmetric):
+            if(size - nest < 3):
+                raise ValueError(f"GRID_SIZE {size} is too small for a symmetric mean field")
+            size -= nest
+        padded = size + ghost
+        self._ants = np.zeros((points, 8, padded, padded), dtype=dtype)
+        self._marked = np.zeros((points, padded, padded), dtype=dtype)
+        self._moving = np.zeros_like(self._ants)
+        self._front = np.zeros_like(self._ants)
+        self.ants = self._ants[..., ghost:, ghost:]
+        self.marked = self._marked[..., ghost:, ghost:]
+        self.concentration = np.zeros((points, size, size), dtype=dtype)
+        self.absorbed = np.zeros(points)
+        self._following = np.zeros_like(self.ants)
+        self.nest = (0, 0) if symmetric else self.settings.center
+        axis = np.ones(size)
+        if(symmetric):
+            axis[1:] = 2
+        self.weights = np.outer(axis, axis).astype(dtype)
+        # Cells every heading steps off the lattice from, as flat indices (see move); the ghost side is no edge.
+        inside = np.ones((padded, padded), dtype=bool)
+        self._edges = [np.flatnonzero(~shift(inside, -dx, -dy)[ghost:, ghost:]) for dx, dy in DIRECTION_OFFSETS]
+        self.tick = 0
+
+    def __len__(self):
+        return len(self.members)
+
+    @property
+    def grid(self):
+        """(P, side, side) expected pheromone grids of the whole lattice (side 2 * size - 1 with symmetry)."""
+        return unfold(self.concentration) if self.symmetric else self.concentration
+
+    @property
+    def followers(self):
+        """(P, 8, size, size) expected ants on each cell that followed a trail on their last step."""
+        moved = np.empty_like(self._ants)
+        self._advance(self._following, moved)
+        return moved[..., self._ghost:, self._ghost:]
+
+    def _advance(self, values, out):
+        """Moves every heading of `values` (P, 8, size, size) one cell along it, into the buffer `out`."""
+        ghost = self._ghost
+        self._moving[..., ghost:, ghost:] = values
+        if(ghost):
+            reflect(self._moving, headings=True)
+        for heading, (dx, dy) in enumerate(DIRECTION_OFFSETS):
+            shift(self._moving[:, heading], dx, dy, out=out[:, heading])
+
+    @property
+    def explorers(self):
+        """(P, 8, size, size) expected ants on each cell in Explore mode."""
+        return self.ants - self.followers
+
+    def release(self, counts):
+        """Adds counts[p] ants at the nest of every point p, spread over the four diagonal headings."""
+        x, y = self.nest
+        counts = np.broadcast_to(np.asarray(counts, dtype=self.ants.dtype), (len(self),))
+        for heading in INITIAL_HEADINGS:
+            self.ants[:, heading, x, y] += counts / len(INITIAL_HEADINGS)
+
+    def evaporate(self):
+        """Removes EVAPORATION_RATE from every cell (see the closure in the class notes)."""
+        m, p = self.concentration, self.marked
+        decay = np.divide(self.rate * p, m, out=np.zeros_like(m), where=m > 0)
+        np.exp(-decay, out=decay)
+        m *= decay
+        p *= decay
+
+    def move(self):
+        """Advances every expected ant by one step and deposits pheromone (see the class notes)."""
+        ants = self.ants
+        points = len(self)
+
+        # front[:, h]: probability that the neighbour in heading h holds pheromone, on every cell.
+        ghost = self._ghost
+        if(ghost):
+            reflect(self._marked)
+        for heading, (dx, dy) in enumerate(DIRECTION_OFFSETS):
+            shift(self._marked, -dx, -dy, out=self._front[:, heading])
+        front = self._front[..., ghost:, ghost:]
+        right, left = front[:, RIGHT], front[:, LEFT]
+
+        # Rule (a): the front cell first; (c) otherwise a side that holds pheromone, either if both do;
+        # (b) neither: explore. Ants that found a trail stay on it with probability FIDELITY / 256.
+        stay = ants * self.fidelity
+        both = right * left
+        both *= 0.5
+        right -= both
+        left -= both
+        missed = np.multiply(stay, 1 - front)
+        to_right = np.multiply(missed, right, out=right)
+        to_left = np.multiply(missed, left, out=left)
+        following = np.multiply(stay, front)
+        exploring = ants - following
+        exploring -= to_right
+        exploring -= to_left
+        following[:, RIGHT] += to_right
+        following[:, LEFT] += to_left
+
+        # Everyone not following turns with the kernel: one (8, 8) matrix per point.
+        moving = np.matmul(self.turns, exploring.reshape(points, 8, -1)).reshape(ants.shape)
+        moving += following
+
+        # Ants deposit on the cell they leave, unless they step off the lattice.
+        deposits = moving.sum(axis=1)
+        leaving = np.zeros_like(deposits)
+        flat = leaving.reshape(points, -1)
+        for heading, edge in enumerate(self._edges):
+            flat[:, edge] += moving[:, heading].reshape(points, -1)[:, edge]
+        deposits -= leaving
+        self.absorbed += np.sum(leaving * self.weights, axis=(1, 2), dtype=np.float64)
+        self.concentration += self.deposit_amount * deposits
+        # Poisson number of depositing ants: a cell stays unmarked only if it was and nobody deposits.
+        unmarked = 1 - self.marked
+        unmarked *= np.exp(-deposits)
+        np.subtract(1, unmarked, out=self.marked)
+
+        self._advance(moving, self._ants)
+        self._following = following
+
+    def step(self):
+        """Advances every point by a single tick, in the same order as Simulation.step."""
+        if(self.tick == 0):
+            self.release([member.INITIAL_BURST_SIZE for member in self.members])
+        self.evaporate()
+        self.release([float(self.tick < member.TIMESTEP_STOP) for member in self.members])
+        self.move()
+        self.tick += 1
+
+    def loop(self):
+        """
+        Runs every point to TIMESTEPS.
+
+        Returns:
+            list: One calculate_stats()-like result per point (see calculate_stats).
+        """
+        while self.tick < self.settings.TIMESTEPS:
+            self.step()
+        return self.calculate_stats()
+
+    def counts(self):
+        """(P, 2) expected [explorers, followers] on the lattice, the layout of AntColony.count_modes()."""
+        total = np.sum(self.ants.sum(axis=1) * self.weights, axis=(1, 2), dtype=np.float64)
+        followers = np.sum(self.followers.sum(axis=1) * self.weights, axis=(1, 2), dtype=np.float64)
+        return np.stack((total - followers, followers), axis=1)
+
+    def fractions(self):
+        """(P, 2) predicted [lost, follower] fractions of the ants still on the lattice."""
+        counts = self.counts()
+        total = counts.sum(axis=1, keepdims=True)
+        return np.divide(counts, total, out=np.zeros_like(counts), where=total > 0)
+
+    def calculate_stats(self):
+        """
+        The predicted Followers-to-Lost ratio of every point.
+
+        Returns:
+            list: (F/L ratio, [lost, followers]) per point, like Simulation.calculate_stats()
+            (the counts are expectations, so they are floats).
+        """
+        stats = []
+        for lost, followers in self.counts().tolist():
+            ratio = followers / lost if lost != 0 else 0
+            stats.append((ratio, [lost, followers]))
+        return stats
+
+
+def screen(points, base=None, dtype=np.float32):
+    """
+    Predicts the outcome of every parameter point with one batched mean-field run.
+
+    Args:
+        points (list): Config override dicts, e.g. from sweep.grid_points() (they must share GRID_SIZE and TIMESTEPS).
+        base (SimulationConfig): Settings the overrides apply to (default: SimulationConfig.current() on the
+            SCREEN_GRID_SIZE lattice for SCREEN_TIMESTEPS ticks).
+        dtype: Floating point type of the fields.
+
+    Returns:
+        list: One dict per point: "params" and the predicted "lost", "followers", "fl_ratio" and "follower_fraction".
+    """
+    if(base is None):
+        base = SimulationConfig.current(GRID_SIZE=SCREEN_GRID_SIZE, TIMESTEPS=SCREEN_TIMESTEPS)
+    field = MeanField([base.replace(**point) for point in points], dtype)
+    stats = field.loop()
+    fractions = field.fractions()[:, 1].tolist()
+    return [
+        {"params": point, "lost": lost, "followers": followers, "fl_ratio": ratio, "follower_fraction": fraction}
+        for point, (ratio, (lost, followers)), fraction in zip(points, stats, fractions)
+    ]
+
+
+def main(argv=None):
+    """
+    Screens a parameter grid with the mean-field model from the command line.
+
+    Example:
+        python -m meanfield --param FIDELITY=255,251,247 --param DEPOSITION_RATE=2,8,24
+        python -m meanfield --param TIMESTEP_STOP=500,1000 --ticks 1500 --grid-size 96
+    """
+    # Imported here because sweep.py builds on the agent-model runners.
+    from sweep import grid_points, parse_axis
+    parser = argparse.ArgumentParser(description="Mean-field screening of the trail model.")
+    parser.add_argument("--param", action="append", default=[], type=parse_axis, help="NAME=VALUES grid axis (repeatable)")
+    parser.add_argument("--ticks", type=int, default=SCREEN_TIMESTEPS, help="number of timesteps to integrate")
+    parser.add_argument("--grid-size", type=int, default=SCREEN_GRID_SIZE, help="lattice side length (smaller screens faster)")
+    parser.add_argument("--batch", type=int, default=16, help="points integrated together in one batch")
+    args = parser.parse_args(argv)
+
+    points = grid_points(dict(args.param)) if args.param else [{}]
+    base = SimulationConfig.current(TIMESTEPS=args.ticks, GRID_SIZE=args.grid_size)
+    results = []
+    for start in range(0, len(points), args.batch):
+        results += screen(points[start:start + args.batch], base)
+    for result in results:
+        print(f'{result["params"]}: Followers {result["followers"]:.1f}  |  Lost {result["lost"]:.1f}  |  '
+              f'F-L Ratio {result["fl_ratio"]:.3f}  |  Follower fraction {result["follower_fraction"]:.3f}')
+    return results
+
+if __name__ == "__main__":
+    main()
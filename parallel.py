@@ -0,0 +1,330 @@
+# parallel.py
+import argparse
+import multiprocessing as mp
+import os
+from multiprocessing import shared_memory
+import numpy as np
+import config
+from colony import AntColony, make_rng, seed_entropy
+from main import parse_seed
+from pheromone import EagerField
+from settings import SimulationConfig
+
+# Seconds between checks that every worker is still alive while waiting for replies.
+POLL_INTERVAL = 1.0
+
+# Seconds close() gives a worker to stop before terminating it.
+STOP_TIMEOUT = 5.0
+
+
+class StripField(EagerField):
+    """
+    One worker's view of the shared pheromone grid: its own band of rows plus one halo row on each side.
+
+    The own rows are the shared memory itself, so deposits and evaporation need no copying.
+    The halo rows are private copies of the neighbours' edge rows, taken after evaporation and
+    before any ant moves, so sensing across the strip border reads the same values however far
+    the neighbour has got with its own moves.
+
+    Flat cell indices count from the first row of the window (halo included), matching an AntColony
+    built with rows=(window_start, window_stop).
+
+    Attributes:
+        values (np.ndarray): The worker's own rows of the shared grid.
+        halo_top, halo_bottom (np.ndarray): Copies of the rows just above and below the strip (None at the lattice edge).
+    """
+
+    def __init__(self, grid, start, stop, rate=None):
+        """
+        Args:
+            grid (np.ndarray): The full shared grid.
+            start, stop (int): Rows owned by this worker.
+            rate (float): Evaporation per tick (default: config.EVAPORATION_RATE).
+        """
+        rate = config.EVAPORATION_RATE if rate is None else rate
+        if(np.issubdtype(grid.dtype, np.integer)):
+            rate = int(rate)
+        super().__init__(rate=rate, values=grid[start:stop])
+        self.size = grid.shape[1]
+        # Window row of the first own row: 1 if there is a halo row above the strip.
+        self.offset = 1 if start > 0 else 0
+        self.halo_top = None
+        self.halo_bottom = None
+
+    def read(self, cells):
+        """Concentration at the flat window indices `cells`, taking the halo rows from the copies."""
+        rows = cells // self.size - self.offset
+        cols = cells % self.size
+        values = self.values[np.clip(rows, 0, len(self.values) - 1), cols]
+        if(self.halo_top is not None):
+            values = np.where(rows < 0, self.halo_top[cols], values)
+        if(self.halo_bottom is not None):
+            values = np.where(rows >= len(self.values), self.halo_bottom[cols], values)
+        return values
+
+    def deposit(self, cells, amount):
+        """Deposits on own rows. Ants deposit on the cell they left, which always lies in the strip."""
+        super().deposit(cells - self.offset * self.size, amount)
+
+
+def _worker(index, bounds, settings, seed, shm_name, pipe, inbox, outbox):
+    """
+    Runs one strip of the lattice until told to stop.
+
+    Per tick (on a "step" command): evaporate the own rows, swap edge rows with the neighbours,
+    release new ants if the nest lies in the strip, move the ants, then hand the ants
+    that crossed into a neighbour's rows over to it.
+
+    Args:
+        index (int): Worker number; worker i owns rows bounds[i]:bounds[i + 1].
+        bounds (list): Strip boundaries.
+        settings (SimulationConfig): Parameters of the run (pickled over from the parent).
+        seed: Config-style seed; workers draw from independent streams derived from it.
+        shm_name (str): Name of the shared grid.
+        pipe: Connection to the parent for commands and replies.
+        inbox, outbox (dict): Queues from / to the "up" and "down" neighbours, per message kind.
+    """
+    start, stop = bounds[index], bounds[index + 1]
+    size = settings.GRID_SIZE
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    grid = np.ndarray((size, size), dtype=settings.GRID_DTYPE, buffer=shm.buf)
+    field = StripField(grid, start, stop, settings.EVAPORATION_RATE)
+
+    # A single worker draws exactly the random numbers of Simulation, so it reproduces serial runs.
+    workers = len(bounds) - 1
+    if(workers == 1):
+        rng = make_rng(seed)
+    else:
+        rng = np.random.default_rng(np.random.SeedSequence(seed_entropy(seed), spawn_key=(index,)))
+    colony = AntColony(rng, rows=(max(start - 1, 0), min(stop + 1, size)), settings=settings)
+    nest = settings.center
+    owns_nest = start <= nest[0] < stop
+    tick = 0
+
+    while True:
+        command = pipe.recv()
+        if(command == "stop"):
+            break
+        elif(command == "positions"):
+            pipe.send((colony.pos.copy(), colony.mode.copy()))
+            continue
+
+        # Evaporation, then the halo exchange: neighbours get the edge rows as they are before any deposit.
+        field.evaporate()
+        if("up" in outbox):
+            outbox["up"]["halo"].put(grid[start].copy())
+        if("down" in outbox):
+            outbox["down"]["halo"].put(grid[stop - 1].copy())
+        if("up" in inbox):
+            field.halo_top = inbox["up"]["halo"].get()
+        if("down" in inbox):
+            field.halo_bottom = inbox["down"]["halo"].get()
+
+        # Release schedule of Simulation.step.
+        if(owns_nest):
+            if(tick == 0):
+                colony.spawn(settings.INITIAL_BURST_SIZE, nest)
+            if(tick < settings.TIMESTEP_STOP):
+                colony.spawn(1, nest)
+        colony.move(field)
+
+        # Hand-off: an ant moves at most one row per tick, so it can only land in an adjacent strip.
+        row = colony.pos[:, 0]
+        pos, heading, mode = colony.extract((row < start) | (row >= stop))
+        for direction, leaving in (("up", pos[:, 0] < start), ("down", pos[:, 0] >= stop)):
+            if(direction in outbox):
+                outbox[direction]["ants"].put((pos[leaving], heading[leaving], mode[leaving]))
+        # Arrivals are appended in a fixed order (upper neighbour first), so runs are reproducible.
+        for direction in ("up", "down"):
+            if(direction in inbox):
+                colony.append(*inbox[direction]["ants"].get())
+
+        tick += 1
+        pipe.send((colony.count, colony.followers))
+
+    del grid, field
+    shm.close()
+
+
+class ParallelSimulation:
+    """
+    Domain-decomposed version of Simulation for very large lattices.
+
+    The lattice is cut into horizontal strips of rows, one per worker process. The pheromone grid lives
+    in multiprocessing.shared_memory, so each worker evaporates and deposits on its own rows in place,
+    and the parent can read the whole grid at any time without copying. Every tick, neighbouring workers
+    exchange their edge rows (halos) so check_for_trail keeps sensing correctly across strip borders,
+    and ants that step over a border are handed to the worker that owns their new row.
+
+    Note on Update Order:
+    Inside a strip, ants still see the deposits made earlier in the same tick (see AntColony),
+    but across a border they see the neighbour's rows as of the start of the tick.
+    The serial model's single release order cannot be kept across processes running concurrently;
+    with one worker the run is identical to Simulation.
+
+    Evaporation is always eager (EVAPORATION_MODE is ignored): a lazy field would leave the shared grid stale,
+    and each worker only pays for its own rows. Use GRID_DTYPE = "uint16" to quarter the shared grid on huge lattices.
+    """
+
+    def __init__(self, workers=None, seed=None, settings=None):
+        """
+        Creates the shared grid and starts the workers.
+
+        Args:
+            workers (int): Number of strips / processes (default: all cores, at most one per row).
+            seed: Config-style seed (default: settings.RANDOM_SEED).
+            settings (SimulationConfig): Model parameters (default: SimulationConfig.current()).
+                EVAPORATION_MODE does not apply: strips always evaporate eagerly.
+        """
+        self.settings = settings if settings is not None else SimulationConfig.current()
+        size = self.settings.GRID_SIZE
+        workers = min(workers or os.cpu_count(), size)
+        dtype = np.dtype(self.settings.GRID_DTYPE)
+        seed = self.settings.RANDOM_SEED if seed is None else seed
+
+        self.shm = shared_memory.SharedMemory(create=True, size=size * size * dtype.itemsize)
+        self.grid = np.ndarray((size, size), dtype=dtype, buffer=self.shm.buf)
+        self.grid[...] = 0
+        self.bounds = [int(b) for b in np.linspace(0, size, workers + 1)]
+        self.tick = 0
+        self.count = 0
+        self.followers = 0
+
+        # Spawned (not forked) workers start clean, so the settings are handed over explicitly.
+        context = mp.get_context("spawn")
+        # One queue per direction and kind on every border between strips i and i + 1.
+        down = [{"halo": context.Queue(), "ants": context.Queue()} for _ in range(workers - 1)]
+        up = [{"halo": context.Queue(), "ants": context.Queue()} for _ in range(workers - 1)]
+        # Kept alive here: a queue collected in the parent cannot be unpickled by a worker still starting up.
+        self.queues = down + up
+
+        self.pipes = []
+        self.workers = []
+        for i in range(workers):
+            inbox, outbox = {}, {}
+            if(i > 0):
+                inbox["up"], outbox["up"] = down[i - 1], up[i - 1]
+            if(i < workers - 1):
+                inbox["down"], outbox["down"] = up[i], down[i]
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=_worker,
+                args=(i, self.bounds, self.settings, seed, self.shm.name, child, inbox, outbox),
+                daemon=True,
+            )
+            process.start()
+            # Only the worker holds the other end now, so recv() fails instead of hanging if it dies.
+            child.close()
+            self.pipes.append(parent)
+            self.workers.append(process)
+
+    def _ask(self, command):
+        """
+        Sends `command` to every worker and collects their replies.
+
+        Raises:
+            RuntimeError: A worker has died. Its neighbours would wait for its halos forever,
+                so the others are checked too while waiting.
+        """
+        try:
+            for pipe in self.pipes:
+                pipe.send(command)
+            replies = []
+            for pipe in self.pipes:
+                while not pipe.poll(POLL_INTERVAL):
+                    self._check_workers()
+                replies.append(pipe.recv())
+        except (EOFError, OSError):
+            self._check_workers()
+            raise
+        return replies
+
+    def _check_workers(self):
+        for index, process in enumerate(self.workers):
+            if(not process.is_alive()):
+                raise RuntimeError(f"Worker {index} died (exit code {process.exitcode})")
+
+    def step(self):
+        """Advances every strip by one tick and collects the colony counts."""
+        replies = self._ask("step")
+        self.count = sum(count for count, _ in replies)
+        self.followers = sum(followers for _, followers in replies)
+        self.tick += 1
+
+    def loop(self, verbose=True):
+        """
+        Runs until settings.TIMESTEPS ticks have passed.
+
+        Returns:
+            tuple: The calculate_stats() result (F/L ratio, [lost, followers]).
+        """
+        while self.tick < self.settings.TIMESTEPS:
+            self.step()
+            if(verbose and self.tick % 100 == 0):
+                print(f"Tick {self.tick}: {self.count} ants")
+        return self.calculate_stats()
+
+    def get_positions(self):
+        """
+        Gathers every ant from the workers.
+
+        Returns:
+            tuple: (pos (n, 2), mode (n,)) of all live ants, strip by strip.
+        """
+        replies = self._ask("positions")
+        return np.concatenate([pos for pos, _ in replies]), np.concatenate([mode for _, mode in replies])
+
+    def calculate_stats(self):
+        """Same statistics as Simulation.calculate_stats(): (F/L ratio, [lost, followers])."""
+        lost = self.count - self.followers
+        if(lost > 0):
+            return self.followers / lost, [lost, self.followers]
+        return 0, [lost, self.followers]
+
+    def close(self):
+        """Stops the workers and frees the shared grid."""
+        # Neighbours of a dead worker are stuck waiting for its halos and never see "stop".
+        failed = any(not process.is_alive() for process in self.workers)
+        for pipe in self.pipes:
+            try:
+                pipe.send("stop")
+            except OSError:
+                pass
+        for process in self.workers:
+            process.join(timeout=0 if failed else STOP_TIMEOUT)
+            if(process.is_alive()):
+                process.terminate()
+                process.join()
+        del self.grid
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    """
+    Runs one headless simulation split over several processes.
+
+    Example:
+        python -m parallel --grid-size 8192 --workers 8 --ticks 2000
+    """
+    parser = argparse.ArgumentParser(description="Run the simulation with the lattice split over worker processes.")
+    parser.add_argument("--workers", type=int, default=None, help="number of strips (default: all cores)")
+    parser.add_argument("--grid-size", type=int, default=config.GRID_SIZE, help="lattice side length")
+    parser.add_argument("--ticks", type=int, default=config.TIMESTEPS, help="number of ticks to run")
+    parser.add_argument("--seed", type=parse_seed, default=None, help="random seed (default: config.RANDOM_SEED)")
+    args = parser.parse_args(argv)
+
+    settings = SimulationConfig.current(GRID_SIZE=args.grid_size, TIMESTEPS=args.ticks)
+    with ParallelSimulation(args.workers, args.seed, settings) as sim:
+        ratio, (lost, followers) = sim.loop()
+    print(f"F/L ratio: {ratio:.2f} ({followers} followers, {lost} lost)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+# pheromone.py
+import math
+import numpy as np
+import config
+from settings import SimulationConfig
+
+
+def scatter_add(target, cells, amount):
+    """
+    Adds `amount` to target.flat[cells], accumulating repeated cells (np.add.at semantics).
+
+    np.add.at is slow per element, so dense batches switch to a single bincount over the lattice.
+    """
+    flat = target.reshape(-1)
+    if(len(cells) * 16 < flat.size):
+        np.add.at(flat, cells, amount)
+    else:
+        flat += (np.bincount(cells, minlength=flat.size) * amount).astype(flat.dtype)
+
+
+def saturating_add(target, cells, amount):
+    """
+    scatter_add() that clamps at the maximum of an integer dtype instead of wrapping around.
+
+    Float grids cannot overflow and go straight to scatter_add().
+    """
+    if(not np.issubdtype(target.dtype, np.integer)):
+        scatter_add(target, cells, amount)
+        return
+    flat = target.reshape(-1)
+    cells, counts = np.unique(cells, return_counts=True)
+    total = flat[cells].astype(np.int64) + counts * amount
+    flat[cells] = np.minimum(total, np.iinfo(flat.dtype).max)
+
+
+class EagerField:
+    """
+    Pheromone grid that evaporates every cell on every tick, as in the original model.
+
+    Cost per tick is proportional to the grid area, but the subtraction happens in place,
+    so no full-size temporaries are allocated.
+
+    The grid may use an integer dtype (config.GRID_DTYPE): the model only ever adds DEPOSITION_RATE + 1
+    and subtracts EVAPORATION_RATE, so with integer rates a uint16 grid holds exactly the same
+    values as float64 in a quarter of the memory. Adds saturate at the dtype's maximum instead of wrapping.
+
+    Attributes:
+        values (np.ndarray): The 2D concentration grid, indexed [row, col].
+        rate (float): Pheromone removed per tick per cell (EVAPORATION_RATE).
+    """
+
+    def __init__(self, size=None, rate=None, values=None, dtype=np.float64):
+        """
+        Args:
+            size (int): Grid side length (default: config.GRID_SIZE).
+            rate (float): Evaporation per tick (default: config.EVAPORATION_RATE).
+            values (np.ndarray): Wrap an existing grid instead of allocating a new one.
+                The array is used (and updated) in place.
+            dtype: Storage type of a new grid, e.g. np.uint16.
+        """
+        if(values is None):
+            size = config.GRID_SIZE if size is None else size
+            values = np.zeros((size, size), dtype=dtype)
+        self.values = values
+        self.rate = config.EVAPORATION_RATE if rate is None else rate
+
+    def evaporate(self):
+        """Removes `rate` from every cell, clamping at zero."""
+        # max(c, rate) - rate == max(c - rate, 0), and never goes below zero (no unsigned wrap-around).
+        np.maximum(self.values, self.rate, out=self.values)
+        self.values -= self.rate
+
+    def read(self, cells):
+        """Concentration at the flat (row * size + col) indices `cells` (any shape)."""
+        return self.values.reshape(-1)[cells]
+
+    def deposit(self, cells, amount):
+        """Adds `amount` at every flat index in `cells`; repeated cells receive several deposits."""
+        saturating_add(self.values, cells, amount)
+
+    def to_array(self):
+        """The full grid as an array. For this field it is the live storage itself."""
+        return self.values
+
+    def load(self, grid):
+        """Replaces the concentrations with a full grid (e.g. one written to sim.grid)."""
+        self.values[...] = grid
+
+    def total(self):
+        """Total pheromone on the grid. One pass over the grid, the same order of work as an eager evaporate()."""
+        return float(self.values.sum(dtype=np.float64))
+
+
+# Consecutive cells sharing one evaporation stamp in LazyField. A deposit brings its whole tile up to
+# date, so larger tiles cost a little more per deposit and take less memory (4 / STAMP_TILE bytes per cell).
+STAMP_TILE = 64
+
+
+class LazyField(EagerField):
+    """
+    Pheromone grid that applies evaporation only to cells that are actually read or written.
+
+    Evaporation is linear and clamped at zero, so k ticks of it reduce to one step:
+    max(c - k * rate, 0). Every cell therefore stores its concentration as of the tick its tile (a run
+    of STAMP_TILE consecutive cells sharing one stamp) was last touched, and evaporate() only advances
+    the clock. Reads apply the pending decay on the fly, and deposits bring a cell's whole tile up to date
+    before adding to it. Sharing the stamp keeps it at a fraction of a byte per cell, so the grid's
+    dtype decides the memory.
+    Per-tick cost scales with the number of cells the ants sense and deposit on, not with the grid area.
+
+    With the paper's integer rates the concentrations are exactly those of EagerField.
+    Only to_array() (rendering, snapshots) touches the whole grid.
+
+    The total amount of pheromone is kept up to date incrementally as well. Every marked cell
+    loses `rate` per tick until the tick it runs dry, so the field keeps the number of live cells
+    and a schedule of when they run dry (and by how much less than `rate` their last step removes).
+    A deposit moves its cells within the schedule. total() is then O(1) at any tick.
+
+    Attributes:
+        stamp (np.ndarray): Tick at which each tile's values were last brought up to date.
+        tile (int): Cells per tile (STAMP_TILE, or a divisor of it for grids it does not divide).
+        tick (int): Number of evaporation steps applied so far.
+        live (int): Number of cells holding pheromone.
+    """
+
+    def __init__(self, size=None, rate=None, values=None, dtype=np.float64):
+        super().__init__(size, rate, values, dtype)
+        self.tile = math.gcd(self.values.size, STAMP_TILE)
+        self.stamp = np.zeros(self.values.size // self.tile, dtype=np.int32)
+        self.tick = 0
+        self._rebuild_schedule()
+
+    def _rebuild_schedule(self):
+        """Recomputes the total and the run-dry schedule from the whole grid (after a load())."""
+        self._total = float(self.values.sum(dtype=np.float64))
+        self.live = 0
+        # Indexed by tick: cells running dry at that tick, and how much less than `rate` their last step removes.
+        self._expiring = np.zeros(1024, dtype=np.int64)
+        self._shortfall = np.zeros(1024, dtype=np.float64)
+        self._schedule(self.values.reshape(-1), 1)
+
+    def _schedule(self, values, sign):
+        """Adds (sign=1) or removes (sign=-1) cells holding `values` as of the current tick to the schedule."""
+        if(self.rate <= 0):
+            return
+        values = values[values > 0].astype(np.float64)
+        steps = np.ceil(values / self.rate)
+        dry = self.tick + steps.astype(np.int64)
+        if(len(dry) and dry.max() >= len(self._expiring)):
+            size = max(int(dry.max()) + 1, 2 * len(self._expiring))
+            for name in ("_expiring", "_shortfall"):
+                old = getattr(self, name)
+                grown = np.zeros(size, dtype=old.dtype)
+                grown[:len(old)] = old
+                setattr(self, name, grown)
+        np.add.at(self._expiring, dry, sign)
+        np.add.at(self._shortfall, dry, sign * (steps * self.rate - values))
+        self.live += sign * len(values)
+
+    def evaporate(self):
+        """Advances the evaporation clock by one tick. O(1)."""
+        self.tick += 1
+        # Every live cell loses `rate`, except those running dry now, which only lose what they had left.
+        if(self.tick < len(self._expiring)):
+            self._total -= self.rate * self.live - self._shortfall[self.tick]
+            self.live -= int(self._expiring[self.tick])
+        else:
+            self._total -= self.rate * self.live
+
+    def read(self, cells):
+        """Concentration at the flat indices `cells`, with the evaporation owed since the last touch applied."""
+        elapsed = self.tick - self.stamp[cells // self.tile]
+        return np.maximum(self.values.reshape(-1)[cells] - elapsed * self.rate, 0)
+
+    def deposit(self, cells, amount):
+        """
+        Brings the deposit cells up to date, then adds `amount` at every flat index in `cells`.
+
+        Repeated cells receive several deposits (clamped at the maximum of an integer dtype).
+        """
+        cells, counts = np.unique(cells, return_counts=True)
+        self._update(np.unique(cells // self.tile))
+        old = self.values.reshape(-1)[cells]
+        new = old + counts * amount
+        if(np.issubdtype(self.values.dtype, np.integer)):
+            new = np.minimum(new, np.iinfo(self.values.dtype).max)
+        self.values.reshape(-1)[cells] = new
+
+        self._schedule(old, -1)
+        self._schedule(new, 1)
+        self._total += float(np.sum(new - old, dtype=np.float64))
+
+    def to_array(self):
+        """
+        Applies all pending evaporation in place and returns the live grid.
+
+        Every cell is up to date afterwards, so writes into the returned array are kept.
+        """
+        self._update(slice(None))
+        return self.values
+
+    def _update(self, tiles):
+        """Applies the evaporation owed since their last touch to every cell of `tiles` (indices or a slice)."""
+        blocks = self.values.reshape(-1, self.tile)
+        elapsed = self.tick - self.stamp[tiles]
+        if(elapsed.any()):
+            # Subtract at most the current value, so integer grids clamp at zero instead of wrapping.
+            decay = np.minimum(elapsed[:, None] * self.rate, blocks[tiles])
+            blocks[tiles] -= decay.astype(self.values.dtype)
+            self.stamp[tiles] = self.tick
+
+    def load(self, grid):
+        """Replaces the concentrations with a full grid, current as of this tick."""
+        self.values[...] = grid
+        self.stamp[...] = self.tick
+        self._rebuild_schedule()
+
+    def total(self):
+        """Total pheromone on the grid, kept up to date incrementally. O(1)."""
+        return self._total
+
+
+# Evaporation strategies selectable with EVAPORATION_MODE.
+FIELDS = {
+    "eager": EagerField,
+    "lazy": LazyField,
+}
+
+
+def make_field(mode=None, size=None, rate=None, dtype=None, settings=None, replicas=None):
+    """
+    Builds an empty pheromone field.
+
+    Args:
+        mode (str): "eager" or "lazy" (default: settings.EVAPORATION_MODE).
+        size (int): Grid side length (default: settings.GRID_SIZE).
+        rate (float): Evaporation per tick (default: settings.EVAPORATION_RATE).
+        dtype (str): Storage type, e.g. "float64" or "uint16" (default: settings.GRID_DTYPE).
+        settings (SimulationConfig): Parameters the defaults come from (default: SimulationConfig.current()).
+        replicas (int): Stack this many independent grids into one (replicas, size, size) field (see ensemble.py).
+    """
+    settings = settings if settings is not None else SimulationConfig.current()
+    mode = settings.EVAPORATION_MODE if mode is None else mode
+    if(mode not in FIELDS):
+        raise KeyError(f"Unknown evaporation mode: {mode}; choose from {sorted(FIELDS)}")
+    size = settings.GRID_SIZE if size is None else size
+    rate = settings.EVAPORATION_RATE if rate is None else rate
+    dtype = np.dtype(settings.GRID_DTYPE if dtype is None else dtype)
+
+    if(np.issubdtype(dtype, np.integer)):
+        # An integer grid only reproduces the float model when every change to it is a whole number.
+        for name, value in (("EVAPORATION_RATE", rate), ("DEPOSITION_RATE", settings.DEPOSITION_RATE)):
+            if(value != int(value)):
+                raise ValueError(f"{name} = {value} needs a float GRID_DTYPE, not {dtype}")
+        rate = int(rate)
+    elif(not np.issubdtype(dtype, np.floating)):
+        raise ValueError(f"GRID_DTYPE must be an integer or float type, not {dtype}")
+    if(replicas is not None):
+        # The fields only ever index their values through flat cell indices, so any shape works.
+        return FIELDS[mode](rate=rate, values=np.zeros((replicas, size, size), dtype=dtype))
+    return FIELDS[mode](size, rate, dtype=dtype)
+
+
+def as_field(grid):
+    """Returns `grid` if it already is a field, otherwise wraps the plain array (in place) in an EagerField."""
+    if(isinstance(grid, EagerField)):
+        return grid
+    return EagerField(values=grid)
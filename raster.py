@@ -0,0 +1,85 @@
+# raster.py
+import numpy as np
+import config
+
+def pheromone_rgb(grid, scale=None):
+    """
+    Maps the whole pheromone grid to an RGB image in one vectorized pass.
+
+    Uses the same mapping the GUI always used: concentration * GUI_TRAIL_SCALE
+    is the HSL lightness (capped at 100) of pure blue (hue 240, saturation 100).
+    Dark Blue = Low Concentration -> Bright Blue/White = High Concentration.
+    Empty cells come out black.
+
+    Args:
+        grid (np.ndarray): The 2D pheromone grid, indexed [x, y] like the screen.
+        scale (float): Lightness per unit of pheromone (default: config.GUI_TRAIL_SCALE).
+
+    Returns:
+        np.ndarray: (width, height, 3) uint8 array, ready for pygame.surfarray.blit_array.
+    """
+    if(scale is None):
+        scale = config.GUI_TRAIL_SCALE
+
+    lightness = np.minimum(grid * (scale / 100), 1.0)
+    np.maximum(lightness, 0.0, out=lightness)
+
+    # HSL -> RGB at full saturation and hue 240 reduces to:
+    # below 50% lightness the blue channel ramps up, above it red and green ramp up towards white.
+    blue = np.minimum(2 * lightness, 1.0)
+    red_green = np.maximum(2 * lightness - 1, 0.0)
+
+    rgb = np.empty(grid.shape + (3,), dtype=np.uint8)
+    # Truncate like pygame.Color does, so colors match the old per-cell renderer.
+    rgb[..., 0] = red_green * 255
+    rgb[..., 1] = rgb[..., 0]
+    rgb[..., 2] = blue * 255
+    return rgb
+
+
+def block_max(grid, step):
+    """
+    Shrinks a grid by `step` in both directions, keeping the strongest cell of every step x step block.
+
+    Used when several cells share one screen pixel: a maximum keeps one-cell-wide trails visible,
+    where plain subsampling would drop most of them. Edge blocks may be smaller than step x step.
+    """
+    if(step <= 1):
+        return grid
+    # Along the contiguous axis first: that pass reads the whole grid, the second only a step-th of it.
+    cols = np.maximum.reduceat(grid, np.arange(0, grid.shape[1], step), axis=1)
+    return np.maximum.reduceat(cols, np.arange(0, grid.shape[0], step), axis=0)
+
+
+def ant_density(positions, window, step=1):
+    """
+    Counts the ants in every texel of the visible window with one histogram (np.bincount).
+
+    Args:
+        positions (np.ndarray): (n, 2) ant (x, y) positions.
+        window (tuple): (x0, x1, y0, y1) visible cells, as from Viewport.window().
+        step (int): Cells per texel in each direction (see block_max).
+
+    Returns:
+        np.ndarray: (ceil((x1 - x0) / step), ceil((y1 - y0) / step)) ant counts, indexed [x, y].
+    """
+    x0, x1, y0, y1 = window
+    width, height = -(-(x1 - x0) // step), -(-(y1 - y0) // step)
+    positions = np.asarray(positions).reshape(-1, 2)
+    x, y = positions[:, 0], positions[:, 1]
+    inside = (x >= x0) & (x < x1) & (y >= y0) & (y < y1)
+    texels = ((x[inside] - x0) // step) * height + (y[inside] - y0) // step
+    return np.bincount(texels, minlength=width * height).reshape(width, height)
+
+
+def density_rgb(counts, saturation=8):
+    """
+    Maps ant counts to red: one ant is dark red, `saturation` or more are full red, empty texels are black.
+
+    Returns:
+        np.ndarray: (width, height, 3) uint8 array, like pheromone_rgb().
+    """
+    rgb = np.zeros(counts.shape + (3,), dtype=np.uint8)
+    level = np.minimum(counts / saturation, 1.0)
+    rgb[..., 0] = np.where(counts > 0, 96 + level * 159, 0)
+    return rgb
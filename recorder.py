@@ -0,0 +1,174 @@
+# recorder.py
+import json
+import os
+import queue
+import threading
+import numpy as np
+from settings import SimulationConfig
+
+# Files of a recording. All are raw, append-only arrays (no header), so a run that is cut short
+# is still readable up to its last complete write; shapes and dtypes come from meta.json.
+#   index.bin       int64 (ticks, 3): tick, offset of its first ant in pos/mode.bin, number of ants
+#   pos.bin         (ants, 2) positions of every ant at every recorded tick
+#   mode.bin        int8 (ants,) matching modes (0 = Explore, 1 = Follow)
+#   grid_index.bin  int64 (frames,): tick of every grid snapshot
+#   grid.bin        (frames, GRID_SIZE, GRID_SIZE) pheromone grid snapshots
+# plus stats.csv (per-tick colony statistics, see stats.py), written by close() when given.
+FILES = ("index.bin", "pos.bin", "mode.bin", "grid_index.bin", "grid.bin")
+
+
+class Recorder:
+    """
+    Streams a run to disk: ant positions and modes every tick, and the pheromone grid every K ticks.
+
+    record() only copies the arrays and queues them; a background thread does all file writes,
+    so the tick loop never waits on the disk. The queue is bounded, which caps memory use
+    however long the run is (if the disk falls behind, record() waits for a free slot).
+    """
+
+    def __init__(self, path, grid_every=10, queue_size=64, settings=None):
+        """
+        Creates the recording directory and starts the writer thread.
+
+        Args:
+            path (str): Directory to write (created if needed, existing recordings are replaced).
+            grid_every (int): Store a grid snapshot every K ticks (0 for none).
+            queue_size (int): Ticks that may wait in memory for the writer.
+            settings (SimulationConfig): Parameters of the recorded run, stored in meta.json
+                (default: SimulationConfig.current()). Pass the simulation's own settings.
+        """
+        settings = settings if settings is not None else SimulationConfig.current()
+        self.path = path
+        self.grid_every = grid_every
+        os.makedirs(path, exist_ok=True)
+
+        # Positions always fit in int16 on the lattices used here; fall back to int32 for huge ones.
+        self.pos_dtype = np.dtype(np.int16 if settings.GRID_SIZE < 2 ** 15 else np.int32)
+        self.meta = {
+            "grid_size": settings.GRID_SIZE,
+            "grid_every": grid_every,
+            "pos_dtype": self.pos_dtype.str,
+            "grid_dtype": np.dtype(settings.GRID_DTYPE).str,
+            "config": settings.as_dict(
+                ("FIDELITY", "DEPOSITION_RATE", "EVAPORATION_RATE", "INITIAL_BURST_SIZE", "TIMESTEP_STOP", "TURNING_KERNEL")
+            ),
+            "complete": False,
+        }
+        self._write_meta()
+
+        # Large write buffers: the small per-tick records reach the disk in chunks of about a megabyte.
+        self._files = {name: open(os.path.join(path, name), "wb", buffering=1 << 20) for name in FILES}
+        self._offset = 0
+        self._error = None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._write_loop, daemon=True)
+        self._thread.start()
+
+    def _write_meta(self):
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump(self.meta, f, indent=2)
+
+    def grid_due(self, tick):
+        """Whether record() wants a grid snapshot at this tick (checked before building one)."""
+        return self.grid_every > 0 and tick % self.grid_every == 0
+
+    def record(self, tick, positions, modes, grid=None):
+        """
+        Queues one tick for writing.
+
+        Args:
+            tick (int): Simulation tick.
+            positions (np.ndarray): (n, 2) ant positions.
+            modes (np.ndarray): (n,) ant modes.
+            grid (np.ndarray): Pheromone grid, if this tick is grid_due().
+        """
+        if(self._error is not None):
+            raise RuntimeError("Recorder writer thread failed") from self._error
+        # Copies: the simulation updates its arrays in place as soon as this returns.
+        self._queue.put((
+            tick,
+            positions.astype(self.pos_dtype),
+            modes.astype(np.int8),
+            None if grid is None else grid.astype(self.meta["grid_dtype"]),
+        ))
+
+    def _write_loop(self):
+        """Writer thread: appends queued ticks to the files until close() sends None."""
+        try:
+            while True:
+                item = self._queue.get()
+                if(item is None):
+                    return
+                tick, positions, modes, grid = item
+                count = len(modes)
+                self._files["pos.bin"].write(positions.tobytes())
+                self._files["mode.bin"].write(modes.tobytes())
+                self._files["index.bin"].write(np.array([tick, self._offset, count], dtype=np.int64).tobytes())
+                self._offset += count
+                if(grid is not None):
+                    self._files["grid.bin"].write(grid.tobytes())
+                    self._files["grid_index.bin"].write(np.array([tick], dtype=np.int64).tobytes())
+        except Exception as error:
+            self._error = error
+            # Keep draining so record() never blocks on a queue nobody empties.
+            while self._queue.get() is not None:
+                pass
+
+    def close(self, stats=None):
+        """
+        Waits for the queued ticks to be written, closes the files and marks the recording complete.
+
+        Args:
+            stats (StatsSeries): Per-tick colony statistics of the run, saved as stats.csv next to the recording.
+        """
+        self._queue.put(None)
+        self._thread.join()
+        for f in self._files.values():
+            f.close()
+        if(self._error is not None):
+            raise RuntimeError("Recorder writer thread failed") from self._error
+        if(stats is not None):
+            stats.to_csv(os.path.join(self.path, "stats.csv"))
+        self.meta["complete"] = True
+        self._write_meta()
+
+
+def _memmap(path, dtype, shape_tail=()):
+    """Memory-maps a raw array file, using only whole records (a cut-off last write is ignored)."""
+    dtype = np.dtype(dtype)
+    record = dtype.itemsize * int(np.prod(shape_tail, dtype=np.int64))
+    rows = os.path.getsize(path) // record if os.path.exists(path) else 0
+    if(rows == 0):
+        return np.empty((0,) + tuple(shape_tail), dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(rows,) + tuple(shape_tail))
+
+
+def recording_settings(meta):
+    """The SimulationConfig of a recorded run, from its meta.json (config.py values for what it does not record)."""
+    return SimulationConfig.current(GRID_SIZE=meta["grid_size"], **meta["config"])
+
+
+def open_recording(path):
+    """
+    Opens a recording for analysis without reading it into memory.
+
+    Returns:
+        dict: "meta" (decoded meta.json) and memory-mapped arrays "index" (ticks, 3),
+        "pos" (ants, 2), "mode" (ants,), "grid_index" (frames,) and "grid" (frames, G, G).
+        The ants of recorded tick i are pos[index[i, 1]:index[i, 1] + index[i, 2]].
+    """
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    size = meta["grid_size"]
+    index = _memmap(os.path.join(path, "index.bin"), np.int64, (3,))
+    grid_index = _memmap(os.path.join(path, "grid_index.bin"), np.int64)
+    grid = _memmap(os.path.join(path, "grid.bin"), meta["grid_dtype"], (size, size))
+    frames = min(len(grid_index), len(grid))
+    return {
+        "meta": meta,
+        "index": index,
+        "pos": _memmap(os.path.join(path, "pos.bin"), meta["pos_dtype"], (2,)),
+        "mode": _memmap(os.path.join(path, "mode.bin"), np.int8),
+        "grid_index": grid_index[:frames],
+        "grid": grid[:frames],
+    }
@@ -0,0 +1,152 @@
+# replay.py
+import argparse
+import numpy as np
+from recorder import open_recording
+
+
+class Replay:
+    """
+    Random access to a recording written by recorder.Recorder.
+
+    Nothing is read up front: the files are memory-mapped, and frame() only touches
+    the slices of the tick it is asked for, so opening a multi-gigabyte recording is immediate
+    and any tick is one index lookup away.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.recording = open_recording(path)
+        self.meta = self.recording["meta"]
+        self.index = self.recording["index"]
+        self.ticks = np.asarray(self.index[:, 0])
+        self.grid_ticks = np.asarray(self.recording["grid_index"])
+        # Shown before the first grid snapshot.
+        self.empty_grid = np.zeros((self.meta["grid_size"], self.meta["grid_size"]), dtype=self.meta["grid_dtype"])
+
+    def __len__(self):
+        return len(self.ticks)
+
+    @property
+    def first_tick(self):
+        return int(self.ticks[0]) if len(self) else 0
+
+    @property
+    def last_tick(self):
+        return int(self.ticks[-1]) if len(self) else 0
+
+    def seek(self, tick):
+        """Index of the last recorded tick at or before `tick` (clamped to the recording)."""
+        return int(np.clip(np.searchsorted(self.ticks, tick, side="right") - 1, 0, max(len(self) - 1, 0)))
+
+    def frame(self, tick):
+        """
+        Decodes the state at `tick` (or the closest earlier recorded tick).
+
+        Grids are only stored every grid_every ticks, so the grid is the latest snapshot at or before the tick.
+
+        Returns:
+            tuple: (tick, positions (n, 2), modes (n,), grid) as memory-mapped views.
+        """
+        i = self.seek(tick)
+        shown, offset, count = (int(value) for value in self.index[i])
+        positions = self.recording["pos"][offset:offset + count]
+        modes = self.recording["mode"][offset:offset + count]
+
+        g = np.searchsorted(self.grid_ticks, shown, side="right") - 1
+        grid = self.recording["grid"][g] if g >= 0 else self.empty_grid
+        return shown, positions, modes, grid
+
+
+def play(paths, speed=1.0, start=None, fps=60):
+    """
+    Plays one or more recordings side by side in the pygame window.
+
+    All panels show the same tick, so runs of different Figure 3 cases can be compared directly.
+
+    Controls:
+        Space: pause / resume.   Left / Right: step one tick back / forward (pauses).
+        Up / Down: double / halve the speed.   R: reverse the direction of play.
+        Page Up / Page Down: jump 100 ticks.   Home / End: jump to the start / end.
+        Mouse wheel or + / -: zoom.   Drag or W / A / S / D: pan.   0: show the whole grid.
+
+    Args:
+        paths (list): Recording directories, one panel each.
+        speed (float): Ticks advanced per frame (may be fractional).
+        start (int): Tick to start at (default: the first recorded tick).
+        fps (int): Frame rate of the window.
+    """
+    # Imported here so Replay can be used for analysis without pygame (gui first: it silences pygame's banner).
+    from gui import GUI
+    import pygame
+
+    replays = [Replay(path) for path in paths]
+    first = min(replay.first_tick for replay in replays)
+    last = max(replay.last_tick for replay in replays)
+    gui = GUI(panels=len(replays), grid_size=replays[0].meta["grid_size"])
+
+    tick = float(first if start is None else start)
+    direction = 1
+    paused = False
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if(event.type == pygame.QUIT):
+                running = False
+            elif(event.type == pygame.KEYDOWN):
+                if(event.key == pygame.K_SPACE):
+                    paused = not paused
+                elif(event.key == pygame.K_RIGHT):
+                    paused, tick = True, tick + 1
+                elif(event.key == pygame.K_LEFT):
+                    paused, tick = True, tick - 1
+                elif(event.key == pygame.K_UP):
+                    speed *= 2
+                elif(event.key == pygame.K_DOWN):
+                    speed /= 2
+                elif(event.key == pygame.K_r):
+                    direction = -direction
+                elif(event.key == pygame.K_PAGEUP):
+                    tick += 100
+                elif(event.key == pygame.K_PAGEDOWN):
+                    tick -= 100
+                elif(event.key == pygame.K_HOME):
+                    tick = first
+                elif(event.key == pygame.K_END):
+                    tick = last
+                else:
+                    gui.handle_view_event(event)
+            else:
+                gui.handle_view_event(event)
+        if(not running):
+            break
+
+        tick = min(max(tick, first), last)
+        for panel, replay in enumerate(replays):
+            _, positions, _, grid = replay.frame(int(tick))
+            gui.draw_frame(positions, grid, panel)
+        pygame.display.set_caption(f"Tick {int(tick)} / {last}   speed {direction * speed:g}{'   (paused)' if paused else ''}")
+        pygame.display.flip()
+        gui.clock.tick(fps)
+
+        if(not paused):
+            tick += direction * speed
+    gui.quit_gui()
+
+
+def main(argv=None):
+    """
+    Replays recorded runs from the command line.
+
+    Example:
+        python -m replay runs/fig3a runs/fig3c --speed 4 --start 1000
+    """
+    parser = argparse.ArgumentParser(description="Play back recordings made with --record.")
+    parser.add_argument("paths", nargs="+", help="recording directories (shown side by side)")
+    parser.add_argument("--speed", type=float, default=1.0, help="ticks per frame")
+    parser.add_argument("--start", type=int, default=None, help="tick to start at")
+    parser.add_argument("--fps", type=int, default=60, help="frame rate of the window")
+    args = parser.parse_args(argv)
+    play(args.paths, args.speed, args.start, args.fps)
+
+if __name__ == "__main__":
+    main()
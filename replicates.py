@@ -0,0 +1,268 @@
+# replicates.py
+import argparse
+import contextlib
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import config
+from colony import seed_entropy
+from convergence import ConvergenceMonitor
+from frames import render_frame, write_png
+from main import Simulation, parse_seed
+from settings import SimulationConfig
+from store import ResultStore, store_run
+
+# The three fidelity cases of the Figure 3 replication (see README "Replication").
+FIGURE_3_CASES = {
+    "case1": {"FIDELITY": 255},
+    "case2": {"FIDELITY": 251},
+    "case3": {"FIDELITY": 247},
+}
+
+
+@contextlib.contextmanager
+def config_override(overrides):
+    """
+    Temporarily replaces config.py values, e.g. {"FIDELITY": 251}.
+
+    For code that still reads the config module directly (e.g. the GUI). Simulations take a
+    SimulationConfig instead (see settings.py), which needs no patching and can't leak into other runs.
+    """
+    previous = {}
+    for name, value in overrides.items():
+        if(not hasattr(config, name)):
+            raise KeyError(f"Unknown config parameter: {name}")
+        previous[name] = getattr(config, name)
+        setattr(config, name, value)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(config, name, value)
+
+
+def derive_seed(base_seed, replicate):
+    """
+    Derives the seed of one replicate from the study's base seed.
+
+    The seed depends only on (base_seed, replicate), never on which worker
+    runs it or in which order, so every replicate can be rerun on its own.
+    """
+    entropy = seed_entropy(base_seed)
+    if(entropy is None):
+        raise ValueError("Replicates need a base seed; set RANDOM_SEED or pass base_seed")
+    return int(np.random.SeedSequence([entropy, replicate]).generate_state(1, np.uint64)[0])
+
+
+def run_replicate(overrides, seed, base=None, figure=None, convergence=None, store=None):
+    """
+    Runs one headless simulation with the given config overrides and seed.
+
+    Args:
+        overrides (dict): Config values to change, e.g. {"FIDELITY": 251}.
+        seed: Seed of this run.
+        base (SimulationConfig): Settings the overrides apply to (default: SimulationConfig.current()).
+        figure (str): Write a PNG of the final state to this path (see frames.render_frame).
+        convergence (dict): Stop once the run is steady, e.g. {"window": 100} (ConvergenceMonitor arguments).
+        store (str): Results store directory (see store.py). A run already in it is not simulated again;
+            a new one is added to it.
+
+    Returns:
+        tuple: The calculate_stats() result (F/L ratio, [lost, followers]). With `convergence`,
+        the tick the run ended at is appended as a third item.
+    """
+    base = base if base is not None else SimulationConfig.current()
+    settings = base.replace(**overrides, RANDOM_SEED=seed)
+    extra = {"convergence": convergence} if convergence is not None else None
+    results = ResultStore(store) if store is not None else None
+    try:
+        cached = lookup(results, settings, figure, extra)
+        if(cached is not None):
+            stats, ticks = cached["stats"], cached["ticks"]
+        else:
+            monitor = ConvergenceMonitor(**convergence) if convergence is not None else None
+            sim = Simulation(headless=True, settings=settings, convergence=monitor)
+            stats = sim.loop(verbose=False)
+            ticks = sim.tick
+            if(figure is not None):
+                write_png(figure, render_frame(sim.colony.get_positions(), sim.grid))
+            if(results is not None):
+                store_run(results, sim, extra)
+    finally:
+        if(results is not None):
+            results.close()
+    if(convergence is not None):
+        return stats + (ticks,)
+    return stats
+
+
+def lookup(results, settings, figure=None, extra=None):
+    """
+    A finished run from a results store, drawing its figure from the stored final state.
+
+    Returns:
+        dict: See ResultStore.get(); None if there is no store, the run is not in it, or the
+        figure is wanted but the arrays to draw it have been evicted.
+    """
+    if(results is None):
+        return None
+    cached = results.get(settings, extra)
+    if(cached is None or figure is None):
+        return cached
+    grid, positions = results.load(cached["key"], "grid"), results.load(cached["key"], "positions")
+    if(grid is None or positions is None):
+        return None
+    write_png(figure, render_frame(positions, grid))
+    return cached
+
+
+def run_cases(cases, replicates, base_seed=None, workers=None, ensemble=False, figures=None, store=None):
+    """
+    Runs every case `replicates` times, fanning all runs out over one process pool.
+
+    Args:
+        cases (dict): Case name -> config overrides, e.g. FIGURE_3_CASES.
+        replicates (int): Number of runs per case.
+        base_seed: Seed the replicate seeds are derived from (default: config.RANDOM_SEED).
+            Replicate i gets the same seed in every case, so cases differ only in their parameters.
+        workers (int): Number of processes (default: all cores). 1 runs everything in this process.
+        ensemble (bool): Batch the runs into one Ensemble per worker (see ensemble.py) instead of
+            running them one by one. Same results, less Python overhead per run.
+        figures (str): Directory to write the final state of every run into, as <case>/<replicate>.png
+            (the layout of runs/case*/).
+        store (str): Results store directory (see store.py). Runs already in it are not simulated again
+            and new ones are added (batched runs without their per-tick statistics).
+
+    Returns:
+        dict: Case name -> list of calculate_stats() results, in replicate order
+        (the same layout as runs/case*/data.pkl).
+    """
+    if(base_seed is None):
+        base_seed = config.RANDOM_SEED
+    seeds = [derive_seed(base_seed, i) for i in range(replicates)]
+    jobs = [(name, overrides, seed) for name, overrides in cases.items() for seed in seeds]
+    # Resolved here and handed to every run, so worker processes don't fall back to their own config module.
+    base = SimulationConfig.current()
+    paths = [None] * len(jobs)
+    if(figures is not None):
+        for name in cases:
+            os.makedirs(os.path.join(figures, name), exist_ok=True)
+        paths = [os.path.join(figures, name, f"{i % replicates}.png") for i, (name, _, _) in enumerate(jobs)]
+
+    if(ensemble):
+        stats = _run_ensembles([base.replace(**overrides, RANDOM_SEED=seed) for _, overrides, seed in jobs],
+                               paths, workers, store)
+    elif(workers == 1):
+        stats = [run_replicate(overrides, seed, base, path, store=store) for (_, overrides, seed), path in zip(jobs, paths)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            stats = list(pool.map(run_replicate, [job[1] for job in jobs], [job[2] for job in jobs],
+                                  [base] * len(jobs), paths, [None] * len(jobs), [store] * len(jobs)))
+
+    results = {name: [] for name in cases}
+    for (name, _, _), result in zip(jobs, stats):
+        results[name].append(result)
+    return results
+
+
+def _run_ensembles(members, paths, workers, store):
+    """run_cases(ensemble=True): runs the members not found in the store as one Ensemble per worker."""
+    from ensemble import run_batch
+    results = ResultStore(store) if store is not None else None
+    stats = [None] * len(members)
+    try:
+        for i, (member, path) in enumerate(zip(members, paths)):
+            cached = lookup(results, member, path)
+            if(cached is not None):
+                stats[i] = cached["stats"]
+        missing = [i for i, result in enumerate(stats) if result is None]
+        if(missing):
+            size = -(-len(missing) // min(workers or os.cpu_count(), len(missing)))
+            batches = [[members[i] for i in missing[start:start + size]] for start in range(0, len(missing), size)]
+            path_batches = [[paths[i] for i in missing[start:start + size]] for start in range(0, len(missing), size)]
+            # Every batch adds its members to the store itself, with their final arrays.
+            if(len(batches) == 1):
+                computed = run_batch(batches[0], path_batches[0], store)
+            else:
+                with ProcessPoolExecutor(max_workers=len(batches)) as pool:
+                    computed = [result for batch in pool.map(run_batch, batches, path_batches, [store] * len(batches))
+                                for result in batch]
+            for i, result in zip(missing, computed):
+                stats[i] = result
+    finally:
+        if(results is not None):
+            results.close()
+    return stats
+
+
+def run_replicates(overrides=None, replicates=10, base_seed=None, workers=None, ensemble=False, store=None):
+    """Runs a single configuration `replicates` times. Returns the list of calculate_stats() results."""
+    return run_cases({"run": overrides or {}}, replicates, base_seed, workers, ensemble, store=store)["run"]
+
+
+def summarize(results):
+    """
+    Aggregates replicate results into the numbers reported in the README.
+
+    Args:
+        results (list): calculate_stats() results, e.g. one case of run_cases().
+
+    Returns:
+        dict: Mean and standard deviation of the follower count, lost count and F/L ratio.
+    """
+    ratios = np.array([result[0] for result in results], dtype=float)
+    lost = np.array([result[1][0] for result in results], dtype=float)
+    followers = np.array([result[1][1] for result in results], dtype=float)
+    return {
+        "replicates": len(results),
+        "followers_mean": followers.mean(),
+        "followers_std": followers.std(),
+        "lost_mean": lost.mean(),
+        "lost_std": lost.std(),
+        "fl_ratio_mean": ratios.mean(),
+        "fl_ratio_std": ratios.std(),
+    }
+
+
+def main(argv=None):
+    """
+    Runs the Figure 3 replication study from the command line.
+
+    Example:
+        python -m replicates --replicates 10 --out runs --figures
+
+    Writes <out>/<case>/data.pkl for every case (and with --figures the final state of every
+    replicate as <out>/<case>/<replicate>.png) and prints the averaged statistics.
+    """
+    parser = argparse.ArgumentParser(description="Run the Figure 3 replication cases in parallel.")
+    parser.add_argument("--replicates", type=int, default=10, help="runs per fidelity case")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=parse_seed, default=config.RANDOM_SEED, help="base seed the replicate seeds are derived from")
+    parser.add_argument("--out", default=None, help="directory to write <case>/data.pkl into")
+    parser.add_argument("--ensemble", action="store_true", help="batch the runs of each worker into one ensemble")
+    parser.add_argument("--figures", action="store_true", help="also write the final state of every run as <out>/<case>/<replicate>.png")
+    parser.add_argument("--store", default=None, help="results store directory: reuse finished runs and add new ones")
+    args = parser.parse_args(argv)
+    if(args.figures and args.out is None):
+        parser.error("--figures needs --out")
+
+    results = run_cases(FIGURE_3_CASES, args.replicates, args.seed, args.workers, args.ensemble,
+                        args.out if args.figures else None, args.store)
+
+    for name, case_results in results.items():
+        summary = summarize(case_results)
+        print(f'{name} (Fidelity {FIGURE_3_CASES[name]["FIDELITY"]}): '
+              f'Followers {summary["followers_mean"]:.1f} +/- {summary["followers_std"]:.1f}  |  '
+              f'Lost {summary["lost_mean"]:.1f} +/- {summary["lost_std"]:.1f}  |  '
+              f'F-L Ratio {summary["fl_ratio_mean"]:.3f} +/- {summary["fl_ratio_std"]:.3f}')
+
+        if(args.out is not None):
+            os.makedirs(os.path.join(args.out, name), exist_ok=True)
+            with open(os.path.join(args.out, name, "data.pkl"), "wb") as f:
+                pickle.dump(case_results, f)
+
+    return results
+
+if __name__ == "__main__":
+    main()
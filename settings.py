@@ -0,0 +1,106 @@
+# settings.py
+import dataclasses
+import functools
+import config
+
+
+@dataclasses.dataclass(frozen=True)
+class SimulationConfig:
+    """
+    The model parameters of one simulation, fixed for its lifetime.
+
+    Field names match config.py, so override dicts such as {"FIDELITY": 251} work unchanged.
+    The defaults are the values written in config.py; current() also picks up changes made to
+    the config module at run time (by a CLI or a test).
+
+    An instance is immutable and picklable: every Simulation, colony and field built from it
+    reads its parameters here instead of from the module, so runs with different settings can
+    share one process (or be shipped to worker processes) without patching config.py.
+    The tables derived from the parameters are computed once per instance.
+    """
+
+    GRID_SIZE: int = config.GRID_SIZE
+    TIMESTEPS: int = config.TIMESTEPS
+    RANDOM_SEED: object = config.RANDOM_SEED
+    EVAPORATION_MODE: str = config.EVAPORATION_MODE
+    GRID_DTYPE: str = config.GRID_DTYPE
+    FIDELITY: int = config.FIDELITY
+    DEPOSITION_RATE: float = config.DEPOSITION_RATE
+    EVAPORATION_RATE: float = config.EVAPORATION_RATE
+    INITIAL_BURST_SIZE: int = config.INITIAL_BURST_SIZE
+    TIMESTEP_STOP: int = config.TIMESTEP_STOP
+    TURNING_KERNEL: tuple = tuple(config.TURNING_KERNEL)
+
+    def __post_init__(self):
+        # Kept as a tuple so the instance stays hashable and the kernel can't be edited in place.
+        object.__setattr__(self, "TURNING_KERNEL", tuple(self.TURNING_KERNEL))
+        if(len(self.TURNING_KERNEL) != 4):
+            raise ValueError(f"TURNING_KERNEL needs 4 values, got {len(self.TURNING_KERNEL)}")
+
+    @classmethod
+    def names(cls):
+        """The parameter names, in declaration order."""
+        return tuple(field.name for field in dataclasses.fields(cls))
+
+    @classmethod
+    def current(cls, **overrides):
+        """
+        Settings from the config module as it is now, with some values replaced.
+
+        Args:
+            **overrides: Parameters to change, e.g. current(FIDELITY=251).
+        """
+        values = {name: getattr(config, name) for name in cls.names()}
+        return cls(**values).replace(**overrides)
+
+    def replace(self, **overrides):
+        """A copy with some parameters changed; unknown names raise a KeyError (like config_override)."""
+        for name in overrides:
+            if(name not in self.names()):
+                raise KeyError(f"Unknown config parameter: {name}")
+        if(not overrides):
+            return self
+        return dataclasses.replace(self, **overrides)
+
+    def as_dict(self, names=None):
+        """The parameters as a plain dict (the kernel as a list), e.g. for a JSON file."""
+        values = {name: getattr(self, name) for name in (names or self.names())}
+        if("TURNING_KERNEL" in values):
+            values["TURNING_KERNEL"] = list(values["TURNING_KERNEL"])
+        return values
+
+    # Derived values. cached_property stores them in the instance __dict__, which a frozen
+    # dataclass still allows, so each is computed at most once per settings object.
+
+    @functools.cached_property
+    def center(self):
+        """The nest cell, where all ants are released."""
+        return (self.GRID_SIZE // 2, self.GRID_SIZE // 2)
+
+    @functools.cached_property
+    def fidelity(self):
+        """FIDELITY normalized from the paper's 0-255 scale to a probability."""
+        return self.FIDELITY / 256
+
+    @functools.cached_property
+    def deposit_amount(self):
+        """Pheromone an ant adds per tick; one unit more than DEPOSITION_RATE, since it evaporates at the top of the next tick."""
+        return self.DEPOSITION_RATE + 1
+
+    @functools.cached_property
+    def max_population(self):
+        """Largest possible population: the burst plus one release per tick until TIMESTEP_STOP."""
+        return self.INITIAL_BURST_SIZE + min(self.TIMESTEPS, self.TIMESTEP_STOP)
+
+    @functools.cached_property
+    def kernel_weights(self):
+        """Turning probabilities of TURNING_KERNEL (see ant.kernel_weights)."""
+        # Imported here because ant.py builds on this module.
+        from ant import kernel_weights
+        return tuple(kernel_weights(self.TURNING_KERNEL))
+
+    @functools.cached_property
+    def kernel_cdf(self):
+        """Cumulative turning probabilities of TURNING_KERNEL (see ant.kernel_cdf)."""
+        from ant import kernel_cdf
+        return kernel_cdf(self.TURNING_KERNEL)
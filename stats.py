@@ -0,0 +1,52 @@
+# stats.py
+import numpy as np
+
+# Columns of the per-tick statistics. followers and lost match calculate_stats()
+# (lost = ants in Explore mode); absorbed counts ants that have left the lattice so far.
+COLUMNS = ("tick", "followers", "lost", "ratio", "absorbed", "pheromone")
+
+
+class StatsSeries:
+    """
+    Colony statistics at every tick, as one growing (ticks, len(COLUMNS)) array.
+
+    Nothing is rescanned to fill a row: the colony keeps its follower, live and absorbed counts
+    up to date as ants switch modes, spawn and leave the lattice, and the pheromone field keeps
+    its own total (see LazyField.total), so record() is O(1) per tick.
+    """
+
+    def __init__(self, capacity=1024):
+        """
+        Args:
+            capacity (int): Rows allocated up front (the array doubles when it fills up).
+        """
+        self._rows = np.zeros((capacity, len(COLUMNS)))
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def record(self, tick, colony, field):
+        """Appends the statistics of `colony` and `field` as of `tick`."""
+        if(self.count == len(self._rows)):
+            grown = np.zeros((2 * len(self._rows), len(COLUMNS)))
+            grown[:self.count] = self._rows
+            self._rows = grown
+        lost, followers = colony.count_modes()
+        ratio = followers / lost if lost > 0 else 0
+        self._rows[self.count] = (tick, followers, lost, ratio, colony.absorbed, field.total())
+        self.count += 1
+
+    @property
+    def array(self):
+        """The recorded rows (a view)."""
+        return self._rows[:self.count]
+
+    def column(self, name):
+        """One column of the recorded rows, e.g. column("ratio")."""
+        return self.array[:, COLUMNS.index(name)]
+
+    def to_csv(self, path):
+        """Writes the series as a CSV table with a header row."""
+        np.savetxt(path, self.array, delimiter=",", header=",".join(COLUMNS), comments="",
+                   fmt=["%d", "%d", "%d", "%.6f", "%d", "%.6g"])
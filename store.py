@@ -0,0 +1,266 @@
+# store.py
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import numpy as np
+from settings import SimulationConfig
+
+# Source files whose contents decide what a run produces. Changing any of them changes the code
+# version, so results of older code are never served for the current one.
+MODEL_FILES = ("ant.py", "colony.py", "pheromone.py", "main.py", "settings.py", "convergence.py", "stats.py",
+               "ensemble.py")
+
+# Arrays kept per run (see ResultStore.put): the final grid and ant positions, and the per-tick statistics (StatsSeries).
+# Ensemble runs have no per-tick statistics, so they only keep the first two.
+ARTIFACTS = ("grid", "positions", "series")
+
+# Engines a stored run can come from. They give identical results for the same key (see ensemble.py),
+# so the engine is recorded with a run but is not part of its key.
+ENGINES = ("simulation", "ensemble")
+
+
+@functools.lru_cache(maxsize=None)
+def code_version():
+    """Short hash of the model source files (MODEL_FILES)."""
+    digest = hashlib.sha256()
+    root = os.path.dirname(os.path.abspath(__file__))
+    for name in MODEL_FILES:
+        with open(os.path.join(root, name), "rb") as f:
+            digest.update(name.encode() + b"\0" + f.read())
+    return digest.hexdigest()[:16]
+
+
+def _encode(value):
+    """A parameter as stored in its column: numbers as they are, anything else (the kernel, a string seed) as JSON."""
+    if(isinstance(value, (int, float)) and not isinstance(value, bool)):
+        return value
+    return json.dumps(list(value) if isinstance(value, tuple) else value)
+
+
+def run_key(settings, extra=None):
+    """
+    Content address of a run: a hash of every model parameter (the seed included), the code version
+    and `extra`, anything else that changes the result (e.g. convergence options).
+    """
+    text = json.dumps({"params": settings.as_dict(), "code": code_version(), "extra": extra}, sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class ResultStore:
+    """
+    Finished simulation results, keyed by configuration, seed and code version.
+
+    A directory holding an SQLite index (index.sqlite) and one .npy file per stored array.
+    The index has a column per model parameter, so runs can be queried without opening any files
+    (find(FIDELITY=251)); arrays are memory-mapped on load instead of unpickled.
+    Bulky arrays can be evicted by size, least recently used first; the statistics stay in the index.
+
+    Several processes may use one store at once (SQLite serializes the writes).
+    Lookups report the engine a run came from and the arrays it still has ("arrays").
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Store directory (created if needed).
+        """
+        self.path = path
+        os.makedirs(os.path.join(path, "arrays"), exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(path, "index.sqlite"), timeout=60)
+        params = ", ".join(f'"{name}"' for name in SimulationConfig.names())
+        with self.db:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute(f"""CREATE TABLE IF NOT EXISTS runs (
+                key TEXT PRIMARY KEY, code TEXT, extra TEXT, fl_ratio REAL, lost INTEGER, followers INTEGER,
+                ticks INTEGER, created REAL, engine TEXT, {params})""")
+            columns = [row[1] for row in self.db.execute("PRAGMA table_info(runs)")]
+            if("engine" not in columns):
+                # Stores created before runs recorded their engine only held Simulation runs.
+                self.db.execute("ALTER TABLE runs ADD COLUMN engine TEXT DEFAULT 'simulation'")
+            self.db.execute("""CREATE TABLE IF NOT EXISTS artifacts (
+                key TEXT, name TEXT, file TEXT, bytes INTEGER, used REAL, PRIMARY KEY (key, name))""")
+            self.db.execute('CREATE INDEX IF NOT EXISTS runs_fidelity ON runs ("FIDELITY")')
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, settings, extra=None):
+        """
+        Looks up a finished run.
+
+        Without `extra` (no convergence monitor), a run counts as finished only if it reached TIMESTEPS;
+        one cut short (e.g. by closing the window) is never served.
+
+        Returns:
+            dict: "key", "stats" (the calculate_stats() result), "ticks" (tick the run ended at),
+            "engine" and "arrays" (names of the arrays still stored), or None if the run is not stored.
+        """
+        key = run_key(settings, extra)
+        row = self.db.execute("SELECT fl_ratio, lost, followers, ticks, engine FROM runs WHERE key = ?", (key,)).fetchone()
+        if(row is None or (extra is None and row[3] < settings.TIMESTEPS)):
+            return None
+        return {"key": key, "stats": (row[0], [row[1], row[2]]), "ticks": row[3], "engine": row[4],
+                "arrays": self.arrays(key)}
+
+    def arrays(self, key):
+        """Names of the arrays stored for a run (see ARTIFACTS), without the evicted ones."""
+        return sorted(name for (name,) in self.db.execute("SELECT name FROM artifacts WHERE key = ?", (key,)))
+
+    def put(self, settings, stats, extra=None, ticks=None, engine="simulation", **arrays):
+        """
+        Stores a finished run (replacing an earlier copy).
+
+        Args:
+            settings (SimulationConfig): Parameters of the run.
+            stats (tuple): Its calculate_stats() result.
+            extra (dict): Anything else the result depends on (part of the key).
+            ticks (int): Tick the run ended at (default: settings.TIMESTEPS).
+            engine (str): What ran it (see ENGINES).
+            **arrays: Arrays to keep with it, e.g. grid=sim.grid (see ARTIFACTS).
+
+        Returns:
+            str: The run's key.
+        """
+        if(engine not in ENGINES):
+            raise ValueError(f"Unknown engine {engine!r}; choose from {ENGINES}")
+        key = run_key(settings, extra)
+        names = SimulationConfig.names()
+        values = [_encode(getattr(settings, name)) for name in names]
+        ticks = ticks if ticks is not None else settings.TIMESTEPS
+        now = time.time()
+        # Arrays first: a run is only found once everything it lists is on disk.
+        files = []
+        for name, array in arrays.items():
+            file = f"{key}_{name}.npy"
+            np.save(os.path.join(self.path, "arrays", file), np.asarray(array))
+            files.append((key, name, file, os.path.getsize(os.path.join(self.path, "arrays", file)), now))
+        # A replaced run must not keep arrays of its earlier copy that this one does not have.
+        stale = [file for name, file in self.db.execute("SELECT name, file FROM artifacts WHERE key = ?", (key,))
+                 if name not in arrays]
+        columns = ["key", "code", "extra", "fl_ratio", "lost", "followers", "ticks", "created", "engine"] + list(names)
+        quoted = ", ".join(f'"{name}"' for name in columns)
+        with self.db:
+            self.db.execute("DELETE FROM artifacts WHERE key = ?", (key,))
+            self.db.executemany("INSERT INTO artifacts VALUES (?, ?, ?, ?, ?)", files)
+            self.db.execute(
+                f'INSERT OR REPLACE INTO runs ({quoted}) VALUES ({", ".join("?" * len(columns))})',
+                [key, code_version(), json.dumps(extra, sort_keys=True), float(stats[0]), int(stats[1][0]),
+                 int(stats[1][1]), ticks, now, engine] + values,
+            )
+        self._remove(stale)
+        return key
+
+    def find(self, code=None, **params):
+        """
+        Queries the stored runs by parameter value, e.g. find(FIDELITY=251) or find(FIDELITY=251, TIMESTEPS=1500).
+
+        Args:
+            code (str): Only runs of this code version (default: any; pass code_version() for the current one).
+            **params: Parameter values to match.
+
+        Returns:
+            list: One dict per run: "key", "params" (SimulationConfig), "stats" (calculate_stats() layout),
+            "ticks", "code", "extra", "engine" and "arrays" (as in get()), oldest first.
+        """
+        names = SimulationConfig.names()
+        conditions, values = [], []
+        for name, value in params.items():
+            if(name not in names):
+                raise KeyError(f"Unknown config parameter: {name}")
+            conditions.append(f'"{name}" = ?')
+            values.append(_encode(value))
+        if(code is not None):
+            conditions.append("code = ?")
+            values.append(code)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        columns = ", ".join(f'"{name}"' for name in names)
+        rows = self.db.execute(
+            f"SELECT key, code, extra, fl_ratio, lost, followers, ticks, engine, {columns} FROM runs {where} ORDER BY created",
+            values,
+        ).fetchall()
+        results = []
+        for row in rows:
+            settings = {name: value if not isinstance(value, str) else json.loads(value)
+                        for name, value in zip(names, row[8:])}
+            results.append({
+                "key": row[0],
+                "code": row[1],
+                "extra": json.loads(row[2]),
+                "stats": (row[3], [row[4], row[5]]),
+                "ticks": row[6],
+                "engine": row[7],
+                "arrays": self.arrays(row[0]),
+                "params": SimulationConfig(**settings),
+            })
+        return results
+
+    def load(self, key, name):
+        """
+        A stored array of a run, memory-mapped (nothing is read until it is used).
+
+        Returns:
+            np.ndarray: The array, or None if it was never stored or has been evicted.
+        """
+        row = self.db.execute("SELECT file FROM artifacts WHERE key = ? AND name = ?", (key, name)).fetchone()
+        if(row is None):
+            return None
+        with self.db:
+            self.db.execute("UPDATE artifacts SET used = ? WHERE key = ? AND name = ?", (time.time(), key, name))
+        return np.load(os.path.join(self.path, "arrays", row[0]), mmap_mode="r")
+
+    def size(self):
+        """Bytes taken by the stored arrays."""
+        return self.db.execute("SELECT COALESCE(SUM(bytes), 0) FROM artifacts").fetchone()[0]
+
+    def evict(self, max_bytes):
+        """
+        Deletes stored arrays, least recently used first, until they take at most `max_bytes`.
+        The statistics of every run stay in the index.
+
+        Returns:
+            int: Number of arrays deleted.
+        """
+        excess = self.size() - max_bytes
+        if(excess <= 0):
+            return 0
+        victims = []
+        for key, name, file, size in self.db.execute("SELECT key, name, file, bytes FROM artifacts ORDER BY used"):
+            if(excess <= 0):
+                break
+            victims.append((key, name, file))
+            excess -= size
+        with self.db:
+            self.db.executemany("DELETE FROM artifacts WHERE key = ? AND name = ?", [victim[:2] for victim in victims])
+        self._remove([file for _, _, file in victims])
+        return len(victims)
+
+    def _remove(self, files):
+        for file in files:
+            try:
+                os.remove(os.path.join(self.path, "arrays", file))
+            except FileNotFoundError:
+                pass
+
+
+def store_run(store, sim, extra=None):
+    """
+    Stores a finished Simulation with its final grid, ant positions and per-tick statistics.
+
+    Returns:
+        str: The run's key, or None if the run was not stored because it stopped before TIMESTEPS
+        without its convergence monitor ending it (e.g. the window was closed).
+    """
+    converged = sim.convergence is not None and sim.convergence.converged_at is not None
+    if(sim.tick < sim.settings.TIMESTEPS and not converged):
+        return None
+    return store.put(sim.settings, sim.calculate_stats(), extra, sim.tick,
+                     grid=sim.grid, positions=sim.colony.get_positions(), series=sim.stats.array)
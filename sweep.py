@@ -0,0 +1,234 @@
+# sweep.py
+import argparse
+import csv
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import config
+from main import parse_seed
+from replicates import derive_seed, run_replicate
+from settings import SimulationConfig
+
+# Parameters a sweep may vary. Anything else in config.py is treated as fixed.
+SWEEP_PARAMETERS = (
+    "FIDELITY",
+    "DEPOSITION_RATE",
+    "EVAPORATION_RATE",
+    "INITIAL_BURST_SIZE",
+    "TIMESTEP_STOP",
+    "TURNING_KERNEL",
+    "TIMESTEPS",
+)
+
+# The Initial Burst Hypothesis experiments from the README (FIDELITY 255, 1500 timesteps).
+BURST_EXPERIMENTS = [
+    {"FIDELITY": 255, "INITIAL_BURST_SIZE": 0, "TIMESTEP_STOP": 1500},     # A: no burst
+    {"FIDELITY": 255, "INITIAL_BURST_SIZE": 120, "TIMESTEP_STOP": 1500},   # B: burst, no limit
+    {"FIDELITY": 255, "INITIAL_BURST_SIZE": 120, "TIMESTEP_STOP": 1000},   # C: burst + limit
+]
+
+PRESETS = {
+    "burst": BURST_EXPERIMENTS,
+    "figure3": [{"FIDELITY": 255}, {"FIDELITY": 251}, {"FIDELITY": 247}],
+}
+
+# ticks is the tick a run ended at: TIMESTEPS, or earlier if it converged (see run_sweep(convergence=...));
+# convergence holds the ConvergenceMonitor arguments the run used as JSON (empty if it ran to the end).
+COLUMNS = ["params", "replicate", "seed", "fl_ratio", "lost", "followers", "ticks", "convergence"]
+
+
+def grid_points(axes):
+    """
+    Expands a parameter grid into a list of points.
+
+    Args:
+        axes (dict): Parameter name -> list of values, e.g. {"FIDELITY": [255, 251], "DEPOSITION_RATE": [4, 8]}.
+
+    Returns:
+        list: One dict per combination, in itertools.product order.
+    """
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*(axes[name] for name in names))]
+
+
+def point_key(point):
+    """Canonical JSON text of a point, used to recognise runs that are already in the results table."""
+    return json.dumps(point, sort_keys=True)
+
+
+def load_results(path):
+    """
+    Reads a results table written by run_sweep().
+
+    Rows cut short by an interrupted write are skipped, so they are simply run again on resume.
+
+    Returns:
+        list: One dict per finished run, with "params" and "convergence" decoded back into dicts
+        ("ticks" and "convergence" are None in tables written before those columns existed).
+    """
+    if(not os.path.exists(path)):
+        return []
+    rows = []
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            try:
+                rows.append({
+                    "params": json.loads(row["params"]),
+                    "replicate": int(row["replicate"]),
+                    "seed": int(row["seed"]),
+                    "fl_ratio": float(row["fl_ratio"]),
+                    "lost": int(row["lost"]),
+                    "followers": int(row["followers"]),
+                    "ticks": int(row["ticks"]) if row.get("ticks") else None,
+                    "convergence": json.loads(row["convergence"]) if row.get("convergence") else None,
+                })
+            except (TypeError, ValueError, json.JSONDecodeError):
+                continue
+    return rows
+
+
+def _open_table(path):
+    """
+    Opens the results table for appending, writing the header for a new file and dropping a cut-off last line.
+
+    Returns:
+        tuple: The open file and its columns (those of its header, for tables written with fewer COLUMNS).
+    """
+    if(os.path.exists(path) and os.path.getsize(path) > 0):
+        # A run killed mid-write leaves a partial row (possibly with an unclosed quote,
+        # which would swallow the rows appended after it). Truncate back to the last complete line.
+        with open(path, "rb+") as f:
+            data = f.read()
+            if(not data.endswith(b"\n")):
+                f.truncate(data.rfind(b"\n") + 1)
+    columns = COLUMNS
+    if(os.path.exists(path) and os.path.getsize(path) > 0):
+        with open(path, newline="") as f:
+            columns = next(csv.reader(f))
+    else:
+        with open(path, "w", newline="") as f:
+            f.write(",".join(COLUMNS) + "\n")
+    return open(path, "a", newline=""), columns
+
+
+def run_sweep(points, replicates, path, base_seed=None, workers=None, convergence=None, store=None):
+    """
+    Runs every point of a sweep `replicates` times and streams the results into a CSV table.
+
+    Each finished run is appended and flushed immediately. Runs already in the table
+    (same point, replicate, seed and convergence options) are skipped, so an interrupted sweep
+    resumes where it stopped.
+
+    Args:
+        points (list): Parameter dicts, e.g. from grid_points() or PRESETS.
+        replicates (int): Runs per point. Replicate i uses the same derived seed at every point.
+        path (str): CSV results table.
+        base_seed: Seed the replicate seeds are derived from (default: config.RANDOM_SEED).
+        workers (int): Number of processes (default: all cores). 1 runs everything in this process.
+        convergence (dict): Stop each run once it is steady, e.g. {"window": 100}
+            (ConvergenceMonitor arguments); the "ticks" column shows where it stopped.
+        store (str): Results store directory (see store.py). Runs already in it are not simulated again,
+            even by another sweep, and new ones are added.
+
+    Returns:
+        int: Number of runs executed by this call.
+    """
+    for point in points:
+        for name in point:
+            if(name not in SWEEP_PARAMETERS):
+                raise KeyError(f"{name} cannot be swept; choose from {SWEEP_PARAMETERS}")
+
+    if(base_seed is None):
+        base_seed = config.RANDOM_SEED
+    # A run is only done if it used the same seed and convergence options, so a table resumed
+    # with another --seed or --converge gets the runs it is missing instead of silently mixing them.
+    options = point_key(convergence) if convergence is not None else ""
+    done = {
+        (point_key(row["params"]), row["replicate"], row["seed"],
+         point_key(row["convergence"]) if row["convergence"] is not None else "")
+        for row in load_results(path)
+    }
+    seeds = [derive_seed(base_seed, replicate) for replicate in range(replicates)]
+    jobs = [
+        (point, replicate, seeds[replicate])
+        for point in points
+        for replicate in range(replicates)
+        if (point_key(point), replicate, seeds[replicate], options) not in done
+    ]
+    # The fixed parameters, resolved once here and shipped with every job (see replicates.run_cases).
+    base = SimulationConfig.current()
+
+    table, columns = _open_table(path)
+    with table:
+        writer = csv.DictWriter(table, columns, extrasaction="ignore")
+
+        def record(point, replicate, seed, stats):
+            ticks = stats[2] if convergence is not None else base.replace(**point).TIMESTEPS
+            writer.writerow({"params": point_key(point), "replicate": replicate, "seed": seed, "fl_ratio": stats[0],
+                             "lost": stats[1][0], "followers": stats[1][1], "ticks": ticks, "convergence": options})
+            table.flush()
+
+        if(workers == 1):
+            for point, replicate, seed in jobs:
+                record(point, replicate, seed, run_replicate(point, seed, base, None, convergence, store))
+        else:
+            with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+                futures = {pool.submit(run_replicate, point, seed, base, None, convergence, store): (point, replicate, seed)
+                           for point, replicate, seed in jobs}
+                for future in as_completed(futures):
+                    record(*futures[future], future.result())
+
+    return len(jobs)
+
+
+def parse_axis(text):
+    """
+    Parses a "--param NAME=VALUES" argument.
+
+    VALUES is either a JSON list (needed for TURNING_KERNEL) or comma-separated numbers,
+    e.g. "FIDELITY=255,251,247" or 'TURNING_KERNEL=[[0.36,0.047,0.008,0.004]]'.
+    """
+    name, _, values = text.partition("=")
+    if(values.startswith("[")):
+        return name, json.loads(values)
+    return name, [json.loads(value) for value in values.split(",")]
+
+
+def main(argv=None):
+    """
+    Runs a parameter sweep from the command line.
+
+    Examples:
+        python -m sweep --preset burst --replicates 10 --out burst.csv
+        python -m sweep --param FIDELITY=255,251,247 --param DEPOSITION_RATE=4,8 --replicates 5 --out sweep.csv
+
+    Rerunning the same command after an interruption only runs the missing points.
+    With --converge WINDOW, each run stops once it has been steady for two windows (see convergence.py).
+    With --store DIR, runs finished by earlier sweeps or replicate runs are taken from that results store.
+    """
+    parser = argparse.ArgumentParser(description="Sweep model parameters over a worker pool.")
+    parser.add_argument("--preset", choices=sorted(PRESETS), help="predefined list of points")
+    parser.add_argument("--param", action="append", default=[], type=parse_axis, help="NAME=VALUES grid axis (repeatable)")
+    parser.add_argument("--replicates", type=int, default=10, help="runs per point")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--seed", type=parse_seed, default=config.RANDOM_SEED, help="base seed the replicate seeds are derived from")
+    parser.add_argument("--out", required=True, help="CSV results table (appended to and resumed from)")
+    parser.add_argument("--converge", type=int, default=None, metavar="WINDOW", help="stop runs once steady, checked every WINDOW ticks")
+    parser.add_argument("--converge-tolerance", type=float, default=0.02, help="largest relative change of the windowed statistics")
+    parser.add_argument("--store", default=None, help="results store directory: reuse finished runs and add new ones")
+    args = parser.parse_args(argv)
+    convergence = None
+    if(args.converge is not None):
+        convergence = {"window": args.converge, "tolerance": args.converge_tolerance}
+
+    points = list(PRESETS[args.preset]) if args.preset else [{}]
+    if(args.param):
+        axes = grid_points(dict(args.param))
+        points = [{**point, **axis_point} for point in points for axis_point in axes]
+
+    executed = run_sweep(points, args.replicates, args.out, args.seed, args.workers, convergence, args.store)
+    print(f"{executed} runs executed, {len(load_results(args.out))} results in {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -96,4 +96,33 @@ def test_relative_direction_rotation():
     # Global: N, NE, E, SE, S, SW, W, NW
     # Rotated: E, SE, S, SW, W, NW, N, NE
     # Index 7 is NE.
-    assert rels[7] == (1, -1)
\ No newline at end of file
+    assert rels[7] == (1, -1)
+
+
+def test_lookup_tables_match_rotated_lists():
+    """The precomputed tables must equal the lists the old per-step code rebuilt every call."""
+    from ant import RELATIVE_DIRECTIONS, TURN_TABLE
+    for heading in range(8):
+        rotated = Ant.VALID_DIRECTIONS[heading:] + Ant.VALID_DIRECTIONS[:heading]
+        assert list(RELATIVE_DIRECTIONS[heading]) == rotated
+        # Old turn(): [Straight, then (+1, -1), (+2, -2), (+3, -3) pairs, then the U-turn]
+        old_order = [heading]
+        for offset in (1, 2, 3):
+            old_order += [(heading + offset) % 8, (heading - offset) % 8]
+        old_order.append((heading + 4) % 8)
+        assert list(TURN_TABLE[heading]) == old_order
+
+def test_turning_kernel_frequencies():
+    """Turns drawn from the batched stream follow the kernel weights."""
+    from ant import RandomStream
+    ant = Ant((100, 100), RandomStream(np.random.default_rng(5)))
+    ant.direction = (0, -1)  # North, heading 0: the new heading equals the turn's offset
+    draws = 40000
+    counts = np.zeros(8)
+    for _ in range(draws):
+        counts[ant.turn_heading()] += 1
+
+    expected = np.zeros(8)
+    for offset, weight in zip((0, 1, -1, 2, -2, 3, -3, 4), ant.WEIGHTS):
+        expected[offset % 8] += weight * draws
+    assert np.all(np.abs(counts - expected) < 5 * np.sqrt(expected) + 1)
@@ -0,0 +1,43 @@
+import copy
+import config
+from benchmark import bench_case, compare, latest_baseline, main, save_report
+
+def test_case_times_every_phase():
+    """A tiny case reports the speed and a time for each phase, and leaves the config alone."""
+    size = config.GRID_SIZE
+    result = bench_case(50, 32, False, ticks=3)
+    assert result["case"] == "ants=50 grid=32 render=off"
+    assert result["ticks_per_second"] > 0
+    assert set(result["phases"]) == {"evaporate", "spawn", "move"}
+    assert config.GRID_SIZE == size
+
+def test_compare_flags_slowdowns_beyond_threshold():
+    """Only cases that lost more than the threshold are regressions; unmatched cases are skipped."""
+    baseline = {"results": [
+        {"case": "a", "ticks_per_second": 100.0},
+        {"case": "b", "ticks_per_second": 100.0},
+        {"case": "gone", "ticks_per_second": 100.0},
+    ]}
+    current = {"results": [
+        {"case": "a", "ticks_per_second": 95.0},
+        {"case": "b", "ticks_per_second": 80.0},
+        {"case": "new", "ticks_per_second": 1.0},
+    ]}
+    rows, regressions = compare(baseline, current, threshold=0.1)
+    assert [row[0] for row in rows] == ["a", "b"]
+    assert [row[0] for row in regressions] == ["b"]
+
+def test_reports_are_stored_per_machine_and_commit(tmp_path, capsys):
+    """The newest report of a machine is the baseline, and compare exits non-zero on a regression."""
+    report = {"machine": "box", "commit": "aaa", "timestamp": "2024-01-01T00:00:00",
+              "results": [{"case": "a", "ticks_per_second": 100.0}]}
+    older = save_report(report, tmp_path)
+    slower = copy.deepcopy(report)
+    slower.update(commit="bbb", timestamp="2024-01-02T00:00:00")
+    slower["results"][0]["ticks_per_second"] = 50.0
+    newer = save_report(slower, tmp_path)
+
+    assert latest_baseline("box", tmp_path) == newer
+    assert latest_baseline("box", tmp_path, exclude="bbb") == older
+    assert main(["compare", older, newer]) == 1
+    assert "REGRESSION" in capsys.readouterr().out
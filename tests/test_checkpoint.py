@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+import config
+from checkpoint import fork, load_checkpoint, restore, run_forks, save_checkpoint
+from main import Simulation
+
+@pytest.fixture
+def warm(monkeypatch, tmp_path):
+    """A seeded run saved at tick 60, plus the same run continued to tick 120 without stopping."""
+    monkeypatch.setattr(config, "RANDOM_SEED", 21)
+    monkeypatch.setattr(config, "TIMESTEPS", 120)
+    sim = Simulation(headless=True)
+    while sim.tick < 60:
+        sim.step()
+    save_checkpoint(sim, tmp_path / "warm")
+
+    stats = sim.loop(verbose=False)
+    return tmp_path / "warm", sim, stats
+
+def test_restored_run_continues_bit_identically(warm):
+    """Stopping, saving and restoring must not change anything about the rest of the run."""
+    path, reference, reference_stats = warm
+    sim = restore(path)
+    assert sim.tick == 60
+
+    assert sim.loop(verbose=False) == reference_stats
+    assert np.array_equal(sim.grid, reference.grid)
+    assert np.array_equal(sim.colony.pos, reference.colony.pos)
+    assert np.array_equal(sim.colony.heading, reference.colony.heading)
+
+def test_checkpoint_arrays_are_memory_mapped(warm):
+    """The arrays load lazily from disk."""
+    arrays, state = load_checkpoint(warm[0])
+    assert isinstance(arrays["grid"], np.memmap)
+    assert state["tick"] == 60
+    assert len(arrays["pos"]) == len(arrays["mode"])
+
+def test_forks_share_the_prefix(warm):
+    """
+    Forking with the saved parameters reproduces the uninterrupted run,
+    while a changed parameter only changes the run after the checkpoint.
+    """
+    path, _, reference_stats = warm
+    fidelity = config.FIDELITY
+    assert fork(path, {"TIMESTEPS": 120}) == reference_stats
+
+    results = run_forks(path, [{"TIMESTEPS": 120}, {"TIMESTEPS": 120, "FIDELITY": 200}], workers=1)
+    assert results[0] == [reference_stats]
+    assert results[1] != [reference_stats]
+    assert config.FIDELITY == fidelity   # overrides do not leak out of a fork
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+import config
+from ant import Ant
+from colony import AntColony, make_rng
+
+@pytest.fixture
+def clean_grid():
+    return np.zeros((config.GRID_SIZE, config.GRID_SIZE))
+
+def make_colony(positions, headings):
+    colony = AntColony(make_rng(0))
+    colony.pos = np.array(positions, dtype=np.int32)
+    colony.heading = np.array(headings, dtype=np.int8)
+    colony.mode = np.zeros(len(headings), dtype=np.int8)
+    return colony
+
+def test_fork_algorithm_matches_scalar_ant(clean_grid):
+    """
+    The vectorized fork algorithm must make the same decision as Ant.check_for_trail
+    for every heading, covering Rules (a), (b) and (c) in one batch.
+    """
+    clean_grid[100, 101] = 5.0     # Rule (a) for ants facing (0, 1)
+    clean_grid[99, 101] = 1000.0
+    clean_grid[101, 99] = 10.0     # Rule (c) for ants facing (0, 1) from (100, 100) is checked below
+    clean_grid[99, 99] = 20.0
+    clean_grid[101, 101] = 20.0    # Rule (b) style tie for some headings
+
+    colony = make_colony([(100, 100)] * 8, list(range(8)))
+    trail = colony.check_for_trail(clean_grid)
+
+    for heading in range(8):
+        ant = Ant((100, 100))
+        ant.direction = Ant.VALID_DIRECTIONS[heading]
+        expected = ant.check_for_trail(clean_grid)
+        got = (0, 0) if trail[heading] < 0 else Ant.VALID_DIRECTIONS[trail[heading]]
+        assert got == expected, f"Heading {heading}: colony chose {got}, Ant chose {expected}"
+
+def test_absorbing_boundaries_remove_ants(clean_grid):
+    """
+    Ants stepping off the lattice are removed and leave no pheromone behind.
+    Half the ants sit in the corner facing outward, the other half in the middle of the grid.
+    """
+    colony = make_colony([(0, 0)] * 50 + [(100, 100)] * 50, [7] * 50 + [1] * 50)
+    removed = colony.move(clean_grid)
+
+    assert len(colony) == 100 - removed
+    assert removed > 0, "Corner ants that go straight must leave the grid"
+    assert np.all((colony.pos >= 0) & (colony.pos < config.GRID_SIZE))
+    # Every surviving ant deposits DEPOSITION_RATE + 1 on its previous cell.
+    assert clean_grid.sum() == len(colony) * (config.DEPOSITION_RATE + 1)
+
+def test_earlier_ants_deposit_before_later_ants_sense(clean_grid):
+    """
+    Ants are processed in release order, so an ant sees the pheromone dropped
+    by an ant ahead of it in the same tick (as in the original one-ant-at-a-time loop).
+    Ant 0 stands directly in front of ant 1 on an empty grid: ant 1 must sense
+    ant 0's deposit straight ahead (Rule a), while ant 0 sees nothing.
+    """
+    colony = make_colony([(100, 101), (100, 100)], [0, 4])
+    trail = colony.check_for_trail(clean_grid)
+    assert trail[0] == -1
+    assert trail[1] == 4
+
+    # Reversing the release order reverses who sees whom.
+    colony = make_colony([(100, 100), (100, 101)], [4, 0])
+    trail = colony.check_for_trail(clean_grid)
+    assert trail[0] == -1
+    assert trail[1] == 0
+
+def test_count_modes_layout():
+    """count_modes() uses the same [lost, followers] layout as calculate_stats()."""
+    colony = make_colony([(10, 10)] * 5, [0] * 5)
+    colony.mode = np.array([1, 1, 1, 0, 0], dtype=np.int8)
+    assert colony.count_modes() == [2, 3]
+
+def test_pool_reuses_freed_slots_in_release_order(clean_grid):
+    """
+    Absorbed ants are squeezed out in place: survivors keep their release order,
+    live counts stay in sync, and later spawns fill the freed slots without growing the pool.
+    """
+    colony = make_colony([(0, 0), (100, 100), (0, 0), (120, 120)], [7, 1, 7, 3])
+    colony.rng = make_rng(1)
+    colony.kernel_cdf = np.ones(8)   # Nobody turns, so both corner ants walk off the lattice
+    capacity = colony.capacity
+    pool = colony._pos
+
+    assert colony.move(clean_grid) == 2
+    assert len(colony) == 2
+    assert colony.pos.tolist() == [[101, 99], [121, 121]]
+    assert sum(colony.count_modes()) == 2
+
+    colony.spawn(capacity - 2, (50, 50))
+    assert colony.capacity == capacity and colony._pos is pool
+    assert len(colony) == capacity
+    assert colony.pos[:2].tolist() == [[101, 99], [121, 121]]
@@ -0,0 +1,47 @@
+from convergence import ConvergenceMonitor
+from main import Simulation
+from settings import SimulationConfig
+from sweep import load_results, run_sweep
+
+SETTINGS = SimulationConfig.current(TIMESTEPS=600, TIMESTEP_STOP=100, RANDOM_SEED=3)
+
+def test_steady_run_stops_with_the_stats_of_that_tick():
+    """Checks start one window after spawning stops; two steady windows later the run ends there."""
+    monitor = ConvergenceMonitor(window=50, tolerance=0.5, trail_tolerance=1.0)
+    sim = Simulation(headless=True, settings=SETTINGS, convergence=monitor)
+    stats = sim.loop(verbose=False)
+    assert monitor.converged_at == sim.tick == 250
+    assert set(monitor.changes) == {"followers", "lost", "pheromone", "trails"}
+
+    reference = Simulation(headless=True, settings=SETTINGS)
+    while reference.tick < 250:
+        reference.step()
+    assert stats == reference.calculate_stats()
+
+def test_unsteady_run_goes_to_the_end():
+    monitor = ConvergenceMonitor(window=50, tolerance=0.0, trail_tolerance=0.0)
+    stats = Simulation(headless=True, settings=SETTINGS, convergence=monitor).loop(verbose=False)
+    assert monitor.converged_at is None
+    assert stats == Simulation(headless=True, settings=SETTINGS).loop(verbose=False)
+
+def test_sweep_records_where_runs_stopped(tmp_path):
+    path = str(tmp_path / "results.csv")
+    point = {"TIMESTEPS": 600, "TIMESTEP_STOP": 100}
+    run_sweep([point], 1, path, base_seed=3, workers=1,
+              convergence={"window": 50, "tolerance": 0.5, "trail_tolerance": 1.0})
+    run_sweep([{**point, "FIDELITY": 251}], 1, path, base_seed=3, workers=1)
+    assert [row["ticks"] for row in load_results(path)] == [250, 600]
+
+def test_trail_cells_match_trails_py():
+    """A cell holding exactly one fresh deposit is no trail cell, here as in trails.analyze()."""
+    import types
+    import numpy as np
+    from stats import COLUMNS
+    stats = types.SimpleNamespace(array=np.ones((10, len(COLUMNS))))
+    monitor = ConvergenceMonitor(window=10, threshold=9, start=0)
+    grid = np.zeros((8, 8))
+    grid[2, 2:6] = 20
+    monitor.update(10, stats, grid)
+    grid[5, 2:6] = 9
+    monitor.update(20, stats, grid)
+    assert monitor.changes["trails"] == 0
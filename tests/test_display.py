@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+import config
+from display import Display
+
+pytest.importorskip("pygame")
+
+@pytest.fixture
+def display(monkeypatch):
+    """A render process on SDL's dummy video driver (inherited by the spawned child)."""
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+    display = Display(render_every=5, max_fps=None)
+    yield display
+    display.close()
+
+def test_only_every_nth_tick_is_due(display):
+    """Ticks between frames are skipped before any snapshot is built."""
+    assert [tick for tick in range(12) if display.due(tick)] == [0, 5, 10]
+
+def test_publish_never_blocks_on_a_busy_renderer(display):
+    """Snapshots the renderer cannot keep up with are dropped instead of queued."""
+    grid = np.zeros((config.GRID_SIZE, config.GRID_SIZE))
+    positions = np.zeros((3, 2), dtype=np.int32)
+    for tick in range(0, 500, 5):
+        assert display.publish(tick, positions, grid)
+    assert display.frames.qsize() <= 2
+    assert display.publish(501, positions, grid, force=True)
+
+def test_closed_window_stops_publishing(display):
+    """Once the render process is gone, publish() reports it so Simulation.loop stops."""
+    display.process.terminate()
+    display.process.join(timeout=10)
+    grid = np.zeros((config.GRID_SIZE, config.GRID_SIZE))
+    assert not display.publish(5, np.zeros((0, 2), dtype=np.int32), grid)
+
+def test_uncapped_renderer_waits_for_new_snapshots(monkeypatch):
+    """With max_fps=0 and nothing new to draw, the renderer waits instead of spinning on a stale frame."""
+    import queue
+    import sys
+    import time
+    import types
+    from display import IDLE_WAIT, _render_worker
+
+    class CountingGUI:
+        draws = 0
+        def loop(self, positions, grid, fps):
+            CountingGUI.draws += 1
+            return CountingGUI.draws < 5
+    monkeypatch.setitem(sys.modules, "gui", types.SimpleNamespace(GUI=CountingGUI))
+    closed = types.SimpleNamespace(set=lambda: None)
+    start = time.perf_counter()
+    _render_worker(queue.Queue(), closed, {"GRID_SIZE": config.GRID_SIZE}, 0)
+    assert time.perf_counter() - start >= 4 * IDLE_WAIT
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from colony import AntColony
+from ensemble import Ensemble
+from main import Simulation
+from replicates import run_cases
+from settings import SimulationConfig
+
+BASE = SimulationConfig.current(TIMESTEPS=60)
+
+@pytest.mark.parametrize("mode", ["eager", "lazy"])
+def test_every_replica_matches_its_serial_run(mode):
+    """Replicas with different seeds and fidelities reproduce their own Simulation runs exactly."""
+    members = [BASE.replace(EVAPORATION_MODE=mode, RANDOM_SEED=seed, FIDELITY=fidelity)
+               for seed in (1, 2) for fidelity in (255, 247)]
+    ensemble = Ensemble(members)
+    stats = ensemble.loop()
+
+    for member, result, grid, absorbed in zip(members, stats, ensemble.grid, ensemble.colony.absorbed):
+        sim = Simulation(headless=True, settings=member)
+        assert result == sim.loop(verbose=False)
+        assert np.array_equal(grid, sim.grid)
+        assert absorbed == sim.colony.absorbed
+
+def test_small_blocks_keep_each_replicas_borders(monkeypatch):
+    """With many blocks per replica, the ensemble still moves each replica in its serial blocks."""
+    monkeypatch.setattr(AntColony, "CHUNK_SIZE", 16)
+    members = [BASE.replace(RANDOM_SEED=seed, INITIAL_BURST_SIZE=40 + seed) for seed in range(3)]
+    assert Ensemble(members).loop() == [Simulation(headless=True, settings=m).loop(verbose=False) for m in members]
+
+def test_batched_study_matches_separate_runs():
+    """run_cases(ensemble=True) returns the same results, in the same layout, as the run-by-run path."""
+    cases = {"high": {"TIMESTEPS": 30, "FIDELITY": 255}, "low": {"TIMESTEPS": 30, "FIDELITY": 247}}
+    assert run_cases(cases, 2, base_seed=3, workers=1, ensemble=True) == run_cases(cases, 2, base_seed=3, workers=1)
+
+    with pytest.raises(ValueError):
+        Ensemble([BASE, BASE.replace(GRID_SIZE=64)])
@@ -0,0 +1,53 @@
+import os
+import struct
+import zlib
+import numpy as np
+from frames import FrameExporter, encode_png, render_frame
+from main import Simulation
+from replicates import run_cases
+from settings import SimulationConfig
+
+def decode_png(data):
+    """Minimal reader for the 8-bit RGB, unfiltered PNGs encode_png writes. Returns the image indexed [x, y]."""
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    width, height = struct.unpack(">II", data[16:24])
+    length = struct.unpack(">I", data[33:37])[0]
+    assert data[37:41] == b"IDAT"
+    raw = np.frombuffer(zlib.decompress(data[41:41 + length]), dtype=np.uint8).reshape(height, width * 3 + 1)
+    return raw[:, 1:].reshape(height, width, 3).transpose(1, 0, 2)
+
+def test_png_round_trip():
+    image = np.random.default_rng(0).integers(0, 256, size=(7, 5, 3), dtype=np.uint8)
+    assert np.array_equal(decode_png(encode_png(image)), image)
+
+def test_frames_are_exported_at_due_ticks(tmp_path):
+    """Frames every K ticks plus chosen ticks, drawn from the state at that tick; the run itself is unchanged."""
+    settings = SimulationConfig.current(TIMESTEPS=60, RANDOM_SEED=2)
+    frames = FrameExporter(str(tmp_path), every=20, ticks=(30,), queue_size=1)
+    sim = Simulation(headless=True, settings=settings, frames=frames)
+    stats = sim.loop(verbose=False)
+
+    assert stats == Simulation(headless=True, settings=settings).loop(verbose=False)
+    assert [os.path.basename(path) for path in frames.written] == [
+        "frame_000020.png", "frame_000030.png", "frame_000040.png", "frame_000060.png"]
+    with open(frames.written[-1], "rb") as f:
+        image = decode_png(f.read())
+    assert image.shape == (768, 768, 3)
+    assert np.array_equal(image, render_frame(sim.colony.get_positions(), sim.grid))
+
+def test_large_lattice_is_drawn_as_density():
+    """Beyond the panel size cells share pixels, and an ant's pixel shows up red above its trail."""
+    grid = np.zeros((1024, 1024))
+    grid[:, 10] = 5
+    image = render_frame(np.array([[100, 10], [101, 10]]), grid)
+    assert image.shape == (512, 512, 3)
+    assert image[50, 5, 0] > 0 and image[50, 5, 2] == 0
+    assert image[200, 5, 2] > 0
+
+def test_replicate_figures_match_between_paths(tmp_path):
+    cases = {"case1": {"TIMESTEPS": 30, "FIDELITY": 255}}
+    run_cases(cases, 2, base_seed=4, workers=1, figures=str(tmp_path / "serial"))
+    run_cases(cases, 2, base_seed=4, workers=1, ensemble=True, figures=str(tmp_path / "ensemble"))
+    for i in range(2):
+        with open(tmp_path / "serial" / "case1" / f"{i}.png", "rb") as a, open(tmp_path / "ensemble" / "case1" / f"{i}.png", "rb") as b:
+            assert a.read() == b.read()
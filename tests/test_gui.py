@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+import config
+from raster import pheromone_rgb
+
+pygame = pytest.importorskip("pygame")
+
+def test_pheromone_colors_match_pygame_hsla():
+    """
+    The vectorized color map must reproduce the old per-cell pygame.Color HSL mapping
+    (within one level of float rounding).
+    """
+    values = np.array([[0.0, 1.0, 13.0, 100.0, 500.0, 666.0, 800.0, 1000.0, 1333.0, 5000.0]])
+    rgb = pheromone_rgb(values)
+
+    blue = pygame.Color(0, 0, 255)
+    for i, value in enumerate(values[0]):
+        blue.hsla = (240, 100, min(100, value * config.GUI_TRAIL_SCALE), 100)
+        expected = np.array([blue.r, blue.g, blue.b])
+        assert np.all(np.abs(rgb[0, i].astype(int) - expected) <= 1), f"value {value}: {rgb[0, i]} vs {expected}"
+
+def test_draw_grid_offscreen(monkeypatch):
+    """draw_grid() blits the field without touching empty cells."""
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+    from gui import GUI
+
+    gui = GUI()
+    grid = np.zeros((config.GRID_SIZE, config.GRID_SIZE))
+    grid[10, 20] = 1000.0
+    gui.screen.fill("black")
+    gui.draw_grid(grid)
+
+    assert gui.screen.get_at((10 * 3, 20 * 3))[:3] != (0, 0, 0)
+    assert gui.screen.get_at((100 * 3, 100 * 3))[:3] == (0, 0, 0)
+    gui.quit_gui()
+
+def test_panels_draw_side_by_side(monkeypatch):
+    """Each replay panel is its own part of the window."""
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+    from gui import GUI
+
+    gui = GUI(panels=2)
+    grid = np.zeros((config.GRID_SIZE, config.GRID_SIZE))
+    grid[10, 20] = 1000.0
+    gui.draw_frame([], np.zeros_like(grid), panel=0)
+    gui.draw_frame([], grid, panel=1)
+
+    offset = config.GRID_SIZE * 3
+    assert gui.window.get_size() == (2 * offset, offset)
+    assert gui.window.get_at((10 * 3, 20 * 3))[:3] == (0, 0, 0)
+    assert gui.window.get_at((offset + 10 * 3, 20 * 3))[:3] != (0, 0, 0)
+    gui.quit_gui()
+
+def test_zoomed_out_ants_are_one_density_layer(monkeypatch):
+    """A large grid is fitted into the window, with the ants aggregated instead of drawn one by one."""
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+    from gui import GUI
+
+    gui = GUI(grid_size=2048)
+    assert gui.window.get_size() == (gui.view.size, gui.view.size)
+    grid = np.zeros((2048, 2048))
+    grid[100, 1500] = 1000.0   # a single-cell trail must survive the downscaling
+    ants = np.full((50000, 2), 1024)
+    monkeypatch.setattr(gui, "draw_ant", lambda position: pytest.fail("ants drawn one by one"))
+    gui.draw_frame(ants, grid)
+
+    def near(x, y):
+        """Colors around the pixel of cell (x, y): below one pixel per cell, texels land within a pixel of it."""
+        px, py = (int(round(v)) for v in gui.view.to_pixel(x, y))
+        return [gui.screen.get_at((px + i, py + j))[:3] for i in (-1, 0, 1) for j in (-1, 0, 1)]
+
+    assert any(color[2] > 0 for color in near(100, 1500))
+    assert any(color[0] > 0 for color in near(1024, 1024))
+    gui.quit_gui()
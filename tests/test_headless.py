@@ -0,0 +1,59 @@
+import os
+import pickle
+import subprocess
+import sys
+import pytest
+import config
+import main
+from main import Simulation
+from settings import SimulationConfig
+
+@pytest.fixture
+def short_run(monkeypatch):
+    """Keeps config overrides made by a test (or by main()) from leaking into other tests."""
+    monkeypatch.setattr(config, "TIMESTEPS", 20)
+    monkeypatch.setattr(config, "FIDELITY", config.FIDELITY)
+    monkeypatch.setattr(config, "RANDOM_SEED", config.RANDOM_SEED)
+
+def test_headless_run_completes_without_gui(short_run):
+    """
+    A headless simulation must run to completion and return the stats
+    without creating a window.
+    """
+    sim = Simulation(headless=True)
+    stats = sim.loop()
+
+    assert sim.display is None
+    assert sim.tick == config.TIMESTEPS
+    assert sum(stats[1]) == len(sim.colony)
+
+def test_headless_does_not_import_pygame():
+    """
+    The headless path must work on machines where pygame (or a display) is unavailable.
+    Checked in a fresh interpreter, since other tests import pygame.
+    """
+    code = (
+        "import sys, config, main\n"
+        "config.TIMESTEPS = 5\n"
+        "main.Simulation(headless=True).loop(verbose=False)\n"
+        "assert 'pygame' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), check=True)
+
+def test_cli_writes_stats(short_run, tmp_path):
+    """The command-line entry point applies overrides (without touching config.py) and pickles calculate_stats()."""
+    out = tmp_path / "result.pkl"
+    stats = main.main(["--headless", "--ticks", "10", "--fidelity", "251", "--seed", "7", "--out", str(out)])
+
+    settings = SimulationConfig.current(TIMESTEPS=10, FIDELITY=251, RANDOM_SEED=7)
+    assert stats == Simulation(headless=True, settings=settings).loop(verbose=False)
+    assert config.FIDELITY != 251
+    with open(out, "rb") as f:
+        assert pickle.load(f) == stats
+
+def test_seeded_runs_are_reproducible(short_run):
+    """Two runs with the same seed must produce identical statistics."""
+    config.RANDOM_SEED = 1234
+    first = Simulation(headless=True).loop()
+    second = Simulation(headless=True).loop()
+    assert first == second
@@ -0,0 +1,62 @@
+import pstats
+import numpy as np
+import pytest
+import config
+from instrument import COUNTERS, PHASES, Instrumentation
+from main import Simulation
+
+@pytest.fixture
+def short(monkeypatch):
+    monkeypatch.setattr(config, "TIMESTEPS", 30)
+    monkeypatch.setattr(config, "RANDOM_SEED", 4)
+
+def test_instrumented_run_is_unchanged(short, tmp_path):
+    """Timing a run must not change it; every tick lands in the CSV with its counts."""
+    reference = Simulation(headless=True).loop(verbose=False)
+
+    path = str(tmp_path / "ticks.csv")
+    probe = Instrumentation(path, export_every=7, occupancy_every=5)
+    assert Simulation(headless=True, instrument=probe).loop(verbose=False) == reference
+
+    table = np.loadtxt(path, delimiter=",", skiprows=1)
+    assert len(table) == 30
+    # A rerun with the same file replaces the table instead of continuing it.
+    Simulation(headless=True, instrument=Instrumentation(path, export_every=7, occupancy_every=5)).loop(verbose=False)
+    assert np.array_equal(np.loadtxt(path, delimiter=",", skiprows=1)[:, 0], table[:, 0])
+    assert list(table[:, 0]) == list(range(30))
+    counts = table[:, 1 + len(PHASES):]
+    spawned = counts[:, COUNTERS.index("spawned")]
+    assert spawned.sum() == config.INITIAL_BURST_SIZE + 30
+    assert counts[-1, COUNTERS.index("ants")] == sum(reference[1])
+    # Occupancy is only sampled every 5th tick.
+    occupied = counts[:, COUNTERS.index("occupied")]
+    assert (occupied[::5] > 0).all() and (occupied[1::5] == -1).all()
+
+def test_ring_buffer_keeps_the_latest_ticks():
+    probe = Instrumentation(export_every=4, capacity=8, occupancy_every=0)
+    for tick in range(20):
+        probe.begin(tick)
+        probe.lap("move")
+        probe.count(moved=tick)
+    probe.close()
+
+    ticks, times, counts = probe.recent()
+    assert list(ticks) == list(range(12, 20))
+    assert list(counts[:, COUNTERS.index("moved")]) == list(range(12, 20))
+    # Totals still cover every tick, not just the buffered ones.
+    assert probe.count_totals[COUNTERS.index("moved")] == sum(range(20))
+
+def test_metrics_file_and_profile_window(short, tmp_path):
+    """The metrics file holds running totals, and the profiler only covers the requested ticks."""
+    metrics = str(tmp_path / "run.prom")
+    profile = str(tmp_path / "run.prof")
+    probe = Instrumentation(metrics, export_every=10, profile=(10, 20), profile_out=profile)
+    Simulation(headless=True, instrument=probe).loop(verbose=False)
+
+    text = open(metrics).read()
+    assert "ants_ticks_total 30" in text
+    assert f"ants_spawned_total {config.INITIAL_BURST_SIZE + 30}" in text
+
+    stats = pstats.Stats(profile).stats
+    steps = [calls for (filename, _, name), (calls, *_) in stats.items() if name == "move" and filename.endswith("colony.py")]
+    assert steps == [10]
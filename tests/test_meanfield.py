@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from meanfield import MeanField, screen
+from settings import SimulationConfig
+
+BASE = SimulationConfig.current(GRID_SIZE=32, TIMESTEPS=60, TIMESTEP_STOP=30, INITIAL_BURST_SIZE=20)
+
+def test_ants_are_conserved():
+    """Every released ant is either on the lattice or absorbed, and follower plus explorer densities add up."""
+    field = MeanField([BASE], np.float64)
+    field.loop()
+    assert field.counts().sum() + field.absorbed[0] == pytest.approx(20 + 30)
+    assert field.absorbed[0] > 0
+    assert np.allclose(field.explorers + field.followers, field.ants)
+    assert np.all(field.marked >= 0) and np.all(field.marked <= 1)
+
+def test_quadrant_matches_the_whole_lattice():
+    """Mirror symmetry is exact about the nest of an odd lattice."""
+    members = [BASE.replace(GRID_SIZE=31), BASE.replace(GRID_SIZE=31, FIDELITY=240, TURNING_KERNEL=[0.3, 0.1, 0.05, 0.0])]
+    quadrant, whole = MeanField(members, np.float64), MeanField(members, np.float64, symmetric=False)
+    for result, expected in zip(quadrant.loop(), whole.loop()):
+        assert result[1] == pytest.approx(expected[1])
+    assert quadrant.absorbed == pytest.approx(whole.absorbed)
+    assert np.allclose(quadrant.grid, whole.grid)
+
+def test_batched_points_match_separate_runs():
+    members = [BASE.replace(FIDELITY=255), BASE.replace(FIDELITY=200, DEPOSITION_RATE=3, TURNING_KERNEL=[0.3, 0.1, 0.0, 0.0])]
+    together = MeanField(members, np.float64).loop()
+    for member, result in zip(members, together):
+        alone = MeanField([member], np.float64).loop()[0]
+        assert result[0] == pytest.approx(alone[0])
+        assert result[1] == pytest.approx(alone[1])
+
+def test_followers_need_fidelity_and_pheromone():
+    results = screen([{"FIDELITY": 0}, {"FIDELITY": 247}, {"FIDELITY": 255}, {"FIDELITY": 255, "EVAPORATION_RATE": 4}], BASE)
+    fractions = [result["follower_fraction"] for result in results]
+    assert fractions[0] == 0
+    assert 0 < fractions[1] < fractions[2]
+    # Trails that dry up faster hold fewer followers.
+    assert fractions[3] < fractions[2]
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+import config
+from main import Simulation
+from parallel import ParallelSimulation, StripField
+
+@pytest.fixture
+def small(monkeypatch):
+    """A short run on a small lattice with the eager field, so serial and parallel grids compare directly."""
+    monkeypatch.setattr(config, "GRID_SIZE", 32)
+    monkeypatch.setattr(config, "TIMESTEPS", 40)
+    monkeypatch.setattr(config, "INITIAL_BURST_SIZE", 20)
+    monkeypatch.setattr(config, "EVAPORATION_MODE", "eager")
+    monkeypatch.setattr(config, "RANDOM_SEED", 3)
+
+def test_strip_field_reads_halos():
+    """Window row 0 and the last window row come from the halo copies, the rest from the shared rows."""
+    grid = np.arange(8 * 4, dtype=np.float64).reshape(8, 4)
+    field = StripField(grid, 2, 5, rate=1)
+    field.halo_top = np.full(4, -1.0)
+    field.halo_bottom = np.full(4, -2.0)
+
+    # Window rows: 0 = halo above (global row 1), 1-3 = own rows 2-4, 4 = halo below (global row 5).
+    assert list(field.read(np.array([1, 5, 13, 17]))) == [-1.0, grid[2, 1], grid[4, 1], -2.0]
+
+    field.deposit(np.array([4, 4]), 9)
+    assert grid[2, 0] == 8 + 18   # deposits land on the shared rows themselves
+
+def test_one_worker_matches_serial(small):
+    """A single strip has no borders, so the run is the serial one."""
+    sim = Simulation(headless=True)
+    stats = sim.loop(verbose=False)
+    with ParallelSimulation(workers=1, seed=3) as parallel:
+        assert parallel.loop(verbose=False) == stats
+        assert np.array_equal(parallel.grid, sim.grid)
+
+def test_ants_are_handed_across_strips(small):
+    """The nest lies in the lower strip, so ants in the upper one must have been handed over."""
+    with ParallelSimulation(workers=2, seed=3) as parallel:
+        parallel.loop(verbose=False)
+        pos, mode = parallel.get_positions()
+        assert len(pos) == parallel.count
+        assert np.count_nonzero(mode) == parallel.followers
+        assert (pos[:, 0] < 16).any()
+        assert ((pos >= 0) & (pos < 32)).all()
+        assert parallel.grid.sum() > 0
+
+def test_dead_worker_raises_instead_of_hanging(small):
+    """If a worker dies, its neighbour waits for halos forever; the parent must notice and raise."""
+    with ParallelSimulation(workers=2, seed=3) as parallel:
+        parallel.step()
+        parallel.workers[1].kill()
+        parallel.workers[1].join()
+        with pytest.raises(RuntimeError):
+            parallel.step()
@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+import config
+from main import Simulation
+from pheromone import EagerField, LazyField, as_field, make_field
+
+@pytest.mark.parametrize("size", [32, 31])
+def test_lazy_field_matches_eager_field(size):
+    """
+    Random deposits and reads interleaved with evaporation: the lazy field must report
+    exactly the concentrations of the eager one, on reads and on the full grid
+    (31 x 31 cells cannot be split into tiles, so every cell has its own stamp there).
+    """
+    rng = np.random.default_rng(3)
+    eager, lazy = EagerField(size, 1), LazyField(size, 1)
+
+    for tick in range(200):
+        eager.evaporate()
+        lazy.evaporate()
+        cells = rng.integers(0, size * size, size=rng.integers(0, 40))
+        eager.deposit(cells, 9)
+        lazy.deposit(cells, 9)
+
+        probe = rng.integers(0, size * size, size=(3, 50))
+        assert np.array_equal(lazy.read(probe), eager.read(probe))
+        if(tick % 50 == 0):
+            assert np.array_equal(lazy.to_array(), eager.to_array())
+    assert np.array_equal(lazy.to_array(), eager.to_array())
+
+def test_lazy_stamps_take_a_fraction_of_the_grid():
+    """Stamps are shared by tiles, so a uint16 lazy grid needs about a quarter of a float64 eager one."""
+    lazy, eager = LazyField(256, 1, dtype=np.uint16), EagerField(256, 1)
+    assert lazy.values.nbytes + lazy.stamp.nbytes <= 0.26 * eager.values.nbytes
+
+def test_lazy_evaporation_does_not_touch_the_grid():
+    """evaporate() only advances the clock; the decay shows up when a cell is read."""
+    field = LazyField(16, 1)
+    field.deposit(np.array([5]), 10)
+    before = field.values.copy()
+    for _ in range(4):
+        field.evaporate()
+
+    assert np.array_equal(field.values, before)
+    assert field.read(np.array([5]))[0] == 6
+    field.to_array()
+    assert field.values.reshape(-1)[5] == 6
+
+def test_simulation_is_identical_under_both_modes(monkeypatch):
+    """Eager and lazy evaporation must drive the exact same simulation."""
+    monkeypatch.setattr(config, "TIMESTEPS", 150)
+    monkeypatch.setattr(config, "RANDOM_SEED", 11)
+    monkeypatch.setattr(config, "EVAPORATION_MODE", "eager")
+    reference = Simulation(headless=True)
+    reference_stats = reference.loop(verbose=False)
+
+    monkeypatch.setattr(config, "EVAPORATION_MODE", "lazy")
+    sim = Simulation(headless=True)
+    assert sim.loop(verbose=False) == reference_stats
+    assert np.array_equal(sim.grid, reference.grid)
+
+def test_field_helpers():
+    """make_field() rejects unknown modes, and as_field() wraps plain arrays in place."""
+    with pytest.raises(KeyError):
+        make_field("sometimes")
+
+    grid = np.zeros((config.GRID_SIZE, config.GRID_SIZE))
+    as_field(grid).deposit(np.array([0, 0]), 3)
+    assert grid[0, 0] == 6
+
+@pytest.mark.parametrize("mode", ["eager", "lazy"])
+def test_integer_grid_reproduces_float_grid(monkeypatch, mode):
+    """With the integer rates of config.py, a uint16 grid drives exactly the same simulation as float64."""
+    monkeypatch.setattr(config, "TIMESTEPS", 150)
+    monkeypatch.setattr(config, "RANDOM_SEED", 11)
+    monkeypatch.setattr(config, "EVAPORATION_MODE", mode)
+    monkeypatch.setattr(config, "GRID_DTYPE", "float64")
+    reference = Simulation(headless=True)
+    reference_stats = reference.loop(verbose=False)
+
+    monkeypatch.setattr(config, "GRID_DTYPE", "uint16")
+    sim = Simulation(headless=True)
+    assert sim.grid.dtype == np.uint16
+    assert sim.loop(verbose=False) == reference_stats
+    assert np.array_equal(sim.grid, reference.grid)
+
+@pytest.mark.parametrize("field_class", [EagerField, LazyField])
+def test_integer_grid_saturates(field_class):
+    """Integer grids clamp at both ends instead of wrapping around."""
+    field = field_class(4, 3, dtype=np.uint16)
+    field.deposit(np.array([1] * 10), 65000)
+    field.deposit(np.array([2]), 2)
+    assert field.read(np.array([1]))[0] == 65535
+
+    for _ in range(5):
+        field.evaporate()
+    assert field.read(np.array([2]))[0] == 0
+    assert field.to_array().reshape(-1)[1] == 65535 - 15
+    assert field.to_array().reshape(-1)[2] == 0
+
+def test_integer_grid_needs_integer_rates():
+    """Fractional rates cannot be stored exactly in an integer grid."""
+    with pytest.raises(ValueError):
+        make_field("eager", 8, 0.5, "uint16")
+    assert make_field("lazy", 8, 0.5, "float32").values.dtype == np.float32
+
+@pytest.mark.parametrize("rate, amount, dtype", [(1, 9, np.float64), (1.5, 2.25, np.float64), (2, 30000, np.uint16)])
+def test_lazy_total_is_kept_incrementally(rate, amount, dtype):
+    """The O(1) running total matches a full sum, also with fractional rates and saturating integer grids."""
+    rng = np.random.default_rng(1)
+    eager, lazy = EagerField(32, rate, dtype=dtype), LazyField(32, rate, dtype=dtype)
+    for tick in range(300):
+        eager.evaporate()
+        lazy.evaporate()
+        cells = rng.integers(0, 32 * 32, size=rng.integers(0, 40)) if tick < 200 else np.array([], dtype=int)
+        eager.deposit(cells, amount)
+        lazy.deposit(cells, amount)
+        if(tick == 100):
+            lazy.load(eager.to_array())
+        assert lazy.total() == eager.total()
@@ -40,7 +40,7 @@ def test_evaporation_mechanics():
     Verify the numpy subtraction logic actually reduces the grid values
     and clamps at 0.
     """
-    sim = Simulation()
+    sim = Simulation(headless=True)
     
     # Setup a test patch
     sim.grid[10, 10] = 5.0  # Should become 4.0
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+import config
+from main import Simulation
+from recorder import Recorder, open_recording
+
+@pytest.fixture
+def recorded(monkeypatch, tmp_path):
+    """A 30-tick run recorded with a grid snapshot every 10 ticks."""
+    monkeypatch.setattr(config, "TIMESTEPS", 30)
+    monkeypatch.setattr(config, "RANDOM_SEED", 4)
+    sim = Simulation(headless=True, recorder=Recorder(tmp_path / "run", grid_every=10))
+    sim.loop(verbose=False)
+    return sim, open_recording(tmp_path / "run")
+
+def test_recording_matches_the_run(recorded):
+    """Every tick is indexed, and the last recorded tick holds the final ants and grid."""
+    sim, rec = recorded
+    assert rec["meta"]["complete"]
+    assert rec["index"][:, 0].tolist() == list(range(1, 31))
+    assert rec["grid_index"].tolist() == [10, 20, 30]
+
+    tick, offset, count = rec["index"][-1]
+    assert count == len(sim.colony)
+    assert np.array_equal(rec["pos"][offset:offset + count], sim.colony.pos)
+    assert np.array_equal(rec["mode"][offset:offset + count], sim.colony.mode)
+    assert np.array_equal(rec["grid"][-1], sim.grid)
+
+def test_recording_is_memory_mapped(recorded):
+    """Analysis reads straight from disk."""
+    _, rec = recorded
+    assert isinstance(rec["pos"], np.memmap)
+    assert isinstance(rec["grid"], np.memmap)
+    assert rec["index"][-1, 1] + rec["index"][-1, 2] == len(rec["pos"])
+
+def test_cut_off_recording_stays_readable(recorded, tmp_path):
+    """A partial last record (e.g. a killed run) is ignored instead of breaking the reader."""
+    with open(tmp_path / "run" / "index.bin", "ab") as f:
+        f.write(b"\x01\x02\x03")
+    assert len(open_recording(tmp_path / "run")["index"]) == 30
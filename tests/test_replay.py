@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+import config
+from main import Simulation
+from recorder import Recorder
+from replay import Replay
+
+@pytest.fixture
+def replay(monkeypatch, tmp_path):
+    monkeypatch.setattr(config, "TIMESTEPS", 25)
+    monkeypatch.setattr(config, "RANDOM_SEED", 8)
+    sim = Simulation(headless=True, recorder=Recorder(tmp_path / "run", grid_every=10))
+    sim.loop(verbose=False)
+    return sim, Replay(tmp_path / "run")
+
+def test_seek_to_any_tick(replay):
+    """Frames are found through the index, in any order, and clamp to the recorded range."""
+    sim, rec = replay
+    assert (rec.first_tick, rec.last_tick, len(rec)) == (1, 25, 25)
+
+    tick, positions, modes, _ = rec.frame(25)
+    assert tick == 25
+    assert np.array_equal(positions, sim.colony.pos)
+    assert np.array_equal(modes, sim.colony.mode)
+
+    assert rec.frame(7)[0] == 7
+    assert rec.frame(3)[0] == 3
+    assert rec.frame(-50)[0] == 1
+    assert rec.frame(10 ** 6)[0] == 25
+
+def test_grid_is_the_latest_snapshot(replay):
+    """Between snapshots the most recent earlier grid is shown; before the first one, an empty grid."""
+    sim, rec = replay
+    assert not rec.frame(5)[3].any()
+    assert np.array_equal(rec.frame(19)[3], rec.recording["grid"][0])
+    assert np.array_equal(rec.frame(25)[3], rec.recording["grid"][1])
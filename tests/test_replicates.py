@@ -0,0 +1,45 @@
+import pytest
+import config
+from main import Simulation
+from replicates import config_override, derive_seed, run_cases, run_replicates, summarize
+
+SHORT = {"TIMESTEPS": 30}
+
+def test_derived_seeds_are_stable_and_distinct():
+    """Replicate seeds depend only on (base seed, index)."""
+    seeds = [derive_seed("Dhvan Shah", i) for i in range(10)]
+    assert seeds == [derive_seed("Dhvan Shah", i) for i in range(10)]
+    assert len(set(seeds)) == 10
+    assert derive_seed(1, 0) != derive_seed(2, 0)
+
+def test_config_override_restores_values():
+    """Overrides must not leak into later runs in the same (reused) worker process."""
+    fidelity = config.FIDELITY
+    with config_override({"FIDELITY": 1}):
+        assert config.FIDELITY == 1
+    assert config.FIDELITY == fidelity
+
+    with pytest.raises(KeyError):
+        with config_override({"NOT_A_PARAMETER": 1}):
+            pass
+
+def test_replicate_matches_standalone_run():
+    """A replicate reproduces exactly from its derived seed, independent of the runner."""
+    results = run_replicates(SHORT, replicates=2, base_seed=5, workers=1)
+
+    with config_override({**SHORT, "RANDOM_SEED": derive_seed(5, 1)}):
+        standalone = Simulation(headless=True).loop(verbose=False)
+    assert results[1] == standalone
+
+def test_process_pool_matches_serial_run():
+    """Fanning runs out over worker processes must not change any result."""
+    cases = {"high": {**SHORT, "FIDELITY": 255}, "low": {**SHORT, "FIDELITY": 247}}
+    serial = run_cases(cases, replicates=2, base_seed=3, workers=1)
+    parallel = run_cases(cases, replicates=2, base_seed=3, workers=2)
+    assert serial == parallel
+
+def test_summarize():
+    summary = summarize([(2.0, [10, 20]), (4.0, [10, 40])])
+    assert summary["followers_mean"] == 30
+    assert summary["lost_std"] == 0
+    assert summary["fl_ratio_mean"] == 3.0
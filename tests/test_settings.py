@@ -0,0 +1,44 @@
+import dataclasses
+import pytest
+import config
+from ant import Ant
+from main import Simulation
+from settings import SimulationConfig
+
+def test_interleaved_simulations_match_separate_runs():
+    """Two configurations stepped side by side in one process don't affect each other or the config module."""
+    fidelity = config.FIDELITY
+    high = SimulationConfig.current(TIMESTEPS=80, RANDOM_SEED=5, FIDELITY=255)
+    low = high.replace(FIDELITY=247, DEPOSITION_RATE=4, TURNING_KERNEL=[0.3, 0.1, 0.01, 0.01])
+
+    first, second = Simulation(headless=True, settings=high), Simulation(headless=True, settings=low)
+    while first.tick < 80:
+        first.step()
+        second.step()
+
+    assert first.calculate_stats() == Simulation(headless=True, settings=high).loop(verbose=False)
+    assert second.calculate_stats() == Simulation(headless=True, settings=low).loop(verbose=False)
+    assert config.FIDELITY == fidelity
+
+def test_settings_are_immutable_with_per_instance_tables():
+    settings = SimulationConfig(TURNING_KERNEL=[0.2, 0.1, 0.0, 0.0])
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        settings.FIDELITY = 1
+    with pytest.raises(KeyError):
+        settings.replace(NOT_A_PARAMETER=1)
+
+    assert settings.TURNING_KERNEL == (0.2, 0.1, 0.0, 0.0)
+    assert settings.kernel_cdf[0] == pytest.approx(0.7)
+    assert SimulationConfig().kernel_cdf[0] == pytest.approx(Ant((0, 0)).WEIGHTS[0])
+    assert Ant((0, 0), settings=settings).WEIGHTS == settings.kernel_weights
+    assert settings.replace(FIDELITY=128).fidelity == 0.5
+
+def test_ant_uses_its_own_grid_size(monkeypatch):
+    """Bounds come from the ant's settings; current() picks up run-time changes to the config module."""
+    small = Ant((2, 2), settings=SimulationConfig(GRID_SIZE=4))
+    assert not small.in_bounds((5, 1))
+
+    monkeypatch.setattr(config, "GRID_SIZE", 8)
+    assert SimulationConfig.current().GRID_SIZE == 8
+    assert Ant((2, 2)).in_bounds((5, 1))
+    assert not small.in_bounds((5, 1))
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+import config
+from main import Simulation
+from stats import COLUMNS, StatsSeries
+
+@pytest.fixture
+def short(monkeypatch):
+    monkeypatch.setattr(config, "TIMESTEPS", 120)
+    monkeypatch.setattr(config, "GRID_SIZE", 48)
+    monkeypatch.setattr(config, "RANDOM_SEED", 9)
+
+def test_series_tracks_the_run(short):
+    """One row per tick, ending on the calculate_stats() values, the absorbed count and the grid total."""
+    sim = Simulation(headless=True)
+    ratio, (lost, followers) = sim.loop(verbose=False)
+    series = sim.stats
+
+    assert len(series) == 120
+    assert list(series.column("tick")) == list(range(1, 121))
+    assert series.array[-1, 1:4].tolist() == [followers, lost, ratio]
+    # Ants are only released and absorbed: whatever was released and is not alive has left the lattice.
+    released = config.INITIAL_BURST_SIZE + 120
+    assert series.column("absorbed")[-1] == released - (lost + followers) > 0
+    assert np.all(np.diff(series.column("absorbed")) >= 0)
+    assert series.column("pheromone")[-1] == sim.grid.sum()
+
+def test_eager_and_lazy_series_agree(short, monkeypatch):
+    lazy = Simulation(headless=True)
+    lazy.loop(verbose=False)
+    monkeypatch.setattr(config, "EVAPORATION_MODE", "eager")
+    eager = Simulation(headless=True)
+    eager.loop(verbose=False)
+    assert np.array_equal(lazy.stats.array, eager.stats.array)
+
+def test_series_grows_and_exports(tmp_path):
+    class Colony:
+        absorbed = 2
+        def count_modes(self):
+            return [4, 6]
+
+    class Field:
+        def total(self):
+            return 12.5
+
+    series = StatsSeries(capacity=2)
+    for tick in range(5):
+        series.record(tick, Colony(), Field())
+    series.to_csv(tmp_path / "stats.csv")
+
+    table = np.loadtxt(tmp_path / "stats.csv", delimiter=",", skiprows=1)
+    assert open(tmp_path / "stats.csv").readline().strip() == ",".join(COLUMNS)
+    assert table.shape == (5, len(COLUMNS))
+    assert table[-1].tolist() == [4, 6, 4, 1.5, 2, 12.5]
@@ -0,0 +1,70 @@
+import numpy as np
+import replicates
+from main import Simulation
+from replicates import run_cases
+from settings import SimulationConfig
+from store import ResultStore, store_run
+
+SETTINGS = SimulationConfig.current(TIMESTEPS=30, RANDOM_SEED=4)
+
+def test_stored_run_is_found_by_key_and_parameters(tmp_path):
+    sim = Simulation(headless=True, settings=SETTINGS)
+    stats = sim.loop(verbose=False)
+    with ResultStore(str(tmp_path)) as store:
+        key = store_run(store, sim)
+        assert store.get(SETTINGS)["stats"] == stats
+        assert store.get(SETTINGS.replace(RANDOM_SEED=5)) is None
+        assert store.get(SETTINGS, {"convergence": {"window": 10}}) is None
+
+        [run] = store.find(FIDELITY=SETTINGS.FIDELITY, TIMESTEPS=30)
+        assert run["key"] == key and run["params"] == SETTINGS and run["ticks"] == 30
+        assert store.find(FIDELITY=SETTINGS.FIDELITY - 4) == []
+
+        grid = store.load(key, "grid")
+        assert isinstance(grid, np.memmap)
+        assert np.array_equal(grid, sim.grid)
+
+def test_eviction_keeps_the_statistics(tmp_path):
+    with ResultStore(str(tmp_path)) as store:
+        old = store.put(SETTINGS, (0.5, [1, 2]), grid=np.zeros((64, 64)))
+        new = store.put(SETTINGS.replace(RANDOM_SEED=5), (1.0, [2, 2]), grid=np.zeros((64, 64)))
+        store.load(old, "grid")
+        assert store.evict(store.size() - 1) == 1
+        assert store.load(new, "grid") is None and store.load(old, "grid") is not None
+        assert store.get(SETTINGS.replace(RANDOM_SEED=5))["stats"] == (1.0, [2, 2])
+
+def test_stored_runs_are_not_simulated_again(tmp_path, monkeypatch):
+    cases = {"case": {"TIMESTEPS": 20}}
+    first = run_cases(cases, 2, base_seed=1, workers=1, store=str(tmp_path))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("simulated a stored run")
+    monkeypatch.setattr(replicates, "Simulation", fail)
+    assert run_cases(cases, 2, base_seed=1, workers=1, store=str(tmp_path)) == first
+    assert run_cases(cases, 2, base_seed=1, workers=1, ensemble=True, store=str(tmp_path)) == first
+
+def test_batched_runs_keep_their_arrays(tmp_path):
+    """Ensemble results are stored with their final state and can stand in for single runs."""
+    cases = {"case": {"TIMESTEPS": 20}}
+    batched = run_cases(cases, 2, base_seed=1, workers=1, ensemble=True, store=str(tmp_path))
+    assert run_cases(cases, 2, base_seed=1, workers=1) == batched
+    with ResultStore(str(tmp_path)) as store:
+        runs = store.find(TIMESTEPS=20)
+        assert len(runs) == 2
+        for run in runs:
+            assert run["engine"] == "ensemble" and run["arrays"] == ["grid", "positions"]
+        sim = Simulation(headless=True, settings=runs[0]["params"])
+        sim.loop(verbose=False)
+        assert np.array_equal(store.load(runs[0]["key"], "grid"), sim.grid)
+        store_run(store, sim)
+        assert store.get(runs[0]["params"])["arrays"] == ["grid", "positions", "series"]
+
+def test_run_cut_short_is_not_served(tmp_path):
+    """A run that stopped early (e.g. its window was closed) must not stand in for the full run."""
+    sim = Simulation(headless=True, settings=SETTINGS)
+    while sim.tick < 10:
+        sim.step()
+    with ResultStore(str(tmp_path)) as store:
+        assert store_run(store, sim) is None
+        store.put(SETTINGS, sim.calculate_stats(), ticks=sim.tick)
+        assert store.get(SETTINGS) is None
@@ -0,0 +1,58 @@
+import pytest
+import sweep
+from sweep import grid_points, load_results, run_sweep
+
+POINTS = [{"TIMESTEPS": 20, "FIDELITY": 255}, {"TIMESTEPS": 20, "FIDELITY": 247}]
+
+def test_grid_points_cartesian_product():
+    points = grid_points({"FIDELITY": [255, 251], "DEPOSITION_RATE": [4, 8, 16]})
+    assert len(points) == 6
+    assert {"FIDELITY": 251, "DEPOSITION_RATE": 16} in points
+
+def test_unknown_parameter_is_rejected(tmp_path):
+    with pytest.raises(KeyError):
+        run_sweep([{"GRID_SIZE": 64}], 1, str(tmp_path / "results.csv"), base_seed=1, workers=1)
+
+def test_interrupted_sweep_only_reruns_missing_points(tmp_path, monkeypatch):
+    """
+    Simulate an interruption by cutting the table after the first run (mid-way through the
+    second row), then resume: only the missing runs execute and the results are unchanged.
+    """
+    path = tmp_path / "results.csv"
+    assert run_sweep(POINTS, 2, str(path), base_seed=1, workers=1) == 4
+    complete = load_results(str(path))
+    assert len(complete) == 4
+
+    lines = path.read_text().splitlines(keepends=True)
+    path.write_text("".join(lines[:2]) + lines[2][:10])
+
+    calls = []
+    original = sweep.run_replicate
+    monkeypatch.setattr(sweep, "run_replicate", lambda point, *args: calls.append(point) or original(point, *args))
+    assert run_sweep(POINTS, 2, str(path), base_seed=1, workers=1) == 3
+    assert len(calls) == 3
+
+    key = lambda row: (sweep.point_key(row["params"]), row["replicate"])
+    assert sorted(load_results(str(path)), key=key) == sorted(complete, key=key)
+    assert run_sweep(POINTS, 2, str(path), base_seed=1, workers=1) == 0
+
+def test_resume_with_other_seed_or_convergence_runs_again(tmp_path):
+    """Runs of another base seed or other convergence options are not taken for the requested ones."""
+    path = str(tmp_path / "results.csv")
+    point = [{"TIMESTEPS": 20}]
+    assert run_sweep(point, 1, path, base_seed=1, workers=1) == 1
+    assert run_sweep(point, 1, path, base_seed=2, workers=1) == 1
+    assert run_sweep(point, 1, path, base_seed=2, workers=1, convergence={"window": 10}) == 1
+    assert run_sweep(point, 1, path, base_seed=2, workers=1, convergence={"window": 10}) == 0
+    rows = load_results(path)
+    assert len({row["seed"] for row in rows}) == 2
+    assert [row["convergence"] for row in rows] == [None, None, {"window": 10}]
+
+def test_old_table_keeps_its_columns(tmp_path):
+    """Tables written before the ticks and convergence columns existed are appended to in their own layout."""
+    path = tmp_path / "results.csv"
+    path.write_text("params,replicate,seed,fl_ratio,lost,followers\n")
+    run_sweep([{"TIMESTEPS": 20}], 1, str(path), base_seed=1, workers=1)
+    [row] = load_results(str(path))
+    assert row["ticks"] is None and row["convergence"] is None
+    assert path.read_text().splitlines()[1].count(",") == 5
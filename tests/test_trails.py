@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+import config
+from main import Simulation
+from trails import TrailSeries, analyze, label_components, skeletonize
+
+def flood_labels(mask):
+    """Reference 8-connected labelling with a plain flood fill."""
+    labels = np.zeros(mask.shape, dtype=int)
+    count = 0
+    for start in zip(*np.nonzero(mask)):
+        if(labels[start]):
+            continue
+        count += 1
+        labels[start] = count
+        stack = [start]
+        while stack:
+            r, c = stack.pop()
+            for dr in (-1, 0, 1):
+                for dc in (-1, 0, 1):
+                    n = (r + dr, c + dc)
+                    if(0 <= n[0] < mask.shape[0] and 0 <= n[1] < mask.shape[1] and mask[n] and not labels[n]):
+                        labels[n] = count
+                        stack.append(n)
+    return labels, count
+
+def test_labels_match_flood_fill():
+    mask = np.random.default_rng(0).random((60, 60)) < 0.45
+    labels, count = label_components(mask)
+    expected, expected_count = flood_labels(mask)
+    assert count == expected_count
+    assert np.array_equal(labels, expected)
+
+def test_x_pattern():
+    """Two crossing 2-cell-wide diagonals (the Figure 3 "X"): one trail, four ends, one fork, straight arms."""
+    grid = np.zeros((64, 64))
+    for i in range(5, 59):
+        grid[i, i] = grid[i, i + 1] = grid[i, 63 - i] = grid[i, 62 - i] = 50
+    result = analyze(grid)
+    assert result["components"] == 1
+    assert result["endpoints"] == 4
+    assert result["forks"] == 1
+    assert result["straightness"] > 0.95
+    # Thinned to single cells: the length is about that of two diagonals, not twice it.
+    assert result["skeleton_length"] == pytest.approx(2 * 54 * np.sqrt(2), rel=0.05)
+    assert skeletonize(grid > 0).sum() < (grid > 0).sum() * 0.6
+
+def test_wiggly_trails_are_less_straight():
+    straight, wiggly = np.zeros((64, 64)), np.zeros((64, 64))
+    straight[30, 5:60] = 50
+    for c in range(5, 60):
+        wiggly[30 + int(round(4 * np.sin(c / 4))), c] = 50
+        wiggly[30 + int(round(4 * np.sin((c + 1) / 4))), c] = 50
+    assert analyze(straight)["straightness"] == pytest.approx(1.0)
+    assert analyze(wiggly)["straightness"] < 0.9
+
+def test_trail_series_during_a_run(monkeypatch):
+    monkeypatch.setattr(config, "TIMESTEPS", 100)
+    series = TrailSeries(every=25)
+    sim = Simulation(headless=True, trails=series)
+    sim.loop(verbose=False)
+    assert list(series.array[:, 0]) == [25, 50, 75, 100]
+    assert series.rows[-1][1:] == [analyze(sim.grid)[name] for name in ("components", "trail_cells", "skeleton_length", "endpoints", "forks", "straightness")]
+
+def test_recording_is_measured_with_its_own_deposit(tmp_path):
+    """A recording of a swept DEPOSITION_RATE gets its own threshold, not config.py's."""
+    from recorder import Recorder
+    from settings import SimulationConfig
+    from trails import analyze_recording, summary_row
+    settings = SimulationConfig.current(TIMESTEPS=60, DEPOSITION_RATE=config.DEPOSITION_RATE * 3)
+    path = str(tmp_path / "run")
+    sim = Simulation(headless=True, settings=settings, recorder=Recorder(path, grid_every=20, settings=settings))
+    sim.loop(verbose=False)
+    series = analyze_recording(path)
+    assert series.rows[-1][1:] == summary_row(analyze(sim.grid, settings=settings))
+    assert analyze(sim.grid, settings=settings)["trail_cells"] != analyze(sim.grid)["trail_cells"]
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from raster import ant_density, block_max
+from viewport import MAX_PANEL_SIZE, Viewport
+
+def test_default_view_keeps_three_pixels_per_cell():
+    """The paper's grid keeps its x3 window; larger grids are fitted into MAX_PANEL_SIZE."""
+    view = Viewport(256)
+    assert view.size == 768 and view.scale == 3 and view.window() == (0, 256, 0, 256)
+    assert view.to_pixel(10, 20) == (30, 60)
+
+    large = Viewport(4096)
+    assert large.size == MAX_PANEL_SIZE
+    assert large.step == 6 and not large.detailed
+
+def test_zoom_keeps_the_cursor_cell_and_stays_on_the_lattice():
+    view = Viewport(256)
+    view.zoom(4, (600, 150))
+    assert view.to_cell((600, 150)) == pytest.approx((200, 50))
+    x0, x1, y0, y1 = view.window()
+    assert x1 - x0 <= 256 / 4 + 2 and x0 <= 200 < x1
+
+    view.pan(10 ** 6, -10 ** 6)
+    assert view.window()[1] == 256 and view.window()[2] == 0
+    view.zoom(1e-6)
+    assert view.scale == view.fit_scale
+
+def test_density_and_block_max_cover_the_window():
+    positions = np.array([[0, 0], [1, 1], [5, 5], [5, 5], [9, 9], [20, 0]])
+    counts = ant_density(positions, (0, 10, 0, 10), step=3)
+    assert counts.shape == (4, 4)
+    assert counts[0, 0] == 2 and counts[1, 1] == 2 and counts[3, 3] == 1 and counts.sum() == 5
+
+    grid = np.zeros((10, 10))
+    grid[4, 7] = 5.0
+    pooled = block_max(grid, 3)
+    assert pooled.shape == (4, 4) and pooled[1, 2] == 5.0 and pooled.sum() == 5.0
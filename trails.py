@@ -0,0 +1,372 @@
+# trails.py
+import argparse
+import numpy as np
+from settings import SimulationConfig
+
+# Forward half of the 8-neighbourhood: every pair of adjacent cells is found exactly once.
+LINK_OFFSETS = ((0, 1), (1, -1), (1, 0), (1, 1))
+
+# Columns of a trail summary (see analyze).
+SUMMARY_COLUMNS = ("components", "trail_cells", "skeleton_length", "endpoints", "forks", "straightness")
+
+
+def _links(mask, skip_corners=False):
+    """
+    Pairs of 8-adjacent cells of `mask`, as flat indices.
+
+    Args:
+        mask (np.ndarray): 2D boolean array.
+        skip_corners (bool): Leave out diagonal pairs that are also joined through an orthogonal
+            neighbour in the mask, so staircase corners are not counted twice when measuring length.
+
+    Returns:
+        tuple: (a, b, length) arrays; length is 1 for orthogonal and sqrt(2) for diagonal pairs.
+    """
+    rows, cols = mask.shape
+    a, b, length = [], [], []
+    for dr, dc in LINK_OFFSETS:
+        left, right = max(0, -dc), max(0, dc)
+        both = mask[:rows - dr, left:cols - right] & mask[dr:, right:cols - left]
+        if(skip_corners and dr and dc):
+            both &= ~(mask[:rows - dr, right:cols - left] | mask[dr:, left:cols - right])
+        r, c = np.nonzero(both)
+        a.append(r * cols + c + left)
+        b.append((r + dr) * cols + c + right)
+        length.append(np.full(len(r), np.sqrt(2) if (dr and dc) else 1.0))
+    return np.concatenate(a), np.concatenate(b), np.concatenate(length)
+
+
+def label_components(mask):
+    """
+    Labels the 8-connected components of a boolean grid.
+
+    Vectorized union-find: every link hooks the larger of its two roots under the smaller,
+    then pointer jumping flattens the trees, until no link joins two different roots.
+    The number of rounds grows with the logarithm of the component size, not its length,
+    and no Python code runs per cell.
+
+    Returns:
+        tuple: (labels, count) where labels is an int array shaped like `mask`,
+        0 for background and 1..count for the components in row-major order of their first cell.
+    """
+    cells = np.flatnonzero(mask)
+    labels = np.zeros(mask.shape, dtype=np.int32)
+    if(len(cells) == 0):
+        return labels, 0
+
+    index = np.full(mask.size, -1, dtype=np.int64)
+    index[cells] = np.arange(len(cells))
+    a, b, _ = _links(mask)
+    a, b = index[a], index[b]
+
+    parent = np.arange(len(cells))
+    while True:
+        pa, pb = parent[a], parent[b]
+        split = pa != pb
+        if(not split.any()):
+            break
+        np.minimum.at(parent, np.maximum(pa, pb)[split], np.minimum(pa, pb)[split])
+        while True:
+            jumped = parent[parent]
+            if(np.array_equal(jumped, parent)):
+                break
+            parent = jumped
+
+    # Roots are the smallest cell index of each component, so np.unique numbers them in row-major order.
+    roots, component = np.unique(parent, return_inverse=True)
+    labels.reshape(-1)[cells] = component + 1
+    return labels, len(roots)
+
+
+def _ring(image):
+    """The 8 neighbours of every inner cell of a padded image, clockwise from North (P2..P9 of Zhang & Suen)."""
+    return (
+        image[:-2, 1:-1], image[:-2, 2:], image[1:-1, 2:], image[2:, 2:],
+        image[2:, 1:-1], image[2:, :-2], image[1:-1, :-2], image[:-2, :-2],
+    )
+
+
+def _connectivity(ring):
+    """
+    8-connectivity number of every cell (Yokoi): how many separate pieces its neighbourhood falls into.
+
+    1 means the cell can be removed without disconnecting anything.
+    """
+    empty = [~p for p in ring]
+    # Orthogonal neighbours are ring[0, 2, 4, 6]; each is checked with the two cells after it.
+    return sum(
+        (empty[k] & ~(empty[k] & empty[k + 1] & empty[(k + 2) % 8])).astype(np.uint8)
+        for k in (0, 2, 4, 6)
+    )
+
+
+def skeletonize(mask):
+    """
+    Thins a boolean grid to 1-cell-wide 8-connected lines, keeping the topology.
+
+    Zhang & Suen (1984) thinning with the Lu & Wang (1986) rule (3 <= B <= 6), which keeps
+    2-cell-wide diagonal lines (the typical shape of trails on this lattice) instead of erasing them,
+    followed by removing the staircase cells that rule leaves behind.
+    Each pass evaluates the rules for the whole grid with array shifts, so the number of passes
+    follows the trail width (a few cells), not the grid size.
+    """
+    if(not mask.any()):
+        return np.zeros(mask.shape, dtype=bool)
+    # Work on the bounding box of the trails only.
+    rows = np.flatnonzero(mask.any(axis=1))
+    cols = np.flatnonzero(mask.any(axis=0))
+    box = (slice(rows[0], rows[-1] + 1), slice(cols[0], cols[-1] + 1))
+    image = np.pad(mask[box], 1).astype(bool)
+    centre = image[1:-1, 1:-1]
+
+    changed = True
+    while changed:
+        changed = False
+        for step in (0, 1):
+            ring = _ring(image)
+            p2, p4, p6, p8 = ring[0], ring[2], ring[4], ring[6]
+            neighbours = sum(p.astype(np.uint8) for p in ring)
+            transitions = sum((~ring[i] & ring[(i + 1) % 8]).astype(np.uint8) for i in range(8))
+            if(step == 0):
+                keep = (p2 & p4 & p6) | (p4 & p6 & p8)
+            else:
+                keep = (p2 & p4 & p8) | (p2 & p6 & p8)
+            remove = centre & (neighbours >= 3) & (neighbours <= 6) & (transitions == 1) & ~keep
+            if(remove.any()):
+                centre &= ~remove
+                changed = True
+
+    # Remove cells whose neighbours stay connected without them (never line ends). Cells of one
+    # (row % 2, col % 2) class are never adjacent, so each class can be removed at once.
+    r, c = np.indices(centre.shape)
+    classes = [(r % 2 == i) & (c % 2 == j) for i in (0, 1) for j in (0, 1)]
+    changed = True
+    while changed:
+        changed = False
+        for cls in classes:
+            ring = _ring(image)
+            neighbours = sum(p.astype(np.uint8) for p in ring)
+            remove = centre & cls & (neighbours >= 2) & (_connectivity(ring) == 1)
+            if(remove.any()):
+                centre &= ~remove
+                changed = True
+
+    skeleton = np.zeros(mask.shape, dtype=bool)
+    skeleton[box] = centre
+    return skeleton
+
+
+def neighbour_count(mask):
+    """Number of 8-neighbours of every cell that are set in `mask`."""
+    padded = np.pad(mask, 1).astype(np.uint8)
+    rows, cols = mask.shape
+    return sum(
+        padded[1 + dr:1 + dr + rows, 1 + dc:1 + dc + cols]
+        for dr in (-1, 0, 1) for dc in (-1, 0, 1) if (dr or dc)
+    )
+
+
+def segment_straightness(segments, count):
+    """
+    Straightness of every labelled skeleton segment: its extent along its principal axis over its length.
+
+    1 for a straight segment (in any of the lattice's directions), lower for curved or wiggly ones.
+    Per-label moments come from bincounts, so all segments are measured in one pass.
+
+    Returns:
+        tuple: (straightness, length) arrays indexed by label - 1 (straightness is 0 where the length is 0).
+    """
+    cells = np.flatnonzero(segments)
+    label = segments.reshape(-1)[cells] - 1
+    y, x = np.divmod(cells, segments.shape[1])
+    y, x = y.astype(np.float64), x.astype(np.float64)
+
+    a, b, step = _links(segments > 0, skip_corners=True)
+    same = segments.reshape(-1)[a] == segments.reshape(-1)[b]
+    length = np.bincount(segments.reshape(-1)[a[same]] - 1, weights=step[same], minlength=count)
+
+    n = np.bincount(label, minlength=count)
+    mean_x = np.bincount(label, x, count) / n
+    mean_y = np.bincount(label, y, count) / n
+    dx, dy = x - mean_x[label], y - mean_y[label]
+    sxx = np.bincount(label, dx * dx, count)
+    syy = np.bincount(label, dy * dy, count)
+    sxy = np.bincount(label, dx * dy, count)
+    angle = 0.5 * np.arctan2(2 * sxy, sxx - syy)
+    along = dx * np.cos(angle)[label] + dy * np.sin(angle)[label]
+
+    low = np.full(count, np.inf)
+    high = np.full(count, -np.inf)
+    np.minimum.at(low, label, along)
+    np.maximum.at(high, label, along)
+    span = high - low
+
+    straightness = np.divide(span, length, out=np.zeros(count), where=length > 0)
+    return np.minimum(straightness, 1.0), length
+
+
+def trail_mask(grid, threshold):
+    """Trail cells of a pheromone grid: those holding more than `threshold` (see analyze)."""
+    return np.asarray(grid) > threshold
+
+
+def analyze(grid, threshold=None, min_cells=10, settings=None):
+    """
+    Measures the trail network of a pheromone grid.
+
+    Cells above `threshold` are trail cells. Their 8-connected components are the trails
+    (components under `min_cells` cells, e.g. the fading marks of single explorers, are ignored).
+    Each trail is thinned to its skeleton: skeleton length is the path length along it,
+    endpoints are skeleton cells with one neighbour, and forks are clusters of skeleton cells
+    with three or more neighbours. Splitting the skeleton at the forks gives segments, whose straightness
+    is averaged (weighted by length) per trail.
+
+    Args:
+        grid (np.ndarray): Pheromone concentrations (e.g. Simulation.grid).
+        threshold (float): Trail threshold (default: settings.deposit_amount, one fresh deposit,
+            so only cells marked more than once recently count as trail).
+        min_cells (int): Smallest component counted as a trail.
+        settings (SimulationConfig): Parameters of the run the grid comes from (default: SimulationConfig.current()).
+
+    Returns:
+        dict: SUMMARY_COLUMNS for the whole network, plus "trails": a dict of per-trail arrays
+        ("cells", "length", "endpoints", "forks", "straightness"), largest trail first.
+    """
+    if(threshold is None):
+        settings = settings if settings is not None else SimulationConfig.current()
+        threshold = settings.deposit_amount
+    labels, count = label_components(trail_mask(grid, threshold))
+    cells = np.bincount(labels.reshape(-1), minlength=count + 1)[1:]
+    if(min_cells > 1 and count):
+        # Drop the small components and renumber the rest 1..count.
+        kept = cells >= min_cells
+        relabel = np.zeros(count + 1, dtype=np.int32)
+        relabel[1:][kept] = np.arange(1, np.count_nonzero(kept) + 1)
+        labels = relabel[labels]
+        cells = cells[kept]
+        count = len(cells)
+
+    skeleton = skeletonize(labels > 0)
+    degree = neighbour_count(skeleton)
+    trail_of = labels.reshape(-1)
+    endpoints = skeleton & (degree == 1)
+    # On a skeleton without redundant cells, three or more neighbours only occur around a junction.
+    junctions = skeleton & (degree >= 3)
+
+    # One fork per cluster of junction cells, attributed to the trail it lies on.
+    fork_labels, forks = label_components(junctions)
+    first = np.unique(fork_labels.reshape(-1), return_index=True)[1][1:]
+    fork_count = np.bincount(trail_of[first], minlength=count + 1)[1:]
+    end_count = np.bincount(trail_of[np.flatnonzero(endpoints)], minlength=count + 1)[1:]
+
+    # Skeleton length per trail, and straightness from the segments between forks.
+    a, b, step = _links(skeleton, skip_corners=True)
+    length = np.bincount(trail_of[a], weights=step, minlength=count + 1)[1:]
+    segments, segment_count = label_components(skeleton & ~junctions)
+    straightness = np.zeros(count)
+    if(segment_count):
+        segment_straightness_, segment_length = segment_straightness(segments, segment_count)
+        first = np.unique(segments.reshape(-1), return_index=True)[1][1:]
+        owner = trail_of[first]
+        weight = np.bincount(owner, weights=segment_length, minlength=count + 1)[1:]
+        weighted = np.bincount(owner, weights=segment_straightness_ * segment_length, minlength=count + 1)[1:]
+        straightness = np.divide(weighted, weight, out=np.zeros(count), where=weight > 0)
+
+    order = np.argsort(-cells, kind="stable")
+    total_length = float(length.sum())
+    return {
+        "components": count,
+        "trail_cells": int(cells.sum()),
+        "skeleton_length": total_length,
+        "endpoints": int(end_count.sum()),
+        "forks": int(forks),
+        "straightness": float((straightness * length).sum() / total_length) if total_length > 0 else 0.0,
+        "trails": {
+            "cells": cells[order],
+            "length": length[order],
+            "endpoints": end_count[order],
+            "forks": fork_count[order],
+            "straightness": straightness[order],
+        },
+    }
+
+
+def summary_row(result):
+    """The SUMMARY_COLUMNS values of an analyze() result, as a list."""
+    return [result[name] for name in SUMMARY_COLUMNS]
+
+
+class TrailSeries:
+    """
+    Trail summaries of a running simulation, taken every `every` ticks (see Simulation(trails=...)).
+    """
+
+    def __init__(self, every=50, threshold=None, min_cells=10):
+        self.every = every
+        self.threshold = threshold
+        self.min_cells = min_cells
+        self.rows = []
+
+    def due(self, tick):
+        return self.every > 0 and tick % self.every == 0
+
+    def record(self, tick, grid):
+        self.rows.append([tick] + summary_row(analyze(grid, self.threshold, self.min_cells)))
+
+    @property
+    def array(self):
+        return np.array(self.rows, dtype=np.float64).reshape(-1, len(SUMMARY_COLUMNS) + 1)
+
+    def to_csv(self, path):
+        """Writes one row per analysed tick, with a header row."""
+        np.savetxt(path, self.array, delimiter=",", header=",".join(("tick",) + SUMMARY_COLUMNS), comments="",
+                   fmt=["%d", "%d", "%d", "%.3f", "%d", "%d", "%.4f"])
+
+
+def analyze_recording(path, threshold=None, min_cells=10, every=1):
+    """
+    Trail summaries of the grid snapshots of a recording (see recorder.py).
+
+    Args:
+        path (str): Recording directory.
+        threshold (float): Trail threshold (default: one fresh deposit of the recorded run, from its meta.json).
+        every (int): Analyse every Nth snapshot only.
+
+    Returns:
+        TrailSeries: One row per analysed snapshot.
+    """
+    # Imported here so the analysis itself does not depend on the recording format.
+    from recorder import open_recording, recording_settings
+    recording = open_recording(path)
+    if(threshold is None):
+        threshold = recording_settings(recording["meta"]).deposit_amount
+    series = TrailSeries(every=0, threshold=threshold, min_cells=min_cells)
+    for i in range(0, len(recording["grid_index"]), every):
+        series.record(int(recording["grid_index"][i]), recording["grid"][i])
+    return series
+
+
+def main(argv=None):
+    """
+    Measures the trail network of recorded runs.
+
+    Example:
+        python -m trails runs/fig3a --every 10 --out fig3a_trails.csv
+    """
+    parser = argparse.ArgumentParser(description="Trail network metrics of recorded pheromone grids.")
+    parser.add_argument("path", help="recording directory (see --record)")
+    parser.add_argument("--threshold", type=float, default=None, help="trail threshold (default: one fresh deposit)")
+    parser.add_argument("--min-cells", type=int, default=10, help="smallest component counted as a trail")
+    parser.add_argument("--every", type=int, default=1, help="analyse every Nth grid snapshot")
+    parser.add_argument("--out", default=None, help="write the summaries to this CSV file")
+    args = parser.parse_args(argv)
+
+    series = analyze_recording(args.path, args.threshold, args.min_cells, args.every)
+    if(args.out is not None):
+        series.to_csv(args.out)
+    print(",".join(("tick",) + SUMMARY_COLUMNS))
+    for row in series.rows[-10:]:
+        print(",".join(f"{value:g}" for value in row))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# viewport.py
+import math
+
+# Largest panel side in pixels. The paper's 256 x 256 grid still gets its 3 pixels per cell (768 px),
+# larger lattices are shown scaled down instead of opening a window bigger than the screen.
+MAX_PANEL_SIZE = 768
+
+# Zoom limit: pixels per cell at the closest view.
+MAX_SCALE = 24.0
+
+# Ants are drawn one by one from this many pixels per cell on (the default 256 x 256 view has 3);
+# further out they are aggregated into a density layer (see raster.ant_density).
+DETAIL_SCALE = 2.0
+
+
+class Viewport:
+    """
+    The part of the lattice shown in a panel, and how large.
+
+    Maps lattice cells to panel pixels: cell (x, y) is centered on pixel ((x - origin_x) * scale, (y - origin_y) * scale).
+    The view can be panned and zoomed but never shows anything outside the lattice, and never zooms out
+    further than the whole lattice fitting the panel. Plain arithmetic, no pygame.
+
+    Attributes:
+        scale (float): Pixels per cell.
+        origin (list): Lattice (x, y) coordinate shown at the panel's top-left corner.
+    """
+
+    def __init__(self, grid_size, size=None):
+        """
+        Args:
+            grid_size (int): Side length of the lattice.
+            size (int): Side length of the panel in pixels (default: 3 per cell, at most MAX_PANEL_SIZE).
+        """
+        self.grid_size = grid_size
+        self.size = size if size is not None else min(grid_size * 3, MAX_PANEL_SIZE)
+        self.reset()
+
+    @property
+    def fit_scale(self):
+        """Scale at which the whole lattice fills the panel."""
+        return self.size / self.grid_size
+
+    def reset(self):
+        """Shows the whole lattice."""
+        self.scale = self.fit_scale
+        self.origin = [0.0, 0.0]
+
+    def _clamp(self):
+        self.scale = min(max(self.scale, self.fit_scale), max(MAX_SCALE, self.fit_scale))
+        span = self.size / self.scale
+        for axis in (0, 1):
+            self.origin[axis] = min(max(self.origin[axis], 0.0), self.grid_size - span)
+
+    def pan(self, dx, dy):
+        """Moves the view by (dx, dy) pixels (positive: towards larger coordinates)."""
+        self.origin[0] += dx / self.scale
+        self.origin[1] += dy / self.scale
+        self._clamp()
+
+    def zoom(self, factor, pixel=None):
+        """
+        Multiplies the scale by `factor`, keeping the cell under `pixel` (default: the panel center) in place.
+        """
+        if(pixel is None):
+            pixel = (self.size / 2, self.size / 2)
+        anchor = self.to_cell(pixel)
+        self.scale *= factor
+        self._clamp()
+        self.origin = [anchor[0] - pixel[0] / self.scale, anchor[1] - pixel[1] / self.scale]
+        self._clamp()
+
+    def to_cell(self, pixel):
+        """Lattice coordinate (float) under a panel pixel."""
+        return (self.origin[0] + pixel[0] / self.scale, self.origin[1] + pixel[1] / self.scale)
+
+    def to_pixel(self, x, y):
+        """Panel pixel of a lattice coordinate (works on arrays as well)."""
+        return ((x - self.origin[0]) * self.scale, (y - self.origin[1]) * self.scale)
+
+    def window(self):
+        """
+        The visible cells, including any cut off by the panel edge.
+
+        Returns:
+            tuple: (x0, x1, y0, y1) so that grid[x0:x1, y0:y1] is everything in view.
+        """
+        span = self.size / self.scale
+        x0 = max(int(math.floor(self.origin[0] - 0.5)), 0)
+        y0 = max(int(math.floor(self.origin[1] - 0.5)), 0)
+        x1 = min(int(math.ceil(self.origin[0] + span + 0.5)), self.grid_size)
+        y1 = min(int(math.ceil(self.origin[1] + span + 0.5)), self.grid_size)
+        return x0, x1, y0, y1
+
+    @property
+    def step(self):
+        """Cells per drawn texel: 1 when zoomed in, more when several cells share one pixel."""
+        return max(int(math.ceil(1 / self.scale - 1e-9)), 1)
+
+    @property
+    def detailed(self):
+        """Whether cells are large enough to draw individual ants."""
+        return self.scale >= DETAIL_SCALE